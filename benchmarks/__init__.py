@@ -0,0 +1 @@
+"""Throughput benchmarks; see :mod:`benchmarks.run`."""
@@ -0,0 +1,412 @@
+"""Throughput benchmarks of the API products against the local provider simulator.
+
+Run ``python -m benchmarks.run --output results.json`` from the repository
+root. Each scenario is measured sequentially, from a thread pool and with
+the asyncio clients; results are printed (or written) as JSON so that runs
+can be diffed between releases.
+"""
+
+import argparse
+import asyncio
+import gc
+import itertools
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import httpx
+
+from momo_api import PaymentRequest, TransferRequest
+from momo_api.airtel.collection import AirtelCollectionApi, AsyncAirtelCollectionApi
+from momo_api.airtel.config import AirtelConfig
+from momo_api.airtel.disbursement import AirtelDisbursementApi, AsyncAirtelDisbursementApi
+from momo_api.models.config import Config
+from momo_api.products.collection import AsyncCollectionApi, CollectionApi
+from momo_api.products.disbursement import AsyncDisbursementApi, DisbursementApi
+from momo_api.simulator import Latency, Simulator
+from momo_api.support.codec import JsonCodec, available_codecs, default_codec, get_codec
+from momo_api.support.transport import AsyncHttpTransport, HttpTransport
+
+MODES = ("sequential", "threaded", "async")
+PHONE = "242060000000"
+
+Call = Callable[[int], Any]
+AsyncCall = Callable[[int], Awaitable[Any]]
+
+
+def _mtn_config() -> Config:
+    return Config.collection("bench-key", "bench-user", "bench-secret")
+
+
+def _airtel_config() -> AirtelConfig:
+    return AirtelConfig.disbursement("bench-client", "bench-secret", "bench-pin")
+
+
+def _payment(i: int) -> PaymentRequest:
+    return PaymentRequest.make(amount="100", payer=PHONE, external_id=f"bench-{i}")
+
+
+def _transfer(i: int) -> TransferRequest:
+    return TransferRequest.make(amount="100", payee=PHONE, external_id=f"bench-{i}")
+
+
+@dataclass
+class Scenario:
+    """A client call to measure, built against the simulator's URL."""
+
+    name: str
+    build: Callable[[str, HttpTransport, JsonCodec], Call]
+    abuild: Callable[[str, AsyncHttpTransport, JsonCodec], AsyncCall]
+
+
+def _mtn_request_to_pay(url: str, transport: HttpTransport, codec: JsonCodec) -> Call:
+    api = CollectionApi(_mtn_config(), url, "sandbox", transport, codec=codec)
+    return lambda i: api.request_to_pay(_payment(i))
+
+
+def _amtn_request_to_pay(url: str, transport: AsyncHttpTransport, codec: JsonCodec) -> AsyncCall:
+    api = AsyncCollectionApi(_mtn_config(), url, "sandbox", transport, codec=codec)
+    return lambda i: api.request_to_pay(_payment(i))
+
+
+def _mtn_payment_status(url: str, transport: HttpTransport, codec: JsonCodec) -> Call:
+    api = CollectionApi(_mtn_config(), url, "sandbox", transport, codec=codec)
+    reference_id = api.request_to_pay(_payment(-1))
+    return lambda i: api.get_payment_status(reference_id)
+
+
+def _amtn_payment_status(url: str, transport: AsyncHttpTransport, codec: JsonCodec) -> AsyncCall:
+    api = AsyncCollectionApi(_mtn_config(), url, "sandbox", transport, codec=codec)
+    reference_id: List[str] = []
+
+    async def call(i: int) -> Any:
+        if not reference_id:
+            reference_id.append(await api.request_to_pay(_payment(-1)))
+        return await api.get_payment_status(reference_id[0])
+
+    return call
+
+
+def _mtn_transfer(url: str, transport: HttpTransport, codec: JsonCodec) -> Call:
+    api = DisbursementApi(_mtn_config(), url, "sandbox", transport, codec=codec)
+    return lambda i: api.transfer(_transfer(i))
+
+
+def _amtn_transfer(url: str, transport: AsyncHttpTransport, codec: JsonCodec) -> AsyncCall:
+    api = AsyncDisbursementApi(_mtn_config(), url, "sandbox", transport, codec=codec)
+    return lambda i: api.transfer(_transfer(i))
+
+
+def _airtel_request_to_pay(url: str, transport: HttpTransport, codec: JsonCodec) -> Call:
+    api = AirtelCollectionApi(_airtel_config(), url, transport, codec=codec)
+    return lambda i: api.request_to_pay("100", PHONE, f"bench-{i}")
+
+
+def _aairtel_request_to_pay(
+    url: str, transport: AsyncHttpTransport, codec: JsonCodec
+) -> AsyncCall:
+    api = AsyncAirtelCollectionApi(_airtel_config(), url, transport, codec=codec)
+    return lambda i: api.request_to_pay("100", PHONE, f"bench-{i}")
+
+
+def _airtel_transfer(url: str, transport: HttpTransport, codec: JsonCodec) -> Call:
+    api = AirtelDisbursementApi(_airtel_config(), url, transport, codec=codec)
+    return lambda i: api.transfer("100", PHONE, f"bench-{i}")
+
+
+def _aairtel_transfer(url: str, transport: AsyncHttpTransport, codec: JsonCodec) -> AsyncCall:
+    api = AsyncAirtelDisbursementApi(_airtel_config(), url, transport, codec=codec)
+    return lambda i: api.transfer("100", PHONE, f"bench-{i}")
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("mtn.collection.request_to_pay", _mtn_request_to_pay, _amtn_request_to_pay),
+        Scenario("mtn.collection.payment_status", _mtn_payment_status, _amtn_payment_status),
+        Scenario("mtn.disbursement.transfer", _mtn_transfer, _amtn_transfer),
+        Scenario(
+            "airtel.collection.request_to_pay", _airtel_request_to_pay, _aairtel_request_to_pay
+        ),
+        Scenario("airtel.disbursement.transfer", _airtel_transfer, _aairtel_transfer),
+    )
+}
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted ``samples``."""
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, max(0, math.ceil(q * len(samples)) - 1))]
+
+
+def _timed(call: Call, i: int, latencies: List[float]) -> bool:
+    started = time.perf_counter()
+    try:
+        call(i)
+    except Exception:
+        return False
+    latencies.append(time.perf_counter() - started)
+    return True
+
+
+def run_sequential(call: Call, requests: int) -> List[float]:
+    latencies: List[float] = []
+    for i in range(requests):
+        _timed(call, i, latencies)
+    return latencies
+
+
+def run_threaded(call: Call, requests: int, concurrency: int) -> List[float]:
+    latencies: List[float] = []
+    counter = itertools.count()
+
+    def worker() -> None:
+        # next() on itertools.count is atomic, so workers never share an index.
+        i = next(counter)
+        while i < requests:
+            _timed(call, i, latencies)
+            i = next(counter)
+
+    with ThreadPoolExecutor(concurrency, thread_name_prefix="momo-bench") as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    return latencies
+
+
+async def run_async(call: AsyncCall, requests: int, concurrency: int) -> List[float]:
+    latencies: List[float] = []
+    counter = itertools.count()
+
+    async def worker() -> None:
+        i = next(counter)
+        while i < requests:
+            started = time.perf_counter()
+            try:
+                await call(i)
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                pass
+            i = next(counter)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def measure_allocations(call: Call, requests: int) -> Dict[str, float]:
+    """Memory allocated by ``requests`` sequential calls, traced with tracemalloc.
+
+    ``net_*`` is what the calls left allocated (a leak shows up there);
+    ``peak_bytes`` is the largest transient footprint above the start.
+    """
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        for i in range(requests):
+            call(i)
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "net_blocks_per_call": (sys.getallocatedblocks() - blocks) / requests,
+        "net_bytes_per_call": (current - start) / requests,
+        "peak_bytes": float(peak - start),
+    }
+
+
+def _summary(
+    scenario: str, mode: str, requests: int, latencies: List[float], elapsed: float
+) -> Dict[str, Any]:
+    latencies.sort()
+    return {
+        "scenario": scenario,
+        "mode": mode,
+        "requests": requests,
+        "errors": requests - len(latencies),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "latency": {
+            "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else 0.0,
+        },
+    }
+
+
+def run_scenario(
+    scenario: Scenario,
+    url: str,
+    mode: str,
+    requests: int,
+    concurrency: int,
+    warmup: int = 10,
+    allocations: int = 0,
+    codec: Optional[JsonCodec] = None,
+) -> Dict[str, Any]:
+    """Measure one scenario in one mode; each run gets a fresh pooled transport."""
+    codec = codec or default_codec()
+    if mode == "async":
+        async def main() -> Dict[str, Any]:
+            async with AsyncHttpTransport() as transport:
+                call = scenario.abuild(url, transport, codec)
+                await run_async(call, warmup, concurrency)
+                started = time.perf_counter()
+                latencies = await run_async(call, requests, concurrency)
+                elapsed = time.perf_counter() - started
+            return _summary(scenario.name, mode, requests, latencies, elapsed)
+
+        return asyncio.run(main())
+
+    with HttpTransport() as transport:
+        call = scenario.build(url, transport, codec)
+        run_sequential(call, warmup)
+        started = time.perf_counter()
+        if mode == "sequential":
+            latencies = run_sequential(call, requests)
+        else:
+            latencies = run_threaded(call, requests, concurrency)
+        elapsed = time.perf_counter() - started
+        result = _summary(scenario.name, mode, requests, latencies, elapsed)
+        if allocations and mode == "sequential":
+            result["allocations"] = measure_allocations(call, allocations)
+    return result
+
+
+def measure_codecs(iterations: int = 20_000) -> Dict[str, Dict[str, float]]:
+    """Encode a payment body and decode a status body with every installed codec."""
+    body = _payment(0).to_dict()
+    status = json.dumps({**body, "financialTransactionId": "111222333", "status": "SUCCESSFUL"})
+    raw = status.encode()
+    results = {}
+    for name, codec in available_codecs().items():
+        started = time.perf_counter()
+        for _ in range(iterations):
+            codec.dumps(body)
+        encoded = time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(iterations):
+            codec.loads(raw)
+        decoded = time.perf_counter() - started
+        results[name] = {
+            "encodes_per_second": iterations / encoded,
+            "decodes_per_second": iterations / decoded,
+        }
+    return results
+
+
+def run(
+    scenarios: Optional[Sequence[str]] = None,
+    modes: Sequence[str] = MODES,
+    requests: int = 500,
+    concurrency: int = 16,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    allocations: int = 100,
+    url: Optional[str] = None,
+    codec: Optional[str] = None,
+    codec_iterations: int = 20_000,
+) -> Dict[str, Any]:
+    """Run the benchmarks and return the JSON-serialisable report.
+
+    Without ``url`` a :class:`~momo_api.simulator.Simulator` answering
+    after ``latency`` plus up to ``jitter`` seconds is started in a thread.
+    The clients use the ``codec`` JSON codec (the default one unless
+    named); every installed codec is also timed on its own.
+    """
+    json_codec = get_codec(codec) if codec else default_codec()
+    names = list(scenarios or SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(unknown)}")
+    report: Dict[str, Any] = {
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "httpx": httpx.__version__,
+            "codec": json_codec.name,
+        },
+        "settings": {
+            "requests": requests,
+            "concurrency": concurrency,
+            "latency": latency,
+            "jitter": jitter,
+        },
+        "codecs": measure_codecs(codec_iterations) if codec_iterations else {},
+        "results": [],
+    }
+    simulator = None
+    if url is None:
+        delay = Latency.uniform(latency, latency + jitter) if jitter else Latency.constant(latency)
+        simulator = Simulator(latency=delay).start_in_thread()
+    try:
+        base_url = url if simulator is None else simulator.url
+        for name in names:
+            for mode in modes:
+                report["results"].append(
+                    run_scenario(
+                        SCENARIOS[name],
+                        base_url,
+                        mode,
+                        requests,
+                        concurrency,
+                        allocations=allocations,
+                        codec=json_codec,
+                    )
+                )
+    finally:
+        if simulator is not None:
+            simulator.stop_in_thread()
+    return report
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    parser.add_argument("--mode", action="append", choices=MODES)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.0, help="server delay, seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay, seconds")
+    parser.add_argument("--allocations", type=int, default=100, help="calls traced, 0 to skip")
+    parser.add_argument("--url", help="benchmark an already running provider instead")
+    parser.add_argument("--codec", choices=sorted(available_codecs()), help="JSON codec")
+    parser.add_argument(
+        "--codec-iterations", type=int, default=20_000, help="codec timing loops, 0 to skip"
+    )
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = run(
+        scenarios=args.scenario,
+        modes=args.mode or MODES,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        latency=args.latency,
+        jitter=args.jitter,
+        allocations=args.allocations,
+        url=args.url,
+        codec=args.codec,
+        codec_iterations=args.codec_iterations,
+    )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,39 @@
 from .client import MomoApi
+from .products.collection import AsyncCollectionApi
+from .products.disbursement import AsyncDisbursementApi
 from .models.payment_request import PaymentRequest
 from .models.transfer_request import TransferRequest
 from .models.refund_request import RefundRequest
 from .models.transaction import Transaction
 from .models.account_balance import AccountBalance
 from .models.api_token import ApiToken
+from .models.batch_result import BatchResult
+from .models.transaction_batch import TransactionBatch
+from .support.account_cache import AccountHolderCache
+from .support.callbacks import CallbackEvent, CallbackReceiver
+from .support.circuit_breaker import CircuitBreaker, CircuitState
+from .support.codec import JsonCodec, get_codec
+from .support.handles import PaymentHandle, PaymentTracker
+from .support.idempotency import Idempotency
+from .support.instrumentation import RequestEvent, RequestObserver
+from .support.pipeline import ProductOptions
+from .support.metrics import MetricsCollector, render_prometheus
+from .support.poller import PollResult, StatusPoller
+from .support.rate_limit import RateLimit, RateLimiter, SharedBucketStore
+from .support.retry import RetryPolicy
+from .support.single_flight import SingleFlight
+from .support.status_cache import SqliteStatusStore, StatusCache
+from .support.transport import AsyncHttpTransport, HttpTransport, PoolStats
 from .exceptions import (
     MomoException,
     BadRequestException,
     ResourceNotFoundException,
     ConflictException,
+    TooManyRequestsException,
     InternalServerErrorException,
+    CircuitOpenException,
+    PaymentTimeoutException,
+    IdempotencyConflictException,
     InvalidSubscriptionKeyException,
 )
 from .airtel import (
@@ -19,25 +42,64 @@ from .airtel import (
     AirtelCollectionApi,
     AirtelDisbursementApi,
     AirtelTransaction,
+    AsyncAirtelCollectionApi,
+    AsyncAirtelDisbursementApi,
 )
 
 __all__ = [
     "MomoApi",
+    "AsyncCollectionApi",
+    "AsyncDisbursementApi",
     "PaymentRequest",
     "TransferRequest",
     "RefundRequest",
     "Transaction",
     "AccountBalance",
     "ApiToken",
+    "BatchResult",
+    "TransactionBatch",
+    "HttpTransport",
+    "AsyncHttpTransport",
+    "PoolStats",
+    "StatusPoller",
+    "PollResult",
+    "RateLimit",
+    "RateLimiter",
+    "SharedBucketStore",
+    "RetryPolicy",
+    "CircuitBreaker",
+    "CircuitState",
+    "CallbackReceiver",
+    "CallbackEvent",
+    "PaymentHandle",
+    "PaymentTracker",
+    "AccountHolderCache",
+    "SingleFlight",
+    "StatusCache",
+    "SqliteStatusStore",
+    "Idempotency",
+    "ProductOptions",
+    "RequestEvent",
+    "RequestObserver",
+    "MetricsCollector",
+    "render_prometheus",
+    "JsonCodec",
+    "get_codec",
     "MomoException",
     "BadRequestException",
     "ResourceNotFoundException",
     "ConflictException",
+    "TooManyRequestsException",
     "InternalServerErrorException",
+    "CircuitOpenException",
+    "PaymentTimeoutException",
+    "IdempotencyConflictException",
     "InvalidSubscriptionKeyException",
     "AirtelApi",
     "AirtelConfig",
     "AirtelCollectionApi",
     "AirtelDisbursementApi",
     "AirtelTransaction",
+    "AsyncAirtelCollectionApi",
+    "AsyncAirtelDisbursementApi",
 ]
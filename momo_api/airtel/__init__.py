@@ -1,7 +1,7 @@
 from .api import AirtelApi
-from .collection import AirtelCollectionApi
+from .collection import AirtelCollectionApi, AsyncAirtelCollectionApi
 from .config import AirtelConfig
-from .disbursement import AirtelDisbursementApi
+from .disbursement import AirtelDisbursementApi, AsyncAirtelDisbursementApi
 from .transaction import AirtelTransaction
 
 __all__ = [
@@ -10,4 +10,6 @@ __all__ = [
     "AirtelCollectionApi",
     "AirtelDisbursementApi",
     "AirtelTransaction",
+    "AsyncAirtelCollectionApi",
+    "AsyncAirtelDisbursementApi",
 ]
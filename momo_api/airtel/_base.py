@@ -0,0 +1,155 @@
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from ..models.account_balance import AccountBalance
+from ..models.api_token import ApiToken
+from ..support.endpoints import ENDPOINT_BALANCE, ENDPOINT_TOKEN
+from ..support.pipeline import AsyncRequestPipeline, ProductBase, ProductOptions, RequestPipeline
+from ..support.transport import AsyncHttpTransport, HttpTransport
+from .config import AirtelConfig
+
+
+class AirtelProduct(ProductBase):
+    """Request building shared by the Airtel Money product clients."""
+
+    PROVIDER = "airtel"
+    UNSUPPORTED_OPTIONS = ("account_cache", "lazy_transactions")
+
+    def __init__(
+        self,
+        config: AirtelConfig,
+        base_url: str,
+        options: Optional[ProductOptions] = None,
+        **overrides: Any,
+    ) -> None:
+        environment = urlparse(base_url.rstrip("/")).netloc
+        super().__init__(
+            config, base_url, environment, config.client_id, config.client_id,
+            options, **overrides,
+        )
+
+    def _circuit_key(self, url: str) -> str:
+        # Airtel splits its API into merchant, standard and auth products.
+        product = url[len(self._base_url):].lstrip("/").split("/", 1)[0]
+        return f"{self._base_url}/{product}"
+
+    def _token_payload(self) -> dict:
+        return {
+            "client_id": self._config.client_id,
+            "client_secret": self._config.client_secret,
+            "grant_type": "client_credentials",
+        }
+
+    def _parse_token(self, response: httpx.Response) -> ApiToken:
+        self._raise_for_status(response)
+        data = self._codec.loads(response.content)
+        return ApiToken(
+            access_token=str(data["access_token"]),
+            token_type=str(data.get("token_type", "Bearer")),
+            expires_in=int(data.get("expires_in", 3600)),
+        )
+
+    def _headers(self, token: str) -> dict:
+        return {
+            "Authorization": f"Bearer {token}",
+            "X-Country": self._config.country,
+            "X-Currency": self._config.currency,
+            "Accept": "*/*",
+        }
+
+    def _parse_balance(self, response: httpx.Response) -> AccountBalance:
+        self._raise_for_status(response)
+        data = self._codec.loads(response.content).get("data", {})
+        return AccountBalance.parse({
+            "availableBalance": str(data.get("balance", "0")),
+            "currency": str(data.get("currency", "")),
+        })
+
+
+class AirtelClient(AirtelProduct, RequestPipeline):
+    """The calls every sync Airtel Money product offers."""
+
+    def __init__(
+        self,
+        config: AirtelConfig,
+        base_url: str,
+        transport: Optional[HttpTransport] = None,
+        options: Optional[ProductOptions] = None,
+        **overrides: Any,
+    ) -> None:
+        super().__init__(config, base_url, options, **overrides)
+        self._transport = transport or HttpTransport.default()
+
+    def _fetch_access_token(self) -> ApiToken:
+        url = f"{self._base_url}/auth/oauth2/token"
+        response = self._send(
+            ENDPOINT_TOKEN, "POST", url,
+            content=self._codec.dumps(self._token_payload()),
+            headers={"Content-Type": "application/json", "Accept": "*/*"},
+        )
+        return self._parse_token(response)
+
+    def get_access_token(self) -> str:
+        """Obtain a cached OAuth2 access token."""
+        return self._cached_token().access_token
+
+    def get_balance(self) -> AccountBalance:
+        """Get the account balance."""
+        token = self.get_access_token()
+        url = f"{self._base_url}/standard/v1/users/balance"
+        response = self._send(ENDPOINT_BALANCE, "GET", url, headers=self._headers(token))
+        return self._parse_balance(response)
+
+
+class AsyncAirtelClient(AirtelProduct, AsyncRequestPipeline):
+    """The calls every asyncio Airtel Money product offers.
+
+    Without an explicit ``transport`` the client owns its own
+    :class:`AsyncHttpTransport`, released by :meth:`aclose`.
+    """
+
+    def __init__(
+        self,
+        config: AirtelConfig,
+        base_url: str,
+        transport: Optional[AsyncHttpTransport] = None,
+        options: Optional[ProductOptions] = None,
+        **overrides: Any,
+    ) -> None:
+        super().__init__(config, base_url, options, **overrides)
+        self._owns_transport = transport is None
+        self._transport = transport or AsyncHttpTransport()
+
+    async def aclose(self) -> None:
+        """Close the transport if this client created it."""
+        if self._owns_transport:
+            await self._transport.aclose()
+
+    async def __aenter__(self) -> Any:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    async def _fetch_access_token(self) -> ApiToken:
+        url = f"{self._base_url}/auth/oauth2/token"
+        response = await self._send(
+            ENDPOINT_TOKEN, "POST", url,
+            content=self._codec.dumps(self._token_payload()),
+            headers={"Content-Type": "application/json", "Accept": "*/*"},
+        )
+        return self._parse_token(response)
+
+    async def get_access_token(self) -> str:
+        """Obtain a cached OAuth2 access token."""
+        token = await self._cached_token()
+        return token.access_token
+
+    async def get_balance(self) -> AccountBalance:
+        """Get the account balance."""
+        token = await self.get_access_token()
+        url = f"{self._base_url}/standard/v1/users/balance"
+        response = await self._send(ENDPOINT_BALANCE, "GET", url, headers=self._headers(token))
+        return self._parse_balance(response)
@@ -1,6 +1,9 @@
-from .collection import AirtelCollectionApi
+from typing import Any, Optional
+
+from ..support.transport import AsyncHttpTransport, HttpTransport
+from .collection import AirtelCollectionApi, AsyncAirtelCollectionApi
 from .config import AirtelConfig
-from .disbursement import AirtelDisbursementApi
+from .disbursement import AirtelDisbursementApi, AsyncAirtelDisbursementApi
 
 ENVIRONMENT_PRODUCTION = "production"
 ENVIRONMENT_STAGING = "staging"
@@ -10,33 +13,140 @@ STAGING_URL = "https://openapiuat.airtel.cg"
 
 
 class AirtelApi:
-    """Entry point for the Airtel Money API."""
+    """Entry point for the Airtel Money API.
+
+    Products built from an instance use its transport, so :meth:`close`
+    (or :meth:`aclose` for the async products) releases their connections.
+    """
 
     ENVIRONMENT_PRODUCTION = ENVIRONMENT_PRODUCTION
     ENVIRONMENT_STAGING = ENVIRONMENT_STAGING
     PRODUCTION_URL = PRODUCTION_URL
     STAGING_URL = STAGING_URL
 
-    def __init__(self, base_url: str) -> None:
+    def __init__(self, base_url: str, transport: Optional[HttpTransport] = None) -> None:
         self._base_url = base_url
+        self._transport = transport or HttpTransport()
+        self._async_transport: Optional[AsyncHttpTransport] = None
 
     @classmethod
-    def create(cls, mode: str = ENVIRONMENT_STAGING) -> "AirtelApi":
+    def create(
+        cls, mode: str = ENVIRONMENT_STAGING, transport: Optional[HttpTransport] = None
+    ) -> "AirtelApi":
         base_url = PRODUCTION_URL if mode == ENVIRONMENT_PRODUCTION else STAGING_URL
-        return cls(base_url)
+        return cls(base_url, transport)
+
+    @property
+    def transport(self) -> HttpTransport:
+        return self._transport
+
+    def close(self) -> None:
+        """Close the pooled connections held by this client's transport."""
+        self._transport.close()
+
+    async def aclose(self) -> None:
+        """Close this client's transports, including the one of its async products."""
+        self._transport.close()
+        if self._async_transport is not None:
+            await self._async_transport.aclose()
+
+    def __enter__(self) -> "AirtelApi":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    async def __aenter__(self) -> "AirtelApi":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    def _shared_async_transport(self) -> AsyncHttpTransport:
+        if self._async_transport is None:
+            self._async_transport = AsyncHttpTransport()
+        return self._async_transport
 
-    def get_collection(self, config: AirtelConfig) -> AirtelCollectionApi:
-        return AirtelCollectionApi(config, self._base_url)
+    def get_collection(self, config: AirtelConfig, **options: Any) -> AirtelCollectionApi:
+        return AirtelCollectionApi(config, self._base_url, self._transport, **options)
 
-    def get_disbursement(self, config: AirtelConfig) -> AirtelDisbursementApi:
-        return AirtelDisbursementApi(config, self._base_url)
+    def get_disbursement(
+        self, config: AirtelConfig, **options: Any
+    ) -> AirtelDisbursementApi:
+        return AirtelDisbursementApi(config, self._base_url, self._transport, **options)
+
+    def get_async_collection(
+        self,
+        config: AirtelConfig,
+        transport: Optional[AsyncHttpTransport] = None,
+        **options: Any,
+    ) -> AsyncAirtelCollectionApi:
+        """Build an async collection client on this instance's async transport.
+
+        All async products of the instance share that transport unless given
+        one; it is closed by :meth:`aclose`.
+        """
+        transport = transport or self._shared_async_transport()
+        return AsyncAirtelCollectionApi(config, self._base_url, transport, **options)
+
+    def get_async_disbursement(
+        self,
+        config: AirtelConfig,
+        transport: Optional[AsyncHttpTransport] = None,
+        **options: Any,
+    ) -> AsyncAirtelDisbursementApi:
+        """Build an async disbursement client on this instance's async transport.
+
+        All async products of the instance share that transport unless given
+        one; it is closed by :meth:`aclose`.
+        """
+        transport = transport or self._shared_async_transport()
+        return AsyncAirtelDisbursementApi(config, self._base_url, transport, **options)
 
     @classmethod
-    def collection(cls, mode: str, config: AirtelConfig) -> AirtelCollectionApi:
+    def collection(
+        cls,
+        mode: str,
+        config: AirtelConfig,
+        transport: Optional[HttpTransport] = None,
+        **options: Any,
+    ) -> AirtelCollectionApi:
         """Shorthand factory for the Collection API."""
-        return cls.create(mode).get_collection(config)
+        api = cls.create(mode, transport or HttpTransport.default())
+        return api.get_collection(config, **options)
 
     @classmethod
-    def disbursement(cls, mode: str, config: AirtelConfig) -> AirtelDisbursementApi:
+    def disbursement(
+        cls,
+        mode: str,
+        config: AirtelConfig,
+        transport: Optional[HttpTransport] = None,
+        **options: Any,
+    ) -> AirtelDisbursementApi:
         """Shorthand factory for the Disbursement API."""
-        return cls.create(mode).get_disbursement(config)
+        api = cls.create(mode, transport or HttpTransport.default())
+        return api.get_disbursement(config, **options)
+
+    @classmethod
+    def async_collection(
+        cls,
+        mode: str,
+        config: AirtelConfig,
+        transport: Optional[AsyncHttpTransport] = None,
+        **options: Any,
+    ) -> AsyncAirtelCollectionApi:
+        """Shorthand factory for the asyncio Collection API."""
+        base_url = PRODUCTION_URL if mode == ENVIRONMENT_PRODUCTION else STAGING_URL
+        return AsyncAirtelCollectionApi(config, base_url, transport, **options)
+
+    @classmethod
+    def async_disbursement(
+        cls,
+        mode: str,
+        config: AirtelConfig,
+        transport: Optional[AsyncHttpTransport] = None,
+        **options: Any,
+    ) -> AsyncAirtelDisbursementApi:
+        """Shorthand factory for the asyncio Disbursement API."""
+        base_url = PRODUCTION_URL if mode == ENVIRONMENT_PRODUCTION else STAGING_URL
+        return AsyncAirtelDisbursementApi(config, base_url, transport, **options)
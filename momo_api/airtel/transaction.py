@@ -1,7 +1,10 @@
 from dataclasses import dataclass
 from typing import Optional
 
+from ..models._slots import slotted
 
+
+@slotted()
 @dataclass
 class AirtelTransaction:
     """Represents an Airtel Money transaction.
@@ -0,0 +1,31 @@
+from .payout import (
+    PayoutCheckpoint,
+    PayoutEngine,
+    PayoutResult,
+    PayoutRow,
+    read_csv,
+    read_jsonl,
+)
+from .reconcile import (
+    LedgerRow,
+    ReconcileEngine,
+    ReconcileResult,
+    ReconcileSummary,
+    read_ledger_csv,
+    read_ledger_jsonl,
+)
+
+__all__ = [
+    "PayoutCheckpoint",
+    "PayoutEngine",
+    "PayoutResult",
+    "PayoutRow",
+    "read_csv",
+    "read_jsonl",
+    "LedgerRow",
+    "ReconcileEngine",
+    "ReconcileResult",
+    "ReconcileSummary",
+    "read_ledger_csv",
+    "read_ledger_jsonl",
+]
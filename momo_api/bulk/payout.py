@@ -0,0 +1,425 @@
+import csv
+import json
+import math
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set, Tuple, Union
+
+import httpx
+
+from ..airtel.disbursement import AirtelDisbursementApi
+from ..exceptions import ConflictException, MomoException
+from ..models.payment_request import PaymentRequest
+from ..models.transfer_request import TransferRequest
+from ..products.disbursement import DisbursementApi
+from ..support.concurrency import bounded_imap
+from ..support.idempotency import _rejected
+
+
+@dataclass
+class PayoutRow:
+    """One payout read from an input file.
+
+    ``offset`` and ``end_offset`` are the byte positions of the row in its
+    file; the engine uses them to resume without re-reading finished rows.
+    """
+
+    external_id: str
+    phone: str
+    amount: str
+    currency: str = "XAF"
+    payer_message: str = ""
+    payee_note: str = ""
+    offset: int = 0
+    end_offset: int = 0
+
+    @classmethod
+    def from_dict(cls, data: dict, offset: int = 0, end_offset: int = 0) -> "PayoutRow":
+        return cls(
+            external_id=str(data["external_id"]),
+            phone=str(data["phone"]),
+            amount=str(data["amount"]),
+            currency=str(data.get("currency") or "XAF"),
+            payer_message=str(data.get("payer_message") or ""),
+            payee_note=str(data.get("payee_note") or ""),
+            offset=offset,
+            end_offset=end_offset,
+        )
+
+
+def read_csv(path: str, start_offset: int = 0) -> Iterator[PayoutRow]:
+    """Stream payout rows from a CSV file with a header line.
+
+    Expected columns: ``external_id``, ``phone``, ``amount`` and optionally
+    ``currency``, ``payer_message``, ``payee_note``. Quoted fields must not
+    span several lines.
+    """
+    with open(path, "rb") as f:
+        header = next(csv.reader([f.readline().decode("utf-8-sig")]))
+        if start_offset > f.tell():
+            f.seek(start_offset)
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            if not line:
+                return
+            if not line.strip():
+                continue
+            values = next(csv.reader([line.decode("utf-8")]))
+            yield PayoutRow.from_dict(dict(zip(header, values)), offset, f.tell())
+
+
+def read_jsonl(path: str, start_offset: int = 0) -> Iterator[PayoutRow]:
+    """Stream payout rows from a file holding one JSON object per line."""
+    with open(path, "rb") as f:
+        f.seek(start_offset)
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            if not line:
+                return
+            if not line.strip():
+                continue
+            yield PayoutRow.from_dict(json.loads(line), offset, f.tell())
+
+
+@dataclass
+class PayoutResult:
+    """Outcome of one payout row."""
+
+    STATUS_SENT = "sent"
+    STATUS_SKIPPED = "skipped"
+    STATUS_FAILED = "failed"
+    STATUS_UNKNOWN = "unknown"
+    STATUS_DUPLICATE = "duplicate"
+
+    row: PayoutRow
+    reference_id: str
+    status: str
+    error: Optional[Exception] = None
+
+
+class PayoutCheckpoint:
+    """Journal recording the reference assigned to each row.
+
+    The reference is written (and fsynced) *before* the payout is sent, so
+    after a crash every row whose outcome is unknown is resent under the same
+    reference, which the provider rejects as a duplicate if it had already
+    accepted it. ``watermark`` is the input offset before which every row is
+    settled; a resumed run starts reading there, and records before it are
+    dropped whenever it advances.
+
+    Records are appended under a short lock and fsynced outside it: one
+    fsync covers every record written before it started, so concurrent
+    workers share a sync instead of queueing on the disk one by one.
+    """
+
+    STATE_ASSIGNED = "assigned"
+    STATE_SENT = "sent"
+    STATE_FAILED = "failed"
+
+    def __init__(self, path: str, fsync: bool = True) -> None:
+        self._path = path
+        self._fsync = fsync
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._written = 0
+        self._synced = 0
+        self.watermark = 0
+        self._previous: Dict[str, Dict[str, Any]] = {}
+        self._load()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _load(self) -> None:
+        if not os.path.exists(self._path):
+            return
+        with open(self._path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-write.
+                    continue
+                if "watermark" in record:
+                    self.watermark = max(self.watermark, record["watermark"])
+                else:
+                    self._previous[record["external_id"]] = record
+        self._previous = {
+            key: record
+            for key, record in self._previous.items()
+            if record["offset"] >= self.watermark
+        }
+
+    def take(self, external_id: str) -> Optional[Dict[str, Any]]:
+        """Return (and forget) the record a previous run left for ``external_id``."""
+        with self._lock:
+            return self._previous.pop(external_id, None)
+
+    def _write(self, record: dict, sync: bool) -> None:
+        with self._lock:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+            self._written += 1
+            written = self._written
+        if sync and self._fsync:
+            self._sync(written)
+
+    def _sync(self, written: int) -> None:
+        """Make the first ``written`` records durable, sharing an fsync in progress."""
+        with self._sync_lock:
+            if self._synced >= written:
+                return
+            with self._lock:
+                target = self._written
+                fd = self._file.fileno()
+            os.fsync(fd)
+            self._synced = target
+
+    def record(self, row: PayoutRow, reference_id: str, state: str) -> None:
+        self._write(
+            {
+                "external_id": row.external_id,
+                "reference_id": reference_id,
+                "state": state,
+                "offset": row.offset,
+            },
+            sync=state == self.STATE_ASSIGNED,
+        )
+
+    def advance(self, watermark: int) -> None:
+        """Move the watermark to ``watermark`` and compact the journal.
+
+        The journal is rewritten to hold the new watermark and the records
+        of rows at or beyond it, which are the only ones a resumed run
+        reads, so it stays as small as the window of open rows.
+        """
+        if watermark <= self.watermark:
+            return
+        with self._sync_lock, self._lock:
+            self.watermark = watermark
+            self._file.flush()
+            compacted = self._path + ".tmp"
+            with open(compacted, "w", encoding="utf-8") as dst:
+                dst.write(json.dumps({"watermark": watermark}) + "\n")
+                with open(self._path, encoding="utf-8") as src:
+                    for line in src:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue
+                        if "watermark" not in record and record["offset"] >= watermark:
+                            dst.write(line)
+                dst.flush()
+                if self._fsync:
+                    os.fsync(dst.fileno())
+            self._file.close()
+            os.replace(compacted, self._path)
+            self._file = open(self._path, "a", encoding="utf-8")
+            # The compacted copy holds every record written so far.
+            self._synced = self._written
+
+    def close(self) -> None:
+        with self._sync_lock, self._lock:
+            self._file.close()
+
+
+class PayoutEngine:
+    """Streams payout rows to a disbursement API with a durable checkpoint.
+
+    ``send(row, reference_id)`` performs one payout and returns the
+    reference it went out under: usually ``reference_id``, but a product with
+    an ``idempotency=`` store returns the one already recorded for the row's
+    external ID. That reference is what the journal and the result hold. Use
+    :meth:`for_disbursement` or :meth:`for_airtel` to build it from a
+    product. Results are yielded as rows complete.
+
+    A row repeating the external ID of an earlier row of the input is not
+    sent; its result is ``duplicate``. The external IDs seen are kept for
+    the whole run, one set entry per row.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[PayoutRow, str], Optional[str]],
+        checkpoint: Union[str, PayoutCheckpoint],
+        concurrency: int = 8,
+        checkpoint_every: int = 100,
+        max_settled: int = 10_000,
+    ) -> None:
+        self._send = send
+        if isinstance(checkpoint, str):
+            checkpoint = PayoutCheckpoint(checkpoint)
+        self._checkpoint = checkpoint
+        self._concurrency = concurrency
+        self._checkpoint_every = checkpoint_every
+        self._max_settled = max_settled
+
+    @classmethod
+    def for_disbursement(
+        cls,
+        api: DisbursementApi,
+        checkpoint: Union[str, PayoutCheckpoint],
+        concurrency: int = 8,
+        operation: str = "transfer",
+        checkpoint_every: int = 100,
+        max_settled: int = 10_000,
+    ) -> "PayoutEngine":
+        """Pay rows out with ``DisbursementApi.transfer`` (or ``deposit``)."""
+        if operation not in ("transfer", "deposit"):
+            raise ValueError("operation must be 'transfer' or 'deposit'")
+
+        def send(row: PayoutRow, reference_id: str) -> str:
+            if operation == "deposit":
+                deposit = PaymentRequest.make(
+                    row.amount, row.phone, row.external_id, row.currency,
+                    row.payer_message, row.payee_note,
+                )
+                return api.deposit(deposit, reference_id)
+            transfer = TransferRequest.make(
+                row.amount, row.phone, row.external_id, row.currency,
+                row.payer_message, row.payee_note,
+            )
+            return api.transfer(transfer, reference_id)
+
+        return cls(send, checkpoint, concurrency, checkpoint_every, max_settled)
+
+    @classmethod
+    def for_airtel(
+        cls,
+        api: AirtelDisbursementApi,
+        checkpoint: Union[str, PayoutCheckpoint],
+        concurrency: int = 8,
+        checkpoint_every: int = 100,
+        max_settled: int = 10_000,
+    ) -> "PayoutEngine":
+        """Pay rows out with ``AirtelDisbursementApi.transfer``."""
+
+        def send(row: PayoutRow, reference_id: str) -> str:
+            return api.transfer(row.amount, row.phone, row.external_id, reference_id)
+
+        return cls(send, checkpoint, concurrency, checkpoint_every, max_settled)
+
+    @property
+    def checkpoint(self) -> PayoutCheckpoint:
+        return self._checkpoint
+
+    def _process_claimed(self, claimed: Tuple[PayoutRow, bool]) -> PayoutResult:
+        row, duplicate = claimed
+        if duplicate:
+            return PayoutResult(row, "", PayoutResult.STATUS_DUPLICATE)
+        return self._process(row)
+
+    @staticmethod
+    def _claim(
+        rows: Iterable[PayoutRow], seen: Set[str]
+    ) -> Iterator[Tuple[PayoutRow, bool]]:
+        # Claimed in input order, so the first occurrence is the one sent.
+        for row in rows:
+            yield row, row.external_id in seen
+            seen.add(row.external_id)
+
+    def _process(self, row: PayoutRow) -> PayoutResult:
+        previous = self._checkpoint.take(row.external_id)
+        if previous is not None and previous["state"] == PayoutCheckpoint.STATE_SENT:
+            return PayoutResult(row, previous["reference_id"], PayoutResult.STATUS_SKIPPED)
+
+        resuming = previous is not None
+        reference_id = previous["reference_id"] if resuming else str(uuid.uuid4())
+        self._checkpoint.record(row, reference_id, PayoutCheckpoint.STATE_ASSIGNED)
+        try:
+            reference_id = self._send(row, reference_id) or reference_id
+        except ConflictException as exc:
+            if not resuming:
+                # E.g. a retried request whose first attempt was accepted; the
+                # next run resends under this reference and settles it.
+                return PayoutResult(row, reference_id, PayoutResult.STATUS_UNKNOWN, exc)
+            # The provider already holds this reference: the first attempt went through.
+        except MomoException as exc:
+            if _rejected(exc):
+                self._checkpoint.record(row, reference_id, PayoutCheckpoint.STATE_FAILED)
+                return PayoutResult(row, reference_id, PayoutResult.STATUS_FAILED, exc)
+            # 429, 5xx: the payout may still go through on a later run.
+            return PayoutResult(row, reference_id, PayoutResult.STATUS_UNKNOWN, exc)
+        except httpx.HTTPError as exc:
+            return PayoutResult(row, reference_id, PayoutResult.STATUS_UNKNOWN, exc)
+        self._checkpoint.record(row, reference_id, PayoutCheckpoint.STATE_SENT)
+        return PayoutResult(row, reference_id, PayoutResult.STATUS_SENT)
+
+    def run(
+        self, rows: Iterable[PayoutRow], seen: Optional[Set[str]] = None
+    ) -> Iterator[PayoutResult]:
+        """Pay out ``rows`` concurrently, yielding a result per row.
+
+        ``seen`` holds external IDs already paid out earlier in the input,
+        e.g. before the watermark of a resumed run; rows repeating one of
+        them, or an earlier row, are reported as ``duplicate``.
+
+        Rows with an ``unknown`` outcome (5xx, 429, timeout) hold the watermark
+        back, so the next run re-reads them and resends under the same
+        reference. At most ``max_settled`` rows finished ahead of the
+        watermark are remembered; past that the watermark stops advancing
+        for this run, and the journal lets the next run skip those rows.
+        """
+        watermark = self._checkpoint.watermark
+        next_index = 0
+        # Rows finished ahead of ``next_index``, by index, with their end offset.
+        settled: Dict[int, int] = {}
+        # The first index the watermark cannot pass in this run.
+        horizon = math.inf
+        since_checkpoint = 0
+        try:
+            claimed = self._claim(rows, set() if seen is None else seen)
+            for index, (row, _), result in bounded_imap(
+                self._process_claimed, claimed, self._concurrency
+            ):
+                if result.status == PayoutResult.STATUS_UNKNOWN:
+                    if index < horizon:
+                        horizon = index
+                        settled = {i: end for i, end in settled.items() if i < horizon}
+                elif index < horizon:
+                    settled[index] = row.end_offset
+                while next_index in settled:
+                    watermark = settled.pop(next_index)
+                    next_index += 1
+                if len(settled) > self._max_settled:
+                    horizon = max(settled)
+                    del settled[horizon]
+                since_checkpoint += 1
+                if since_checkpoint >= self._checkpoint_every:
+                    self._checkpoint.advance(watermark)
+                    since_checkpoint = 0
+                yield result
+        finally:
+            self._checkpoint.advance(watermark)
+
+    def run_csv(self, path: str) -> Iterator[PayoutResult]:
+        """Pay out a CSV file, resuming after the checkpoint's watermark."""
+        return self._run_file(read_csv, path)
+
+    def run_jsonl(self, path: str) -> Iterator[PayoutResult]:
+        """Pay out a JSONL file, resuming after the checkpoint's watermark."""
+        return self._run_file(read_jsonl, path)
+
+    def _run_file(
+        self, read: Callable[..., Iterator[PayoutRow]], path: str
+    ) -> Iterator[PayoutResult]:
+        # Rows before the watermark are not paid again, but a later row
+        # repeating one of their external IDs must still count as a duplicate.
+        watermark = self._checkpoint.watermark
+        seen: Set[str] = set()
+        for row in read(path):
+            if row.offset >= watermark:
+                break
+            seen.add(row.external_id)
+        return self.run(read(path, watermark), seen)
+
+    def close(self) -> None:
+        self._checkpoint.close()
+
+    def __enter__(self) -> "PayoutEngine":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
@@ -0,0 +1,289 @@
+import csv
+import json
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, Optional, Union
+
+from ..airtel.collection import AirtelCollectionApi
+from ..airtel.disbursement import AirtelDisbursementApi
+from ..exceptions import ResourceNotFoundException
+from ..models.transaction import Transaction
+from ..products.collection import CollectionApi
+from ..products.disbursement import DisbursementApi
+from ..support.concurrency import ITEM_ERRORS, bounded_imap
+from ..support.poller import is_terminal
+from ..support.status_cache import StatusCache
+
+# Airtel codes and common spellings mapped onto the MTN statuses.
+_STATUSES = {
+    "TS": Transaction.STATUS_SUCCESSFUL,
+    "SUCCESS": Transaction.STATUS_SUCCESSFUL,
+    "TF": Transaction.STATUS_FAILED,
+    "TIP": Transaction.STATUS_PENDING,
+}
+
+REPORT_COLUMNS = (
+    "external_id",
+    "reference_id",
+    "outcome",
+    "ledger_amount",
+    "provider_amount",
+    "ledger_status",
+    "provider_status",
+    "error",
+)
+
+
+def _normalize(status: str) -> str:
+    status = status.strip().upper()
+    return _STATUSES.get(status, status)
+
+
+def _same_amount(a: str, b: str) -> bool:
+    try:
+        return Decimal(a) == Decimal(b)
+    except InvalidOperation:
+        return a.strip() == b.strip()
+
+
+@dataclass
+class LedgerRow:
+    """One entry of the merchant ledger.
+
+    ``status`` is what the ledger recorded for the payment (successful
+    unless given); MTN statuses and Airtel ``TS`` / ``TF`` / ``TIP`` are
+    both understood.
+    """
+
+    external_id: str
+    reference_id: str
+    amount: str
+    status: str = Transaction.STATUS_SUCCESSFUL
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LedgerRow":
+        return cls(
+            external_id=str(data.get("external_id") or ""),
+            reference_id=str(data["reference_id"]),
+            amount=str(data["amount"]),
+            status=str(data.get("status") or Transaction.STATUS_SUCCESSFUL),
+        )
+
+
+def read_ledger_csv(path: str) -> Iterator[LedgerRow]:
+    """Stream ledger rows from a CSV file with a header line.
+
+    Expected columns: ``external_id``, ``reference_id``, ``amount`` and
+    optionally ``status``.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for data in csv.DictReader(f):
+            if data.get("reference_id"):
+                yield LedgerRow.from_dict(data)
+
+
+def read_ledger_jsonl(path: str) -> Iterator[LedgerRow]:
+    """Stream ledger rows from a file holding one JSON object per line."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield LedgerRow.from_dict(json.loads(line))
+
+
+@dataclass
+class ReconcileResult:
+    """How one ledger row compares with the provider's view of it.
+
+    ``cached`` is set when the status came from the known terminal
+    statuses rather than from a request.
+    """
+
+    OUTCOME_MATCHED = "matched"
+    OUTCOME_MISSING = "missing"
+    OUTCOME_AMOUNT_DIFFERS = "amount_differs"
+    OUTCOME_STATUS_DIFFERS = "status_differs"
+    OUTCOME_PENDING = "pending"
+    OUTCOME_ERROR = "error"
+
+    row: LedgerRow
+    outcome: str
+    provider_status: str = ""
+    provider_amount: str = ""
+    cached: bool = False
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.outcome == self.OUTCOME_MATCHED
+
+
+@dataclass
+class ReconcileSummary:
+    """Counts of a reconciliation run, by outcome."""
+
+    rows: int = 0
+    cached: int = 0
+    outcomes: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def mismatches(self) -> int:
+        return self.rows - self.outcomes.get(ReconcileResult.OUTCOME_MATCHED, 0)
+
+    def add(self, result: ReconcileResult) -> None:
+        self.rows += 1
+        self.cached += result.cached
+        self.outcomes[result.outcome] = self.outcomes.get(result.outcome, 0) + 1
+
+
+class ReconcileEngine:
+    """Compares a streamed ledger with the statuses the provider reports.
+
+    ``fetch(reference_id)`` returns the provider's MTN ``Transaction`` or
+    ``AirtelTransaction``; use :meth:`for_collection`, :meth:`for_disbursement`,
+    :meth:`for_airtel_collection` or :meth:`for_airtel_disbursement` to build
+    it from a product, whose rate limiter, retry policy and circuit breaker
+    then apply to every lookup. At most ``concurrency`` lookups run at a
+    time and rows are read lazily, so memory does not grow with the ledger.
+
+    With ``known`` (a :class:`StatusCache`, e.g. over a
+    :class:`SqliteStatusStore` kept between runs) references already seen
+    successful or failed are compared without a request, and every
+    terminal status fetched is added to it. ``key(reference_id)`` names a
+    reference's entry in ``known`` (the reference itself by default); the
+    factories use the product's own status cache keys, so ``known`` can be
+    the product's ``status_cache`` and products under different
+    credentials do not share entries.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Any],
+        concurrency: int = 8,
+        known: Optional[StatusCache] = None,
+        key: Optional[Callable[[str], str]] = None,
+    ) -> None:
+        self._fetch = fetch
+        self._concurrency = concurrency
+        self._known = known
+        self._key = key or str
+
+    @classmethod
+    def for_collection(
+        cls, api: CollectionApi, concurrency: int = 8, known: Optional[StatusCache] = None
+    ) -> "ReconcileEngine":
+        """Check payment requests with ``CollectionApi.get_payment_status``."""
+        def key(reference_id: str) -> str:
+            return api._request_key(api._url(f"v1_0/requesttopay/{reference_id}"))
+
+        return cls(api.get_payment_status, concurrency, known, key)
+
+    @classmethod
+    def for_disbursement(
+        cls,
+        api: DisbursementApi,
+        concurrency: int = 8,
+        known: Optional[StatusCache] = None,
+        operation: str = "transfer",
+    ) -> "ReconcileEngine":
+        """Check transfers (or deposits) with ``DisbursementApi``."""
+        if operation not in ("transfer", "deposit"):
+            raise ValueError("operation must be 'transfer' or 'deposit'")
+        fetch = api.get_deposit_status if operation == "deposit" else api.get_transfer_status
+
+        def key(reference_id: str) -> str:
+            return api._request_key(api._url(f"v1_0/{operation}/{reference_id}"))
+
+        return cls(fetch, concurrency, known, key)
+
+    @classmethod
+    def for_airtel_collection(
+        cls, api: AirtelCollectionApi, concurrency: int = 8, known: Optional[StatusCache] = None
+    ) -> "ReconcileEngine":
+        """Check Airtel payments; the ledger's ``reference_id`` is the externalId.
+
+        Airtel statuses carry no amount, so only the status is compared.
+        """
+        def key(external_id: str) -> str:
+            return api._request_key(f"{api._base_url}/standard/v1/payments/{external_id}")
+
+        return cls(api.get_payment_status, concurrency, known, key)
+
+    @classmethod
+    def for_airtel_disbursement(
+        cls, api: AirtelDisbursementApi, concurrency: int = 8, known: Optional[StatusCache] = None
+    ) -> "ReconcileEngine":
+        """Check Airtel transfers; see :meth:`for_airtel_collection`."""
+        def key(external_id: str) -> str:
+            return api._request_key(f"{api._base_url}/standard/v1/disbursements/{external_id}")
+
+        return cls(api.get_transfer_status, concurrency, known, key)
+
+    def check(self, row: LedgerRow) -> ReconcileResult:
+        """Compare one ledger row with the provider's status for it."""
+        key = self._key(row.reference_id)
+        transaction = self._known.get(key) if self._known is not None else None
+        cached = transaction is not None and is_terminal(transaction)
+        if not cached:
+            try:
+                transaction = self._fetch(row.reference_id)
+            except ResourceNotFoundException as exc:
+                return ReconcileResult(row, ReconcileResult.OUTCOME_MISSING, error=exc)
+            except ITEM_ERRORS as exc:
+                return ReconcileResult(row, ReconcileResult.OUTCOME_ERROR, error=exc)
+            if self._known is not None and is_terminal(transaction):
+                self._known.put(key, transaction)
+
+        status = transaction.status
+        amount = getattr(transaction, "amount", None) or ""
+        if transaction.is_pending():
+            outcome = ReconcileResult.OUTCOME_PENDING
+        elif _normalize(status) != _normalize(row.status):
+            outcome = ReconcileResult.OUTCOME_STATUS_DIFFERS
+        elif amount and not _same_amount(amount, row.amount):
+            outcome = ReconcileResult.OUTCOME_AMOUNT_DIFFERS
+        else:
+            outcome = ReconcileResult.OUTCOME_MATCHED
+        return ReconcileResult(row, outcome, status, amount, cached)
+
+    def run(self, rows: Iterable[LedgerRow]) -> Iterator[ReconcileResult]:
+        """Check ``rows`` concurrently, yielding a result per row as it completes."""
+        for _, _, result in bounded_imap(self.check, rows, self._concurrency):
+            yield result
+
+    def reconcile(
+        self, rows: Iterable[LedgerRow], report: Union[str, IO[str]]
+    ) -> ReconcileSummary:
+        """Check ``rows`` and write every mismatch to ``report`` as CSV.
+
+        ``report`` is a path or a text file; rows are written as they are
+        checked, with the columns of :data:`REPORT_COLUMNS`.
+        """
+        if isinstance(report, str):
+            with open(report, "w", newline="", encoding="utf-8") as f:
+                return self.reconcile(rows, f)
+        writer = csv.writer(report)
+        writer.writerow(REPORT_COLUMNS)
+        summary = ReconcileSummary()
+        for result in self.run(rows):
+            summary.add(result)
+            if result.ok:
+                continue
+            writer.writerow((
+                result.row.external_id,
+                result.row.reference_id,
+                result.outcome,
+                result.row.amount,
+                result.provider_amount,
+                result.row.status,
+                result.provider_status,
+                "" if result.error is None else repr(result.error),
+            ))
+        return summary
+
+    def reconcile_csv(self, ledger: str, report: Union[str, IO[str]]) -> ReconcileSummary:
+        """Reconcile a CSV ledger file; see :meth:`reconcile`."""
+        return self.reconcile(read_ledger_csv(ledger), report)
+
+    def reconcile_jsonl(self, ledger: str, report: Union[str, IO[str]]) -> ReconcileSummary:
+        """Reconcile a JSONL ledger file; see :meth:`reconcile`."""
+        return self.reconcile(read_ledger_jsonl(ledger), report)
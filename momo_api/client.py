@@ -1,11 +1,32 @@
+import types
+from typing import Any, Callable, Optional, Union
+
 from .models.config import Config
-from .products.collection import CollectionApi
-from .products.disbursement import DisbursementApi
+from .products.collection import AsyncCollectionApi, CollectionApi
+from .products.disbursement import AsyncDisbursementApi, DisbursementApi
 from .products.sandbox import SandboxApi
+from .support.transport import AsyncHttpTransport, HttpTransport
+
+
+class _hybridmethod:
+    """Like ``classmethod``, but binds to the instance when called on one."""
+
+    def __init__(self, func: Callable[..., Any]) -> None:
+        self.__func__ = func
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance: Any, owner: type) -> Callable[..., Any]:
+        return types.MethodType(self.__func__, owner if instance is None else instance)
 
 
 class MomoApi:
-    """Entry point for the MTN MoMo API client."""
+    """Entry point for the MTN MoMo API client.
+
+    The product factories work on the class, sharing the process-wide
+    transport, or on an instance, whose transport they inject into every
+    product so that :meth:`close` (or :meth:`aclose` for the async products)
+    releases their connections.
+    """
 
     # Supported target environments
     ENVIRONMENT_MTN_CONGO = "mtncongo"
@@ -24,22 +45,70 @@ class MomoApi:
     SANDBOX_URL = "https://sandbox.momodeveloper.mtn.com"
     PRODUCTION_URL = "https://proxy.momoapi.mtn.com"
 
-    def __init__(self, environment: str):
+    def __init__(self, environment: str, transport: Optional[HttpTransport] = None):
         self._environment = environment
         self._base_url = (
             self.SANDBOX_URL
             if environment == self.ENVIRONMENT_SANDBOX
             else self.PRODUCTION_URL
         )
+        self._transport = transport or HttpTransport()
+        self._async_transport: Optional[AsyncHttpTransport] = None
+
+    @property
+    def transport(self) -> HttpTransport:
+        return self._transport
+
+    def close(self) -> None:
+        """Close the pooled connections held by this client's transport."""
+        self._transport.close()
+
+    async def aclose(self) -> None:
+        """Close this client's transports, including the one of its async products."""
+        self._transport.close()
+        if self._async_transport is not None:
+            await self._async_transport.aclose()
+
+    def __enter__(self) -> "MomoApi":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    async def __aenter__(self) -> "MomoApi":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    def _shared_async_transport(self) -> AsyncHttpTransport:
+        if self._async_transport is None:
+            self._async_transport = AsyncHttpTransport()
+        return self._async_transport
 
     # ------------------------------------------------------------------
-    # Class-level factory helpers
+    # Factory helpers, usable on the class or on an instance
     # ------------------------------------------------------------------
 
     @classmethod
-    def create(cls, environment: str) -> "MomoApi":
+    def create(
+        cls, environment: str, transport: Optional[HttpTransport] = None
+    ) -> "MomoApi":
         """Create a MomoApi instance for the given environment."""
-        return cls(environment)
+        return cls(environment, transport)
+
+    @_hybridmethod
+    def _product_args(target: Union["MomoApi", type], config: dict) -> tuple:
+        """``(config, base_url, environment)`` for a product built from ``config``.
+
+        On an instance the environment defaults to the instance's own.
+        """
+        if isinstance(target, MomoApi):
+            default = target._environment
+        else:
+            default = target.ENVIRONMENT_SANDBOX  # type: ignore[union-attr]
+        environment = config.get("environment", default)
+        return target._build_config(config), target._base_url_for_env(environment), environment
 
     @classmethod
     def _build_config(cls, config: dict) -> Config:
@@ -56,21 +125,77 @@ class MomoApi:
             return cls.SANDBOX_URL
         return cls.PRODUCTION_URL
 
-    @classmethod
-    def collection(cls, config: dict) -> CollectionApi:
-        """Create a CollectionApi instance from a config dict."""
-        environment = config.get("environment", cls.ENVIRONMENT_SANDBOX)
-        cfg = cls._build_config(config)
-        base_url = cls._base_url_for_env(environment)
-        return CollectionApi(cfg, base_url, environment)
+    @_hybridmethod
+    def collection(
+        target: Union["MomoApi", type],
+        config: dict,
+        transport: Optional[HttpTransport] = None,
+        **options: Any,
+    ) -> CollectionApi:
+        """Create a CollectionApi instance from a config dict.
 
-    @classmethod
-    def disbursement(cls, config: dict) -> DisbursementApi:
-        """Create a DisbursementApi instance from a config dict."""
-        environment = config.get("environment", cls.ENVIRONMENT_SANDBOX)
-        cfg = cls._build_config(config)
-        base_url = cls._base_url_for_env(environment)
-        return DisbursementApi(cfg, base_url, environment)
+        Extra keyword ``options`` (e.g. ``token_cache``) are passed to the
+        product constructor. Called on an instance, the product uses the
+        instance's transport unless given one.
+        """
+        cfg, base_url, environment = target._product_args(config)
+        if transport is None and isinstance(target, MomoApi):
+            transport = target._transport
+        return CollectionApi(cfg, base_url, environment, transport, **options)
+
+    @_hybridmethod
+    def disbursement(
+        target: Union["MomoApi", type],
+        config: dict,
+        transport: Optional[HttpTransport] = None,
+        **options: Any,
+    ) -> DisbursementApi:
+        """Create a DisbursementApi instance from a config dict.
+
+        Extra keyword ``options`` (e.g. ``token_cache``) are passed to the
+        product constructor. Called on an instance, the product uses the
+        instance's transport unless given one.
+        """
+        cfg, base_url, environment = target._product_args(config)
+        if transport is None and isinstance(target, MomoApi):
+            transport = target._transport
+        return DisbursementApi(cfg, base_url, environment, transport, **options)
+
+    @_hybridmethod
+    def async_collection(
+        target: Union["MomoApi", type],
+        config: dict,
+        transport: Optional[AsyncHttpTransport] = None,
+        **options: Any,
+    ) -> AsyncCollectionApi:
+        """Create an AsyncCollectionApi instance from a config dict.
+
+        Extra keyword ``options`` (e.g. ``token_cache``) are passed to the
+        product constructor. Called on an instance, the product uses the
+        instance's transport unless given one.
+        """
+        cfg, base_url, environment = target._product_args(config)
+        if transport is None and isinstance(target, MomoApi):
+            transport = target._shared_async_transport()
+        return AsyncCollectionApi(cfg, base_url, environment, transport, **options)
+
+    @_hybridmethod
+    def async_disbursement(
+        target: Union["MomoApi", type],
+        config: dict,
+        transport: Optional[AsyncHttpTransport] = None,
+        **options: Any,
+    ) -> AsyncDisbursementApi:
+        """Create an AsyncDisbursementApi instance from a config dict.
+
+        Extra keyword ``options`` (e.g. ``token_cache``) are passed to the
+        product constructor. Called on an instance, the product uses the
+        instance's transport unless given one.
+        """
+        cfg, base_url, environment = target._product_args(config)
+        if transport is None and isinstance(target, MomoApi):
+            transport = target._shared_async_transport()
+        return AsyncDisbursementApi(cfg, base_url, environment, transport, **options)
 
     # ------------------------------------------------------------------
     # Instance-level helpers
@@ -78,4 +203,4 @@ class MomoApi:
 
     def sandbox(self, subscription_key: str) -> SandboxApi:
         """Create a SandboxApi instance using this client's base URL."""
-        return SandboxApi(subscription_key, self._base_url)
+        return SandboxApi(subscription_key, self._base_url, self._transport)
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Any, Optional
 
 
 class MomoException(Exception):
@@ -25,10 +25,41 @@ class ConflictException(MomoException):
     """Raised when the API returns HTTP 409 (duplicate reference ID, etc.)."""
 
 
+class TooManyRequestsException(MomoException):
+    """Raised when the API returns HTTP 429 (request quota exceeded)."""
+
+
 class InternalServerErrorException(MomoException):
     """Raised when the API returns HTTP 500."""
 
 
+class CircuitOpenException(MomoException):
+    """Raised without contacting the API while its circuit breaker is open."""
+
+    def __init__(self, message: str = "", key: str = "", retry_after: float = 0.0):
+        super().__init__(message)
+        self.key = key
+        self.retry_after = retry_after
+
+
+class PaymentTimeoutException(MomoException):
+    """Raised when a payment is still not final at its deadline."""
+
+    def __init__(self, message: str = "", reference_id: str = "", transaction: Any = None):
+        super().__init__(message)
+        self.reference_id = reference_id
+        self.transaction = transaction
+
+
+class IdempotencyConflictException(MomoException):
+    """Raised when an idempotency key is reused for a different request."""
+
+    def __init__(self, message: str = "", key: str = "", reference_id: str = ""):
+        super().__init__(message)
+        self.key = key
+        self.reference_id = reference_id
+
+
 def create_exception(status_code: int, message: Optional[str] = None) -> MomoException:
     """Factory that maps HTTP status codes to the appropriate exception class."""
     msg = message or ""
@@ -37,6 +68,7 @@ def create_exception(status_code: int, message: Optional[str] = None) -> MomoExc
         401: InvalidSubscriptionKeyException,
         404: ResourceNotFoundException,
         409: ConflictException,
+        429: TooManyRequestsException,
         500: InternalServerErrorException,
     }
     exc_class = mapping.get(status_code, MomoException)
@@ -5,6 +5,8 @@ from .refund_request import RefundRequest
 from .transaction import Transaction
 from .account_balance import AccountBalance
 from .api_token import ApiToken
+from .batch_result import BatchResult
+from .transaction_batch import TransactionBatch
 
 __all__ = [
     "Config",
@@ -14,4 +16,6 @@ __all__ = [
     "Transaction",
     "AccountBalance",
     "ApiToken",
+    "BatchResult",
+    "TransactionBatch",
 ]
@@ -0,0 +1,23 @@
+from dataclasses import fields
+from typing import Callable, Type, TypeVar
+
+T = TypeVar("T")
+
+
+def slotted(*extra: str) -> Callable[[Type[T]], Type[T]]:
+    """Rebuild a dataclass with ``__slots__`` for its fields plus ``extra``.
+
+    The equivalent of ``@dataclass(slots=True)``, which needs Python 3.10.
+    Instances carry no ``__dict__``, which roughly halves their size; apply
+    it above ``@dataclass``.
+    """
+
+    def wrap(cls: Type[T]) -> Type[T]:
+        names = tuple(f.name for f in fields(cls)) + extra  # type: ignore[arg-type]
+        namespace = dict(cls.__dict__)
+        for name in names + ("__dict__", "__weakref__"):
+            namespace.pop(name, None)
+        namespace["__slots__"] = names
+        return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+    return wrap
@@ -1,6 +1,9 @@
 from dataclasses import dataclass
 
+from ._slots import slotted
 
+
+@slotted()
 @dataclass
 class AccountBalance:
     available_balance: str
@@ -1,6 +1,9 @@
 from dataclasses import dataclass
 
+from ._slots import slotted
 
+
+@slotted()
 @dataclass
 class ApiToken:
     access_token: str
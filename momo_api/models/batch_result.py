@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one item of a bulk call.
+
+    ``index`` is the item's position in the input; exactly one of
+    ``reference_id`` and ``error`` is set.
+    """
+
+    index: int
+    request: Any
+    reference_id: Optional[str] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
@@ -1,7 +1,24 @@
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Any, Dict, Optional
 
+from ._slots import slotted
 
+
+def _fields(data: dict) -> Dict[str, Any]:
+    return {
+        "amount": data.get("amount", ""),
+        "status": data.get("status", ""),
+        "currency": data.get("currency", ""),
+        "financial_transaction_id": data.get("financialTransactionId", ""),
+        "external_id": data.get("externalId", ""),
+        "payer_message": data.get("payerMessage", ""),
+        "payee_note": data.get("payeeNote", ""),
+        "payer": data.get("payer"),
+        "payee": data.get("payee"),
+    }
+
+
+@slotted("_body", "_codec")
 @dataclass
 class Transaction:
     STATUS_SUCCESSFUL = "SUCCESSFUL"
@@ -21,18 +38,42 @@ class Transaction:
 
     @classmethod
     def parse(cls, data: dict) -> "Transaction":
-        return cls(
-            amount=data.get("amount", ""),
-            status=data.get("status", ""),
-            currency=data.get("currency", ""),
-            financial_transaction_id=data.get("financialTransactionId", ""),
-            external_id=data.get("externalId", ""),
-            payer_message=data.get("payerMessage", ""),
-            payee_note=data.get("payeeNote", ""),
-            payer=data.get("payer"),
-            payee=data.get("payee"),
-            _raw=data,
-        )
+        return cls(**_fields(data), _raw=data)
+
+    @classmethod
+    def lazy(cls, body: bytes, codec: Any = None) -> "Transaction":
+        """A transaction that keeps the raw response ``body`` and decodes it on access.
+
+        Nothing is parsed until the first attribute is read, which then fills
+        every field at once. ``_raw`` is decoded afresh on each access rather
+        than kept, so a lazy transaction only ever holds the bytes.
+        """
+        if codec is None:
+            from ..support.codec import default_codec
+
+            codec = default_codec()
+        transaction = cls.__new__(cls)
+        transaction._body = body
+        transaction._codec = codec
+        return transaction
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for slots that are unset, i.e. on a lazy transaction.
+        if name in ("_body", "_codec") or name not in self.__dataclass_fields__:
+            raise AttributeError(name)
+        try:
+            body = self._body
+        except AttributeError:
+            raise AttributeError(name) from None
+        data = self._codec.loads(body)
+        if name == "_raw":
+            return data
+        for key, value in _fields(data).items():
+            try:
+                object.__getattribute__(self, key)
+            except AttributeError:
+                setattr(self, key, value)
+        return object.__getattribute__(self, name)
 
     def is_successful(self) -> bool:
         return self.status == self.STATUS_SUCCESSFUL
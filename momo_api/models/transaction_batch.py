@@ -0,0 +1,412 @@
+import csv
+import importlib
+import os
+from array import array
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+from typing import IO, Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .transaction import Transaction
+
+COLUMNS = (
+    "reference_id",
+    "status",
+    "amount",
+    "currency",
+    "external_id",
+    "financial_transaction_id",
+)
+
+_PROPERTIES = {
+    "reference_id": "reference_ids",
+    "status": "statuses",
+    "amount": "amounts",
+    "currency": "currencies",
+    "external_id": "external_ids",
+    "financial_transaction_id": "financial_transaction_ids",
+}
+
+
+# Scale marking an amount that is not a plain decimal; it is kept verbatim.
+_VERBATIM = 255
+_INT64 = 1 << 63
+
+
+def _split_amount(value: Any) -> Optional[Tuple[int, int]]:
+    """``value`` as ``(units, scale)`` with ``Decimal(units) / 10 ** scale == value``.
+
+    ``None`` for a missing or non-numeric amount, or one that does not fit
+    an int64 with at most 254 decimal places.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        amount = Decimal(value if isinstance(value, (str, int)) else str(value))
+    except InvalidOperation:
+        return None
+    if not amount.is_finite():
+        return None
+    sign, digits, exponent = amount.as_tuple()
+    units = int("".join(map(str, digits)))
+    if exponent > 0:
+        units *= 10 ** exponent
+        exponent = 0
+    if sign:
+        units = -units
+    if -exponent >= _VERBATIM or not -_INT64 <= units < _INT64:
+        return None
+    return units, -exponent
+
+
+def _join_amount(units: int, scale: int) -> Decimal:
+    return Decimal((units < 0, tuple(map(int, str(abs(units)))), -scale))
+
+
+class _DictionaryColumn:
+    """Strings with few distinct values, stored as 32-bit codes into ``values``."""
+
+    __slots__ = ("codes", "values", "_index")
+
+    def __init__(self, values: Optional[List[str]] = None) -> None:
+        self.codes = array("I")
+        self.values: List[str] = list(values or ())
+        self._index = {value: code for code, value in enumerate(self.values)}
+
+    def append(self, value: str) -> None:
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def code(self, value: str) -> Optional[int]:
+        return self._index.get(value)
+
+    def decode(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        values = self.values
+        return [values[code] for code in self.codes[start:stop]]
+
+    def take(self, indices: Iterable[int]) -> "_DictionaryColumn":
+        column = _DictionaryColumn(self.values)
+        codes = self.codes
+        column.codes = array("I", [codes[i] for i in indices])
+        return column
+
+
+class TransactionBatch:
+    """Many MTN transactions stored column by column.
+
+    Rows are appended straight from decoded status responses (or from
+    :class:`Transaction` objects), so a batch of 500k statuses holds six
+    columns rather than 500k objects: ``reference_id``, ``external_id`` and
+    ``financial_transaction_id`` as lists of strings, ``status`` and
+    ``currency`` dictionary-encoded as 32-bit codes, and ``amount`` as exact
+    scaled integers: int64 units plus the number of decimal places, so
+    ``"20.50"`` is stored as ``(2050, 2)`` and read back as ``"20.50"``.
+    An amount that is missing or not a plain decimal is kept verbatim and
+    left out of the totals.
+
+    Filters and aggregates work on the columns; :meth:`row` materializes a
+    single :class:`Transaction` when one is needed. :meth:`to_numpy` and
+    :meth:`to_arrow` hand the columns to NumPy or Arrow, and
+    :meth:`write_csv` / :meth:`write_parquet` stream them out in chunks.
+    Lookups that failed are kept in ``errors``, keyed by reference ID.
+    """
+
+    def __init__(self) -> None:
+        self._reference_ids: List[str] = []
+        self._statuses = _DictionaryColumn()
+        self._units = array("q")
+        self._scales = array("B")
+        self._verbatim: Dict[int, str] = {}
+        self._currencies = _DictionaryColumn()
+        self._external_ids: List[str] = []
+        self._financial_ids: List[str] = []
+        self.errors: Dict[str, Exception] = {}
+
+    def __len__(self) -> int:
+        return len(self._reference_ids)
+
+    def __repr__(self) -> str:
+        return f"TransactionBatch(rows={len(self)}, errors={len(self.errors)})"
+
+    def append(self, reference_id: str, row: Union[Transaction, dict]) -> None:
+        """Add a transaction, or a decoded MTN status response, under ``reference_id``."""
+        if isinstance(row, dict):
+            status = row.get("status", "")
+            amount = row.get("amount")
+            currency = row.get("currency", "")
+            external_id = row.get("externalId", "")
+            financial_id = row.get("financialTransactionId", "")
+        else:
+            status = row.status
+            amount = row.amount
+            currency = row.currency
+            external_id = row.external_id
+            financial_id = row.financial_transaction_id
+        self._reference_ids.append(reference_id)
+        self._statuses.append(status or "")
+        self._append_amount(amount)
+        self._currencies.append(currency or "")
+        self._external_ids.append(external_id or "")
+        self._financial_ids.append(financial_id or "")
+
+    def _append_amount(self, amount: Any) -> None:
+        split = _split_amount(amount)
+        if split is None:
+            self._verbatim[len(self._units)] = "" if amount is None else str(amount)
+            split = 0, _VERBATIM
+        self._units.append(split[0])
+        self._scales.append(split[1])
+
+    def _amount(self, index: int) -> Optional[Decimal]:
+        scale = self._scales[index]
+        return None if scale == _VERBATIM else _join_amount(self._units[index], scale)
+
+    def _amount_text(self, index: int) -> str:
+        scale = self._scales[index]
+        if scale == _VERBATIM:
+            return self._verbatim[index]
+        return format(_join_amount(self._units[index], scale), "f")
+
+    # ------------------------------------------------------------------
+    # Columns
+    # ------------------------------------------------------------------
+
+    @property
+    def reference_ids(self) -> List[str]:
+        return self._reference_ids
+
+    @property
+    def statuses(self) -> List[str]:
+        return self._statuses.decode()
+
+    @property
+    def amounts(self) -> List[Optional[Decimal]]:
+        """Exact amounts; ``None`` where the provider sent no plain decimal."""
+        return [self._amount(i) for i in range(len(self))]
+
+    @property
+    def currencies(self) -> List[str]:
+        return self._currencies.decode()
+
+    @property
+    def external_ids(self) -> List[str]:
+        return self._external_ids
+
+    @property
+    def financial_transaction_ids(self) -> List[str]:
+        return self._financial_ids
+
+    def column(self, name: str) -> Any:
+        """The column called ``name``, one of :data:`COLUMNS`."""
+        if name not in COLUMNS:
+            raise KeyError(name)
+        return getattr(self, _PROPERTIES[name])
+
+    def row(self, index: int) -> Transaction:
+        """Materialize row ``index`` as a :class:`Transaction`."""
+        return Transaction(
+            amount=self._amount_text(index),
+            status=self._statuses.values[self._statuses.codes[index]],
+            currency=self._currencies.values[self._currencies.codes[index]],
+            financial_transaction_id=self._financial_ids[index],
+            external_id=self._external_ids[index],
+        )
+
+    # ------------------------------------------------------------------
+    # Filters and aggregates
+    # ------------------------------------------------------------------
+
+    def indices(
+        self, status: Optional[str] = None, currency: Optional[str] = None
+    ) -> "array[int]":
+        """Positions of the rows with the given ``status`` and/or ``currency``."""
+        selected: Iterable[int] = range(len(self))
+        for column, value in ((self._statuses, status), (self._currencies, currency)):
+            if value is None:
+                continue
+            code = column.code(value)
+            if code is None:
+                return array("L")
+            codes = column.codes
+            selected = [i for i in selected if codes[i] == code]
+        return array("L", selected)
+
+    def take(self, indices: Iterable[int]) -> "TransactionBatch":
+        """A new batch holding the rows at ``indices``, in that order."""
+        indices = indices if isinstance(indices, (array, list, range)) else list(indices)
+        batch = TransactionBatch()
+        batch._reference_ids = [self._reference_ids[i] for i in indices]
+        batch._statuses = self._statuses.take(indices)
+        batch._units = array("q", [self._units[i] for i in indices])
+        batch._scales = array("B", [self._scales[i] for i in indices])
+        batch._verbatim = {
+            position: self._verbatim[i]
+            for position, i in enumerate(indices)
+            if i in self._verbatim
+        }
+        batch._currencies = self._currencies.take(indices)
+        batch._external_ids = [self._external_ids[i] for i in indices]
+        batch._financial_ids = [self._financial_ids[i] for i in indices]
+        return batch
+
+    def where(
+        self, status: Optional[str] = None, currency: Optional[str] = None
+    ) -> "TransactionBatch":
+        """The rows with the given ``status`` and/or ``currency``, e.g. every ``FAILED`` one."""
+        return self.take(self.indices(status, currency))
+
+    def successful(self) -> "TransactionBatch":
+        return self.where(status=Transaction.STATUS_SUCCESSFUL)
+
+    def pending(self) -> "TransactionBatch":
+        return self.where(status=Transaction.STATUS_PENDING)
+
+    def failed(self) -> "TransactionBatch":
+        return self.where(status=Transaction.STATUS_FAILED)
+
+    def count_by_status(self) -> Dict[str, int]:
+        values = self._statuses.values
+        return {values[code]: count for code, count in Counter(self._statuses.codes).items()}
+
+    def sum_by_currency(
+        self, status: Optional[str] = Transaction.STATUS_SUCCESSFUL
+    ) -> Dict[str, Decimal]:
+        """Exact total amount per currency of the rows with ``status`` (every row for ``None``).
+
+        Rows without a numeric amount are left out.
+        """
+        rows = self.indices(status) if status is not None else range(len(self))
+        codes = self._currencies.codes
+        units = self._units
+        scales = self._scales
+        # Integer units summed per currency and scale, so nothing is rounded.
+        grouped: Dict[int, Dict[int, int]] = {}
+        for i in rows:
+            scale = scales[i]
+            if scale != _VERBATIM:
+                by_scale = grouped.setdefault(codes[i], {})
+                by_scale[scale] = by_scale.get(scale, 0) + units[i]
+        values = self._currencies.values
+        totals = {}
+        for code, by_scale in grouped.items():
+            scale = max(by_scale)
+            total = sum(amount * 10 ** (scale - s) for s, amount in by_scale.items())
+            totals[values[code]] = _join_amount(total, scale)
+        return totals
+
+    @property
+    def amount_scale(self) -> int:
+        """The most decimal places of any amount; Arrow and Parquet use it as decimal scale."""
+        scales = [scale for scale in set(self._scales) if scale != _VERBATIM]
+        return max(scales, default=0)
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """The columns as NumPy arrays (requires ``numpy``).
+
+        ``amount`` holds exact ``Decimal`` values (``None`` where missing),
+        like the string columns in an object array.
+        """
+        np = _require("numpy")
+
+        def dictionary(column: _DictionaryColumn) -> Any:
+            codes = np.frombuffer(column.codes, dtype=f"u{column.codes.itemsize}").copy()
+            return np.array(column.values, dtype=object)[codes]
+
+        return {
+            "reference_id": np.array(self._reference_ids, dtype=object),
+            "status": dictionary(self._statuses),
+            "amount": np.array(self.amounts, dtype=object),
+            "currency": dictionary(self._currencies),
+            "external_id": np.array(self._external_ids, dtype=object),
+            "financial_transaction_id": np.array(self._financial_ids, dtype=object),
+        }
+
+    def to_arrow(self) -> Any:
+        """The batch as a ``pyarrow.Table``.
+
+        Status and currency are dictionary-encoded; amount is a ``decimal128``
+        column with :attr:`amount_scale` decimal places.
+        """
+        pa = _require("pyarrow")
+        return self._arrow_table(pa, _arrow_schema(pa, self.amount_scale), 0, len(self))
+
+    def write_csv(
+        self, destination: Union[str, "os.PathLike[str]", IO[str]], chunk_size: int = 10_000
+    ) -> None:
+        """Write the batch as CSV with a header row, ``chunk_size`` rows at a time."""
+        if isinstance(destination, (str, os.PathLike)):
+            with open(destination, "w", newline="", encoding="utf-8") as file:
+                self.write_csv(file, chunk_size)
+            return
+        writer = csv.writer(destination)
+        writer.writerow(COLUMNS)
+        for start in range(0, len(self), chunk_size):
+            stop = start + chunk_size
+            writer.writerows(zip(
+                self._reference_ids[start:stop],
+                self._statuses.decode(start, stop),
+                [self._amount_text(i) for i in range(start, min(stop, len(self)))],
+                self._currencies.decode(start, stop),
+                self._external_ids[start:stop],
+                self._financial_ids[start:stop],
+            ))
+
+    def write_parquet(self, destination: Any, row_group_size: int = 65_536) -> None:
+        """Write the batch as Parquet, one row group of ``row_group_size`` rows at a time.
+
+        Requires ``pyarrow``; ``destination`` is a path or a writable binary file.
+        """
+        pa = _require("pyarrow")
+        parquet = _require("pyarrow.parquet")
+        schema = _arrow_schema(pa, self.amount_scale)
+        with parquet.ParquetWriter(destination, schema) as writer:
+            for start in range(0, len(self), row_group_size):
+                stop = min(start + row_group_size, len(self))
+                writer.write_table(self._arrow_table(pa, schema, start, stop))
+
+    def _arrow_table(self, pa: Any, schema: Any, start: int, stop: int) -> Any:
+        def dictionary(column: _DictionaryColumn) -> Any:
+            codes = pa.Array.from_buffers(
+                pa.uint32(), stop - start, [None, pa.py_buffer(column.codes[start:stop])]
+            )
+            return pa.DictionaryArray.from_arrays(codes, pa.array(column.values, pa.string()))
+
+        amounts = pa.array(
+            [self._amount(i) for i in range(start, stop)], schema.field("amount").type
+        )
+        return pa.Table.from_arrays(
+            [
+                pa.array(self._reference_ids[start:stop], pa.string()),
+                dictionary(self._statuses),
+                amounts,
+                dictionary(self._currencies),
+                pa.array(self._external_ids[start:stop], pa.string()),
+                pa.array(self._financial_ids[start:stop], pa.string()),
+            ],
+            schema=schema,
+        )
+
+
+def _arrow_schema(pa: Any, amount_scale: int) -> Any:
+    labels = pa.dictionary(pa.uint32(), pa.string())
+    return pa.schema([
+        ("reference_id", pa.string()),
+        ("status", labels),
+        ("amount", pa.decimal128(38, amount_scale)),
+        ("currency", labels),
+        ("external_id", pa.string()),
+        ("financial_transaction_id", pa.string()),
+    ])
+
+
+def _require(module: str) -> Any:
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise ImportError(f"{module.split('.')[0]} is not installed") from None
@@ -1,5 +1,11 @@
-from .collection import CollectionApi
-from .disbursement import DisbursementApi
+from .collection import AsyncCollectionApi, CollectionApi
+from .disbursement import AsyncDisbursementApi, DisbursementApi
 from .sandbox import SandboxApi
 
-__all__ = ["CollectionApi", "DisbursementApi", "SandboxApi"]
+__all__ = [
+    "CollectionApi",
+    "DisbursementApi",
+    "SandboxApi",
+    "AsyncCollectionApi",
+    "AsyncDisbursementApi",
+]
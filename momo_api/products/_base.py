@@ -0,0 +1,283 @@
+import base64
+from typing import Any, Optional
+
+import httpx
+
+from ..models.account_balance import AccountBalance
+from ..models.api_token import ApiToken
+from ..models.config import Config
+from ..models.transaction import Transaction
+from ..support.concurrency import StatusRow
+from ..support.endpoints import ENDPOINT_BALANCE, ENDPOINT_STATUS, ENDPOINT_TOKEN
+from ..support.pipeline import AsyncRequestPipeline, ProductBase, ProductOptions, RequestPipeline
+from ..support.transport import AsyncHttpTransport, HttpTransport
+
+
+class MtnProduct(ProductBase):
+    """Request building shared by the MTN MoMo product clients."""
+
+    PROVIDER = "mtn"
+
+    def __init__(
+        self,
+        config: Config,
+        base_url: str,
+        environment: str,
+        options: Optional[ProductOptions] = None,
+        **overrides: Any,
+    ) -> None:
+        super().__init__(
+            config, base_url, environment, config.api_user, config.subscription_key,
+            options, **overrides,
+        )
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _basic_auth_header(self) -> str:
+        credentials = f"{self._config.api_user}:{self._config.api_key}"
+        encoded = base64.b64encode(credentials.encode()).decode()
+        return f"Basic {encoded}"
+
+    def _subscription_headers(self) -> dict:
+        return {"Ocp-Apim-Subscription-Key": self._config.subscription_key}
+
+    def _token_headers(self) -> dict:
+        return {
+            **self._subscription_headers(),
+            "Authorization": self._basic_auth_header(),
+        }
+
+    def _auth_headers(self, token: str) -> dict:
+        return {
+            "Ocp-Apim-Subscription-Key": self._config.subscription_key,
+            "X-Target-Environment": self._environment,
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        }
+
+    def _account_holder_headers(self, token: str) -> dict:
+        return {
+            "Ocp-Apim-Subscription-Key": self._config.subscription_key,
+            "X-Target-Environment": self._environment,
+            "Authorization": f"Bearer {token}",
+        }
+
+    def _reference_headers(self, token: str, reference_id: str) -> dict:
+        headers = {
+            **self._auth_headers(token),
+            "X-Reference-Id": reference_id,
+        }
+        if self._config.callback_uri:
+            headers["X-Callback-Url"] = self._config.callback_uri
+        return headers
+
+    def _url(self, path: str) -> str:
+        return f"{self._base_url}/{self.PRODUCT_PATH}/{path}"
+
+    def _parse_transaction(self, response: httpx.Response) -> Transaction:
+        if self._lazy_transactions:
+            return Transaction.lazy(response.content, self._codec)
+        return Transaction.parse(self._codec.loads(response.content))
+
+    def _status_row(self, url: str, response: httpx.Response) -> dict:
+        """The decoded status response for a batch row, cached like a transaction."""
+        data = self._codec.loads(response.content)
+        if self._status_cache is not None:
+            self._store_status(url, Transaction.parse(data))
+        return data
+
+    def _parse_token(self, response: httpx.Response) -> ApiToken:
+        self._raise_for_status(response)
+        return ApiToken.from_dict(self._codec.loads(response.content))
+
+    def _account_holder(self, response: httpx.Response) -> bool:
+        self._raise_for_status(response)
+        return bool(self._codec.loads(response.content).get("result", False))
+
+    def _parse_balance(self, response: httpx.Response) -> AccountBalance:
+        self._raise_for_status(response)
+        return AccountBalance.parse(self._codec.loads(response.content))
+
+    def invalidate_account_holder(self, phone: Optional[str] = None) -> None:
+        """Drop ``phone`` (or every number) from the account holder cache."""
+        if self._account_cache is not None:
+            self._account_cache.invalidate(phone)
+
+
+class MtnClient(MtnProduct, RequestPipeline):
+    """The calls every sync MTN MoMo product offers."""
+
+    def __init__(
+        self,
+        config: Config,
+        base_url: str,
+        environment: str,
+        transport: Optional[HttpTransport] = None,
+        options: Optional[ProductOptions] = None,
+        **overrides: Any,
+    ) -> None:
+        super().__init__(config, base_url, environment, options, **overrides)
+        self._transport = transport or HttpTransport.default()
+
+    def _get_transaction(self, path: str) -> Transaction:
+        url = self._url(path)
+        cached = self._cached_status(url)
+        if cached is not None:
+            return cached
+        token = self.get_access_token()
+        response = self._send(
+            ENDPOINT_STATUS, "GET", url, headers=self._auth_headers(token.access_token)
+        )
+        self._raise_for_status(response)
+        return self._store_status(url, self._parse_transaction(response))
+
+    def _get_status_row(self, path: str) -> StatusRow:
+        url = self._url(path)
+        cached = self._cached_status(url)
+        if cached is not None:
+            return cached
+        token = self.get_access_token()
+        response = self._send(
+            ENDPOINT_STATUS, "GET", url, headers=self._auth_headers(token.access_token)
+        )
+        self._raise_for_status(response)
+        return self._status_row(url, response)
+
+    def _fetch_access_token(self) -> ApiToken:
+        response = self._send(
+            ENDPOINT_TOKEN, "POST", self._url("token/"), headers=self._token_headers()
+        )
+        return self._parse_token(response)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get_access_token(self) -> ApiToken:
+        """Obtain an OAuth2 access token for this product."""
+        return self._cached_token()
+
+    def check_account_holder(self, phone: str) -> bool:
+        """Check whether an MSISDN account holder is active.
+
+        Answered from the ``account_cache`` when one is configured.
+        """
+        if self._account_cache is not None:
+            cached = self._account_cache.get(phone)
+            if cached is not None:
+                return cached
+        token = self.get_access_token()
+        url = self._url(f"v1_0/accountholder/msisdn/{phone}/active")
+        headers = self._account_holder_headers(token.access_token)
+        active = self._account_holder(self._send(ENDPOINT_STATUS, "GET", url, headers=headers))
+        if self._account_cache is not None:
+            self._account_cache.put(phone, active)
+        return active
+
+    def get_balance(self) -> AccountBalance:
+        """Get the account balance of this product."""
+        token = self.get_access_token()
+        url = self._url("v1_0/account/balance")
+        response = self._send(
+            ENDPOINT_BALANCE, "GET", url, headers=self._auth_headers(token.access_token)
+        )
+        return self._parse_balance(response)
+
+
+class AsyncMtnClient(MtnProduct, AsyncRequestPipeline):
+    """The calls every asyncio MTN MoMo product offers.
+
+    Without an explicit ``transport`` the client owns its own
+    :class:`AsyncHttpTransport`, released by :meth:`aclose`.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        base_url: str,
+        environment: str,
+        transport: Optional[AsyncHttpTransport] = None,
+        options: Optional[ProductOptions] = None,
+        **overrides: Any,
+    ) -> None:
+        super().__init__(config, base_url, environment, options, **overrides)
+        self._owns_transport = transport is None
+        self._transport = transport or AsyncHttpTransport()
+
+    async def aclose(self) -> None:
+        """Close the transport if this client created it."""
+        if self._owns_transport:
+            await self._transport.aclose()
+
+    async def __aenter__(self) -> Any:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    async def _get_transaction(self, path: str) -> Transaction:
+        url = self._url(path)
+        cached = self._cached_status(url)
+        if cached is not None:
+            return cached
+        token = await self.get_access_token()
+        response = await self._send(
+            ENDPOINT_STATUS, "GET", url, headers=self._auth_headers(token.access_token)
+        )
+        self._raise_for_status(response)
+        return self._store_status(url, self._parse_transaction(response))
+
+    async def _get_status_row(self, path: str) -> StatusRow:
+        url = self._url(path)
+        cached = self._cached_status(url)
+        if cached is not None:
+            return cached
+        token = await self.get_access_token()
+        response = await self._send(
+            ENDPOINT_STATUS, "GET", url, headers=self._auth_headers(token.access_token)
+        )
+        self._raise_for_status(response)
+        return self._status_row(url, response)
+
+    async def _fetch_access_token(self) -> ApiToken:
+        response = await self._send(
+            ENDPOINT_TOKEN, "POST", self._url("token/"), headers=self._token_headers()
+        )
+        return self._parse_token(response)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def get_access_token(self) -> ApiToken:
+        """Obtain an OAuth2 access token for this product."""
+        return await self._cached_token()
+
+    async def check_account_holder(self, phone: str) -> bool:
+        """Check whether an MSISDN account holder is active.
+
+        Answered from the ``account_cache`` when one is configured.
+        """
+        if self._account_cache is not None:
+            cached = self._account_cache.get(phone)
+            if cached is not None:
+                return cached
+        token = await self.get_access_token()
+        url = self._url(f"v1_0/accountholder/msisdn/{phone}/active")
+        headers = self._account_holder_headers(token.access_token)
+        response = await self._send(ENDPOINT_STATUS, "GET", url, headers=headers)
+        active = self._account_holder(response)
+        if self._account_cache is not None:
+            self._account_cache.put(phone, active)
+        return active
+
+    async def get_balance(self) -> AccountBalance:
+        """Get the account balance of this product."""
+        token = await self.get_access_token()
+        url = self._url("v1_0/account/balance")
+        response = await self._send(
+            ENDPOINT_BALANCE, "GET", url, headers=self._auth_headers(token.access_token)
+        )
+        return self._parse_balance(response)
@@ -1,131 +1,68 @@
-import base64
 import uuid
-from typing import Optional
+from typing import AsyncIterator, Iterable, Iterator, Optional
 
-import httpx
-
-from ..exceptions import create_exception
-from ..models.account_balance import AccountBalance
-from ..models.api_token import ApiToken
-from ..models.config import Config
+from ..models.batch_result import BatchResult
 from ..models.payment_request import PaymentRequest
 from ..models.transaction import Transaction
-from ..support.token_cache import TokenCache
-
-
-class CollectionApi:
+from ..models.transaction_batch import TransactionBatch
+from ..support.concurrency import (
+    abounded_map,
+    acollect_statuses,
+    bounded_map,
+    collect_statuses,
+)
+from ..support.endpoints import ENDPOINT_INITIATE
+from ._base import AsyncMtnClient, MtnClient
+
+
+class CollectionApi(MtnClient):
     """MTN MoMo Collection API product."""
 
     PRODUCT_PATH = "collection"
 
-    def __init__(self, config: Config, base_url: str, environment: str):
-        self._config = config
-        self._base_url = base_url.rstrip("/")
-        self._environment = environment
-        self._token_cache = TokenCache()
-
-    # ------------------------------------------------------------------
-    # Internal helpers
-    # ------------------------------------------------------------------
-
-    def _basic_auth_header(self) -> str:
-        credentials = f"{self._config.api_user}:{self._config.api_key}"
-        encoded = base64.b64encode(credentials.encode()).decode()
-        return f"Basic {encoded}"
-
-    def _subscription_headers(self) -> dict:
-        return {"Ocp-Apim-Subscription-Key": self._config.subscription_key}
-
-    def _auth_headers(self, token: str) -> dict:
-        return {
-            "Ocp-Apim-Subscription-Key": self._config.subscription_key,
-            "X-Target-Environment": self._environment,
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-        }
-
-    def _raise_for_status(self, response: httpx.Response) -> None:
-        if response.status_code >= 400:
-            try:
-                body = response.json()
-                message = body.get("message") or body.get("error") or str(body)
-            except Exception:
-                message = response.text
-            raise create_exception(response.status_code, message)
-
-    def _url(self, path: str) -> str:
-        return f"{self._base_url}/{self.PRODUCT_PATH}/{path}"
-
-    # ------------------------------------------------------------------
-    # Public API
-    # ------------------------------------------------------------------
-
-    def get_access_token(self) -> ApiToken:
-        """Obtain an OAuth2 access token for the Collection product."""
-        cached = self._token_cache.get()
-        if cached is not None:
-            return ApiToken(access_token=cached, token_type="Bearer", expires_in=0)
-
-        url = self._url("token/")
-        headers = {
-            **self._subscription_headers(),
-            "Authorization": self._basic_auth_header(),
-        }
-        with httpx.Client() as client:
-            response = client.post(url, headers=headers)
-        self._raise_for_status(response)
-        token = ApiToken.from_dict(response.json())
-        self._token_cache.set(token.access_token, token.expires_in)
-        return token
-
-    def check_account_holder(self, phone: str) -> bool:
-        """Check whether an MSISDN account holder is active."""
-        token = self.get_access_token()
-        url = self._url(f"v1_0/accountholder/msisdn/{phone}/active")
-        headers = {
-            "Ocp-Apim-Subscription-Key": self._config.subscription_key,
-            "X-Target-Environment": self._environment,
-            "Authorization": f"Bearer {token.access_token}",
-        }
-        with httpx.Client() as client:
-            response = client.get(url, headers=headers)
-        self._raise_for_status(response)
-        return bool(response.json().get("result", False))
-
-    def request_to_pay(self, request: PaymentRequest) -> str:
-        """Initiate a payment request. Returns the reference ID."""
+    def request_to_pay(
+        self, request: PaymentRequest, reference_id: Optional[str] = None
+    ) -> str:
+        """Initiate a payment request. Returns the reference ID.
+
+        A ``reference_id`` is generated unless one is given, e.g. to resend a
+        request whose outcome is unknown under its original reference. With
+        ``idempotency`` configured, a repeated ``external_id`` returns the
+        reference it was first sent under.
+        """
         token = self.get_access_token()
-        reference_id = str(uuid.uuid4())
         url = self._url("v1_0/requesttopay")
-        headers = {
-            **self._auth_headers(token.access_token),
-            "X-Reference-Id": reference_id,
-        }
-        if self._config.callback_uri:
-            headers["X-Callback-Url"] = self._config.callback_uri
-
-        with httpx.Client() as client:
-            response = client.post(url, json=request.to_dict(), headers=headers)
-        self._raise_for_status(response)
-        return reference_id
+        payload = request.to_dict()
+
+        def send(reference_id: str) -> None:
+            headers = self._reference_headers(token.access_token, reference_id)
+            response = self._send(
+                ENDPOINT_INITIATE, "POST", url, content=self._codec.dumps(payload), headers=headers
+            )
+            self._raise_for_status(response)
+
+        return self._initiate(
+            "requesttopay", request.external_id, payload, reference_id or str(uuid.uuid4()), send
+        )
 
     def get_payment_status(self, payment_id: str) -> Transaction:
         """Get the status of a previously initiated payment request."""
-        token = self.get_access_token()
-        url = self._url(f"v1_0/requesttopay/{payment_id}")
-        with httpx.Client() as client:
-            response = client.get(url, headers=self._auth_headers(token.access_token))
-        self._raise_for_status(response)
-        return Transaction.parse(response.json())
-
-    def get_balance(self) -> AccountBalance:
-        """Get the account balance for the Collection product."""
-        token = self.get_access_token()
-        url = self._url("v1_0/account/balance")
-        with httpx.Client() as client:
-            response = client.get(url, headers=self._auth_headers(token.access_token))
-        self._raise_for_status(response)
-        return AccountBalance.parse(response.json())
+        return self._get_transaction(f"v1_0/requesttopay/{payment_id}")
+
+    def get_payment_status_many(
+        self, payment_ids: Iterable[str], concurrency: int = 10
+    ) -> TransactionBatch:
+        """Get the status of many payment requests into one :class:`TransactionBatch`.
+
+        At most ``concurrency`` lookups run at a time over the shared pool and
+        token. Each response is decoded straight into the batch's columns, in
+        completion order, without building a :class:`Transaction`; a failed
+        lookup is recorded in ``batch.errors`` and does not stop the others.
+        """
+        return collect_statuses(
+            lambda payment_id: self._get_status_row(f"v1_0/requesttopay/{payment_id}"),
+            payment_ids, concurrency,
+        )
 
     def quick_pay(
         self,
@@ -142,3 +79,90 @@ class CollectionApi:
             currency=currency,
         )
         return self.request_to_pay(payment)
+
+    def request_to_pay_many(
+        self, requests: Iterable[PaymentRequest], concurrency: int = 10
+    ) -> Iterator[BatchResult]:
+        """Initiate many payment requests, at most ``concurrency`` at a time.
+
+        ``requests`` is consumed lazily and results are yielded as they
+        complete. A failed item carries its ``MomoException`` (or transport
+        error) in ``BatchResult.error`` and does not stop the batch.
+        """
+        return bounded_map(self.request_to_pay, requests, concurrency)
+
+
+class AsyncCollectionApi(AsyncMtnClient):
+    """Asyncio MTN MoMo Collection API product.
+
+    Without an explicit ``transport`` the client owns its own
+    :class:`AsyncHttpTransport`, released by :meth:`aclose`.
+    """
+
+    PRODUCT_PATH = "collection"
+
+    async def request_to_pay(
+        self, request: PaymentRequest, reference_id: Optional[str] = None
+    ) -> str:
+        """Initiate a payment request. Returns the reference ID.
+
+        A ``reference_id`` is generated unless one is given, e.g. to resend a
+        request whose outcome is unknown under its original reference. With
+        ``idempotency`` configured, a repeated ``external_id`` returns the
+        reference it was first sent under.
+        """
+        token = await self.get_access_token()
+        url = self._url("v1_0/requesttopay")
+        payload = request.to_dict()
+
+        async def send(reference_id: str) -> None:
+            headers = self._reference_headers(token.access_token, reference_id)
+            response = await self._send(
+                ENDPOINT_INITIATE, "POST", url, content=self._codec.dumps(payload), headers=headers
+            )
+            self._raise_for_status(response)
+
+        return await self._initiate(
+            "requesttopay", request.external_id, payload, reference_id or str(uuid.uuid4()), send
+        )
+
+    async def get_payment_status(self, payment_id: str) -> Transaction:
+        """Get the status of a previously initiated payment request."""
+        return await self._get_transaction(f"v1_0/requesttopay/{payment_id}")
+
+    async def get_payment_status_many(
+        self, payment_ids: Iterable[str], concurrency: int = 10
+    ) -> TransactionBatch:
+        """Get the status of many payment requests into one :class:`TransactionBatch`.
+
+        See :meth:`CollectionApi.get_payment_status_many`.
+        """
+        return await acollect_statuses(
+            lambda payment_id: self._get_status_row(f"v1_0/requesttopay/{payment_id}"),
+            payment_ids, concurrency,
+        )
+
+    async def quick_pay(
+        self,
+        amount: str,
+        phone: str,
+        reference: str,
+        currency: str = "XAF",
+    ) -> str:
+        """Convenience method that builds and submits a payment request."""
+        payment = PaymentRequest.make(
+            amount=amount,
+            payer=phone,
+            external_id=reference,
+            currency=currency,
+        )
+        return await self.request_to_pay(payment)
+
+    def request_to_pay_many(
+        self, requests: Iterable[PaymentRequest], concurrency: int = 10
+    ) -> AsyncIterator[BatchResult]:
+        """Initiate many payment requests, at most ``concurrency`` at a time.
+
+        Use with ``async for``; see :meth:`CollectionApi.request_to_pay_many`.
+        """
+        return abounded_map(self.request_to_pay, requests, concurrency)
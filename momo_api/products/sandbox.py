@@ -1,7 +1,10 @@
+from typing import Optional
+
 import httpx
 
 from ..exceptions import create_exception
 from ..models.config import Config
+from ..support.transport import HttpTransport
 
 
 class SandboxApi:
@@ -9,9 +12,15 @@ class SandboxApi:
 
     BASE_PATH = "v1_0/apiuser"
 
-    def __init__(self, subscription_key: str, base_url: str):
+    def __init__(
+        self,
+        subscription_key: str,
+        base_url: str,
+        transport: Optional[HttpTransport] = None,
+    ):
         self._subscription_key = subscription_key
         self._base_url = base_url.rstrip("/")
+        self._transport = transport or HttpTransport.default()
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -47,24 +56,21 @@ class SandboxApi:
             **self._headers(),
             "X-Reference-Id": api_user,
         }
-        with httpx.Client() as client:
-            response = client.post(url, json=payload, headers=headers)
+        response = self._transport.post(url, json=payload, headers=headers)
         self._raise_for_status(response)
         return api_user
 
     def get_api_user(self, api_user: str) -> dict:
         """Retrieve details about a sandbox API user."""
         url = self._url(api_user)
-        with httpx.Client() as client:
-            response = client.get(url, headers=self._headers())
+        response = self._transport.get(url, headers=self._headers())
         self._raise_for_status(response)
         return response.json()
 
     def create_api_key(self, api_user: str) -> str:
         """Create an API key for a sandbox API user. Returns the generated API key string."""
         url = self._url(f"{api_user}/apikey")
-        with httpx.Client() as client:
-            response = client.post(url, headers=self._headers())
+        response = self._transport.post(url, headers=self._headers())
         self._raise_for_status(response)
         data = response.json()
         return data.get("apiKey", "")
@@ -0,0 +1,8 @@
+from .latency import Latency
+from .provider import SimulatedTransaction, Simulator
+
+__all__ = [
+    "Simulator",
+    "SimulatedTransaction",
+    "Latency",
+]
@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+
+from .latency import Latency
+from .provider import Simulator
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m momo_api.simulator",
+        description="Local MTN MoMo and Airtel Money provider for load and soak tests.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--latency",
+        type=Latency.parse,
+        default=Latency.constant(0.0),
+        help='response delay: seconds, "uniform:LOW,HIGH", "exp:MEAN" or "lognormal:MEDIAN,SIGMA"',
+    )
+    parser.add_argument(
+        "--token-latency", type=Latency.parse, help="response delay of the token endpoints"
+    )
+    parser.add_argument(
+        "--pending",
+        type=Latency.parse,
+        default=Latency.constant(1.0),
+        help="time a payment stays pending, same format as --latency",
+    )
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 500 responses")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of 429 responses")
+    parser.add_argument("--rate-limit", type=float, help="requests per second before 429s")
+    parser.add_argument("--airtel-callback-url")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    simulator = Simulator(
+        latency=args.latency,
+        latencies={"token": args.token_latency} if args.token_latency else None,
+        pending=args.pending,
+        failure_rate=args.failure_rate,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        rate_limit=args.rate_limit,
+        airtel_callback_url=args.airtel_callback_url,
+        seed=args.seed,
+    )
+    print(f"Simulating MTN MoMo and Airtel Money on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(simulator.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
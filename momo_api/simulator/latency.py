@@ -0,0 +1,57 @@
+import math
+import random
+from typing import Callable
+
+
+class Latency:
+    """A distribution of delays in seconds.
+
+    Build one with :meth:`constant`, :meth:`uniform`, :meth:`exponential` or
+    :meth:`lognormal`, or :meth:`parse` a command-line spec such as
+    ``"0.05"``, ``"uniform:0.01,0.2"``, ``"exp:0.05"`` or
+    ``"lognormal:0.05,0.6"``. Samples are capped at ``limit`` seconds.
+    """
+
+    def __init__(self, sample: Callable[[random.Random], float], limit: float = 60.0) -> None:
+        self._sample = sample
+        self._limit = limit
+
+    def sample(self, rng: random.Random) -> float:
+        return min(max(self._sample(rng), 0.0), self._limit)
+
+    @classmethod
+    def constant(cls, seconds: float) -> "Latency":
+        return cls(lambda rng: seconds)
+
+    @classmethod
+    def uniform(cls, low: float, high: float) -> "Latency":
+        return cls(lambda rng: rng.uniform(low, high))
+
+    @classmethod
+    def exponential(cls, mean: float) -> "Latency":
+        if mean <= 0:
+            return cls.constant(0.0)
+        return cls(lambda rng: rng.expovariate(1 / mean))
+
+    @classmethod
+    def lognormal(cls, median: float, sigma: float) -> "Latency":
+        """Long-tailed delays around ``median``, the usual shape of network latency."""
+        mu = math.log(median)
+        return cls(lambda rng: rng.lognormvariate(mu, sigma))
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        kind, _, args = spec.partition(":")
+        if not args:
+            return cls.constant(float(kind))
+        values = [float(value) for value in args.split(",")]
+        factories = {
+            "constant": cls.constant,
+            "uniform": cls.uniform,
+            "exp": cls.exponential,
+            "exponential": cls.exponential,
+            "lognormal": cls.lognormal,
+        }
+        if kind not in factories:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        return factories[kind](*values)
@@ -0,0 +1,500 @@
+import asyncio
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Mapping, Optional, Set, Tuple
+
+import httpx
+
+from ..support.codec import default_codec
+from ..support.metrics import operation_name
+from .latency import Latency
+from .server import HttpProtocol, Response
+
+STATUS_PENDING = "PENDING"
+STATUS_SUCCESSFUL = "SUCCESSFUL"
+STATUS_FAILED = "FAILED"
+
+MTN_PRODUCTS = ("collection", "disbursement", "remittance")
+# Operation -> party field of the request body (refunds have none).
+MTN_OPERATIONS = {"requesttopay": "payer", "deposit": "payee", "transfer": "payee", "refund": None}
+AIRTEL_OPERATIONS = ("payments", "disbursements")
+AIRTEL_STATUSES = {STATUS_PENDING: "TIP", STATUS_SUCCESSFUL: "TS", STATUS_FAILED: "TF"}
+AIRTEL_OK = {"code": "200", "message": "SUCCESS", "result_code": "ESB000010", "success": True}
+
+Result = Tuple[int, Optional[dict], Dict[str, str]]
+
+_NOT_FOUND: Result = (
+    404, {"code": "RESOURCE_NOT_FOUND", "message": "Requested resource was not found."}, {}
+)
+_UNAUTHORIZED: Result = (
+    401, {"code": "401", "message": "Access token is missing or invalid."}, {}
+)
+
+
+def _bad_request(message: str) -> Result:
+    return 400, {"code": "BAD_REQUEST", "message": message}, {}
+
+
+@dataclass
+class SimulatedTransaction:
+    """A payment the simulator accepted, and the outcome it will settle on."""
+
+    provider: str
+    reference_id: str
+    operation: str
+    request: dict
+    final_status: str
+    final_at: float
+    callback_url: Optional[str] = None
+    financial_id: str = ""
+
+    def status(self, now: Optional[float] = None) -> str:
+        now = time.monotonic() if now is None else now
+        return self.final_status if now >= self.final_at else STATUS_PENDING
+
+
+class Simulator:
+    """Local MTN MoMo and Airtel Money provider for load and soak tests.
+
+    Serves the endpoints the clients call: MTN tokens, ``requesttopay``,
+    ``deposit``, ``transfer``, ``refund``, balance and account holder
+    checks, and the Airtel token, ``payments``, ``disbursements`` and
+    balance endpoints. Access tokens it issues are checked on every call,
+    and a reused reference ID is answered with 409.
+
+    Each response waits ``latency`` (or the entry of ``latencies`` for its
+    operation, e.g. ``"token"`` or ``"requesttopay"``). ``error_rate`` and
+    ``throttle_rate`` answer that share of calls with a 500 or a 429;
+    ``rate_limit`` throttles calls above that many per second. Accepted
+    payments stay pending for a ``pending`` delay, then succeed or, for a
+    ``failure_rate`` share, fail; MTN payments sent with ``X-Callback-Url``
+    (and Airtel ones when ``airtel_callback_url`` is set) are then posted
+    to it.
+
+    It runs on asyncio: a slow response is a timer, not a blocked thread,
+    so one process sustains thousands of requests per second. Start it
+    with ``async with`` or :meth:`start`, from synchronous code with
+    ``with`` or :meth:`start_in_thread`, or from the command line with
+    ``python -m momo_api.simulator``.
+    """
+
+    def __init__(
+        self,
+        latency: Optional[Latency] = None,
+        latencies: Optional[Mapping[str, Latency]] = None,
+        pending: Optional[Latency] = None,
+        failure_rate: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        rate_limit: Optional[float] = None,
+        retry_after: int = 1,
+        token_ttl: int = 3600,
+        airtel_callback_url: Optional[str] = None,
+        inactive_numbers: Iterable[str] = (),
+        balance: str = "1000000",
+        currency: str = "XAF",
+        max_transactions: int = 1_000_000,
+        max_concurrent_callbacks: int = 100,
+        seed: Optional[int] = None,
+    ) -> None:
+        for name, rate in (
+            ("failure_rate", failure_rate),
+            ("error_rate", error_rate),
+            ("throttle_rate", throttle_rate),
+        ):
+            if not 0 <= rate <= 1:
+                raise ValueError(f"{name} must be between 0 and 1")
+        self._latency = latency or Latency.constant(0.0)
+        self._latencies = dict(latencies or {})
+        self._pending = pending or Latency.constant(1.0)
+        self._failure_rate = failure_rate
+        self._error_rate = error_rate
+        self._throttle_rate = throttle_rate
+        self._rate_limit = rate_limit
+        self._allowance = rate_limit or 0.0
+        self._allowance_at = time.monotonic()
+        self._retry_after = retry_after
+        self._token_ttl = token_ttl
+        self._airtel_callback_url = airtel_callback_url
+        self._inactive = frozenset(inactive_numbers)
+        self._balance = balance
+        self._currency = currency
+        self._max_transactions = max_transactions
+        self._max_concurrent_callbacks = max_concurrent_callbacks
+        self._random = random.Random(seed)
+
+        self._tokens: Dict[str, float] = {}
+        self._transactions: Dict[Tuple[str, str], SimulatedTransaction] = {}
+        self._stats = dict.fromkeys(
+            ("requests", "throttled", "errors", "callbacks_sent", "callbacks_failed"), 0
+        )
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[HttpProtocol] = set()
+        self._callbacks: Set["asyncio.Task[None]"] = set()
+        self._callback_slots: Optional[asyncio.Semaphore] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host = "127.0.0.1"
+        self._port = 0
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to give the MTN and Airtel products."""
+        return f"http://{self._host}:{self._port}"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+    def transaction(self, provider: str, reference_id: str) -> Optional[SimulatedTransaction]:
+        return self._transactions.get((provider, reference_id))
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def handle(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> Response:
+        """Answer one request; returns status, payload, headers and response delay."""
+        path = target.split("?", 1)[0]
+        operation = operation_name(path, default="")
+        latency = self._latencies.get(operation, self._latency)
+        delay = latency.sample(self._random)
+        self._stats["requests"] += 1
+        fault = self._fault()
+        if fault is not None:
+            return fault + (delay,)
+        status, payload, extra = self._route(method, path, headers, body)
+        return status, payload, extra, delay
+
+    def _fault(self) -> Optional[Result]:
+        if self._throttled() or (
+            self._throttle_rate and self._random.random() < self._throttle_rate
+        ):
+            self._stats["throttled"] += 1
+            return (
+                429,
+                {"code": "429", "message": "Rate limit exceeded, retry later."},
+                {"Retry-After": str(self._retry_after)},
+            )
+        if self._error_rate and self._random.random() < self._error_rate:
+            self._stats["errors"] += 1
+            return (
+                500,
+                {"code": "INTERNAL_PROCESSING_ERROR", "message": "An internal error occurred."},
+                {},
+            )
+        return None
+
+    def _throttled(self) -> bool:
+        """Token bucket of ``rate_limit`` calls per second, one second deep."""
+        if self._rate_limit is None:
+            return False
+        now = time.monotonic()
+        self._allowance = min(
+            self._rate_limit, self._allowance + (now - self._allowance_at) * self._rate_limit
+        )
+        self._allowance_at = now
+        if self._allowance < 1:
+            return True
+        self._allowance -= 1
+        return False
+
+    def _route(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Result:
+        parts = [part for part in path.split("/") if part]
+        if parts and parts[0] in MTN_PRODUCTS:
+            return self._mtn(method, parts[1:], headers, body)
+        if parts == ["auth", "oauth2", "token"] and method == "POST":
+            return self._issue_token("bearer")
+        if len(parts) >= 3 and parts[0] in ("merchant", "standard") and parts[1] == "v1":
+            return self._airtel(method, parts[2:], headers, body)
+        return _NOT_FOUND
+
+    def _issue_token(self, token_type: str) -> Result:
+        now = time.monotonic()
+        if len(self._tokens) > 10_000:
+            self._tokens = {t: exp for t, exp in self._tokens.items() if exp > now}
+        token = uuid.uuid4().hex
+        self._tokens[token] = now + self._token_ttl
+        payload = {"access_token": token, "token_type": token_type, "expires_in": self._token_ttl}
+        return 200, payload, {}
+
+    def _authorized(self, headers: Dict[str, str]) -> bool:
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        expires_at = self._tokens.get(token)
+        return scheme == "Bearer" and expires_at is not None and expires_at > time.monotonic()
+
+    def _create(
+        self, provider: str, reference_id: str, operation: str, request: dict,
+        callback_url: Optional[str],
+    ) -> SimulatedTransaction:
+        failed = self._failure_rate and self._random.random() < self._failure_rate
+        record = SimulatedTransaction(
+            provider=provider,
+            reference_id=reference_id,
+            operation=operation,
+            request=request,
+            final_status=STATUS_FAILED if failed else STATUS_SUCCESSFUL,
+            final_at=time.monotonic() + self._pending.sample(self._random),
+            callback_url=callback_url,
+            financial_id=str(self._random.randint(10**8, 10**9 - 1)),
+        )
+        self._transactions[(provider, reference_id)] = record
+        while len(self._transactions) > self._max_transactions:
+            del self._transactions[next(iter(self._transactions))]
+        if callback_url and self._loop is not None:
+            delay = max(record.final_at - time.monotonic(), 0.0)
+            self._loop.call_later(delay, self._start_callback, record)
+        return record
+
+    # ------------------------------------------------------------------
+    # MTN
+    # ------------------------------------------------------------------
+
+    def _mtn(self, method: str, parts: list, headers: Dict[str, str], body: bytes) -> Result:
+        if parts == ["token"]:
+            if method != "POST":
+                return _NOT_FOUND
+            if not headers.get("ocp-apim-subscription-key") or not headers.get(
+                "authorization", ""
+            ).startswith("Basic "):
+                return _UNAUTHORIZED
+            return self._issue_token("access_token")
+        if not self._authorized(headers):
+            return _UNAUTHORIZED
+        if len(parts) < 2 or parts[0] not in ("v1_0", "v2_0"):
+            return _NOT_FOUND
+        rest = parts[1:]
+        if method == "GET" and rest == ["account", "balance"]:
+            return 200, {"availableBalance": self._balance, "currency": self._currency}, {}
+        if method == "GET" and len(rest) == 4 and rest[0] == "accountholder":
+            return 200, {"result": rest[2] not in self._inactive}, {}
+        if rest[0] not in MTN_OPERATIONS:
+            return _NOT_FOUND
+        if method == "POST" and len(rest) == 1:
+            return self._mtn_create(rest[0], headers, body)
+        if method == "GET" and len(rest) == 2:
+            record = self._transactions.get(("mtn", rest[1]))
+            if record is None or record.operation != rest[0]:
+                return _NOT_FOUND
+            return 200, self._mtn_body(record), {}
+        return _NOT_FOUND
+
+    def _mtn_create(self, operation: str, headers: Dict[str, str], body: bytes) -> Result:
+        reference_id = headers.get("x-reference-id")
+        if not reference_id:
+            return _bad_request("X-Reference-Id header is required.")
+        try:
+            request = default_codec().loads(body or b"{}")
+        except ValueError:
+            return _bad_request("Request body is not valid JSON.")
+        if not isinstance(request, dict) or not request.get("amount"):
+            return _bad_request("amount is required.")
+        if ("mtn", reference_id) in self._transactions:
+            return (
+                409,
+                {"code": "RESOURCE_ALREADY_EXIST", "message": "Duplicated reference id."},
+                {},
+            )
+        self._create("mtn", reference_id, operation, request, headers.get("x-callback-url"))
+        return 202, None, {}
+
+    def _mtn_body(self, record: SimulatedTransaction) -> dict:
+        request = record.request
+        status = record.status()
+        body: Dict[str, Any] = {
+            "amount": request.get("amount", ""),
+            "currency": request.get("currency", self._currency),
+            "externalId": request.get("externalId", ""),
+            "payerMessage": request.get("payerMessage", ""),
+            "payeeNote": request.get("payeeNote", ""),
+            "status": status,
+        }
+        party = MTN_OPERATIONS[record.operation]
+        if party is not None and party in request:
+            body[party] = request[party]
+        if status == STATUS_SUCCESSFUL:
+            body["financialTransactionId"] = record.financial_id
+        elif status == STATUS_FAILED:
+            body["reason"] = {"code": "APPROVAL_REJECTED", "message": "Transaction was rejected"}
+        return body
+
+    # ------------------------------------------------------------------
+    # Airtel
+    # ------------------------------------------------------------------
+
+    def _airtel(self, method: str, parts: list, headers: Dict[str, str], body: bytes) -> Result:
+        if not self._authorized(headers):
+            return _UNAUTHORIZED
+        if method == "GET" and parts == ["users", "balance"]:
+            data = {
+                "balance": self._balance,
+                "currency": self._currency,
+                "account_status": "ACTIVE",
+            }
+            return 200, {"data": data, "status": AIRTEL_OK}, {}
+        if parts[0] not in AIRTEL_OPERATIONS:
+            return _NOT_FOUND
+        if method == "POST" and len(parts) == 1:
+            return self._airtel_create(parts[0], body)
+        if method == "GET" and len(parts) == 2:
+            record = self._transactions.get(("airtel", parts[1]))
+            if record is None or record.operation != parts[0]:
+                status = {"code": "404", "message": "Transaction not found", "success": False}
+                return 404, {"status": status}, {}
+            data = {"transaction": self._airtel_body(record)}
+            return 200, {"data": data, "status": AIRTEL_OK}, {}
+        return _NOT_FOUND
+
+    def _airtel_create(self, operation: str, body: bytes) -> Result:
+        try:
+            request = default_codec().loads(body or b"{}")
+            transaction_id = str(request["transaction"]["id"])
+        except (ValueError, KeyError, TypeError):
+            return _bad_request("transaction.id is required.")
+        if ("airtel", transaction_id) in self._transactions:
+            status = {"code": "409", "message": "Duplicate transaction id", "success": False}
+            return 409, {"status": status}, {}
+        self._create("airtel", transaction_id, operation, request, self._airtel_callback_url)
+        data = {"transaction": {"id": transaction_id, "status": "SUCCESS"}}
+        return 200, {"data": data, "status": AIRTEL_OK}, {}
+
+    def _airtel_body(self, record: SimulatedTransaction) -> dict:
+        status = record.status()
+        body = {
+            "id": record.reference_id,
+            "status": AIRTEL_STATUSES[status],
+            "message": {
+                STATUS_PENDING: "Transaction in progress",
+                STATUS_SUCCESSFUL: "Transaction is successful",
+                STATUS_FAILED: "Transaction failed",
+            }[status],
+        }
+        if status == STATUS_SUCCESSFUL:
+            body["airtel_money_id"] = f"MP{record.financial_id}"
+        return body
+
+    # ------------------------------------------------------------------
+    # Callbacks
+    # ------------------------------------------------------------------
+
+    def _start_callback(self, record: SimulatedTransaction) -> None:
+        assert self._loop is not None
+        task = self._loop.create_task(self._send_callback(record))
+        self._callbacks.add(task)
+        task.add_done_callback(self._callbacks.discard)
+
+    async def _send_callback(self, record: SimulatedTransaction) -> None:
+        if record.provider == "mtn":
+            payload = self._mtn_body(record)
+        else:
+            body = self._airtel_body(record)
+            payload = {"transaction": {**body, "status_code": body.pop("status")}}
+        if self._callback_slots is None:
+            self._callback_slots = asyncio.Semaphore(self._max_concurrent_callbacks)
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=10.0)
+        async with self._callback_slots:
+            try:
+                response = await self._client.post(
+                    str(record.callback_url),
+                    content=default_codec().dumps(payload),
+                    headers={"Content-Type": "application/json"},
+                )
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+        self._stats["callbacks_sent" if ok else "callbacks_failed"] += 1
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def _protocol(self) -> HttpProtocol:
+        return HttpProtocol(self.handle, self._connections)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Listen on ``host:port`` (any free port by default) in the running loop."""
+        self._loop = asyncio.get_running_loop()
+        self._server = await self._loop.create_server(self._protocol, host, port, backlog=2048)
+        self._host = host
+        self._port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop listening, drop open connections and pending callbacks."""
+        server, self._server = self._server, None
+        if server is not None:
+            server.close()
+        for connection in list(self._connections):
+            connection.close()
+        for task in list(self._callbacks):
+            task.cancel()
+        if self._callbacks:
+            await asyncio.gather(*self._callbacks, return_exceptions=True)
+        if server is not None:
+            await server.wait_closed()
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8080) -> None:
+        await self.start(host, port)
+        assert self._server is not None
+        try:
+            await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await self.stop()
+
+    async def __aenter__(self) -> "Simulator":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.stop()
+
+    def start_in_thread(self, host: str = "127.0.0.1", port: int = 0) -> "Simulator":
+        """Run the simulator on its own event loop in a daemon thread."""
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+        errors = []
+
+        def run() -> None:
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.start(host, port))
+            except BaseException as exc:
+                errors.append(exc)
+                started.set()
+                loop.close()
+                return
+            started.set()
+            loop.run_forever()
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="momo-simulator", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def stop_in_thread(self) -> None:
+        thread, loop = self._thread, self._loop
+        if thread is None or loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        self._thread = None
+
+    def __enter__(self) -> "Simulator":
+        return self.start_in_thread()
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop_in_thread()
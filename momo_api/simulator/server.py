@@ -0,0 +1,121 @@
+import asyncio
+from http import HTTPStatus
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from ..support.codec import default_codec
+
+MAX_HEADER_SIZE = 64 * 1024
+
+# (status, JSON payload or None, extra headers, delay in seconds)
+Response = Tuple[int, Optional[dict], Dict[str, str], float]
+Handler = Callable[[str, str, Dict[str, str], bytes], Response]
+
+_REASONS = {status.value: status.phrase for status in HTTPStatus}
+
+
+def encode_response(
+    status: int, payload: Optional[dict], headers: Dict[str, str], keep_alive: bool
+) -> bytes:
+    body = b"" if payload is None else default_codec().dumps(payload)
+    lines = [
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+        "Content-Type: application/json",
+        f"Content-Length: {len(body)}",
+    ]
+    if not keep_alive:
+        lines.append("Connection: close")
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+class HttpProtocol(asyncio.Protocol):
+    """Minimal HTTP/1.1 server connection: keep-alive, ``Content-Length`` bodies.
+
+    Requests on a connection are answered one at a time, in order; the
+    response is written after the delay the handler returns without
+    blocking the loop, so slow responses cost a timer, not a thread.
+    """
+
+    def __init__(self, handler: Handler, connections: Set["HttpProtocol"]) -> None:
+        self._handler = handler
+        self._connections = connections
+        self._buffer = bytearray()
+        self._busy = False
+        self._transport: Optional[asyncio.Transport] = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self._transport = transport  # type: ignore[assignment]
+        self._connections.add(self)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self._transport = None
+        self._connections.discard(self)
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+
+    def data_received(self, data: bytes) -> None:
+        self._buffer += data
+        if not self._busy:
+            self._next()
+
+    def _next(self) -> None:
+        end = self._buffer.find(b"\r\n\r\n")
+        if end < 0:
+            if len(self._buffer) > MAX_HEADER_SIZE:
+                self._reply(431, {"message": "Request headers too large"}, {}, False)
+            return
+        lines = self._buffer[:end].decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            self._reply(400, {"message": "Malformed request line"}, {}, False)
+            return
+        headers: Dict[str, str] = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            self._reply(411, {"message": "Content-Length required"}, {}, False)
+            return
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._reply(400, {"message": "Malformed Content-Length"}, {}, False)
+            return
+        start = end + 4
+        if len(self._buffer) < start + length:
+            return
+        body = bytes(self._buffer[start:start + length])
+        del self._buffer[:start + length]
+        keep_alive = (
+            version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        )
+
+        self._busy = True
+        try:
+            status, payload, extra, delay = self._handler(method, target, headers, body)
+        except Exception as exc:
+            status, payload, extra, delay = 500, {"message": str(exc)}, {}, 0.0
+        if delay > 0:
+            asyncio.get_running_loop().call_later(
+                delay, self._reply, status, payload, extra, keep_alive
+            )
+        else:
+            self._reply(status, payload, extra, keep_alive)
+
+    def _reply(
+        self, status: int, payload: Optional[dict], headers: Dict[str, str], keep_alive: bool
+    ) -> None:
+        transport = self._transport
+        if transport is None or transport.is_closing():
+            return
+        transport.write(encode_response(status, payload, headers, keep_alive))
+        self._busy = False
+        if not keep_alive:
+            transport.close()
+        elif self._buffer:
+            self._next()
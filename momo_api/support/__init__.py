@@ -0,0 +1,109 @@
+from .account_cache import AccountHolderCache
+from .callbacks import CallbackEvent, CallbackReceiver, parse_callback
+from .circuit_breaker import CircuitBreaker, CircuitState
+from .codec import (
+    JsonCodec,
+    MsgspecCodec,
+    OrjsonCodec,
+    StdlibJsonCodec,
+    available_codecs,
+    default_codec,
+    get_codec,
+)
+from .handles import PaymentHandle, PaymentTracker
+from .idempotency import (
+    Idempotency,
+    IdempotencyRecord,
+    IdempotencyStore,
+    MemoryIdempotencyStore,
+    SqliteIdempotencyStore,
+)
+from .instrumentation import RequestEvent, RequestObserver, RequestTrace
+from .metrics import (
+    HistogramSnapshot,
+    LatencyHistogram,
+    LatencySummary,
+    MetricsCollector,
+    render_prometheus,
+)
+from .poller import PollResult, StatusPoller, is_terminal
+from .rate_limit import (
+    BucketStore,
+    MemoryBucketStore,
+    RateLimit,
+    RateLimiter,
+    SharedBucketStore,
+)
+from .retry import RetryPolicy
+from .single_flight import SingleFlight
+from .status_cache import (
+    MemoryStatusStore,
+    SqliteStatusStore,
+    StatusCache,
+    StatusStore,
+)
+from .timing_wheel import TimingWheel
+from .token_cache import TokenCache
+from .token_store import (
+    MemoryTokenStore,
+    SqliteTokenStore,
+    StoredToken,
+    TokenStore,
+    token_key,
+)
+from .transport import AsyncHttpTransport, HttpTransport, PoolStats
+
+__all__ = [
+    "TokenCache",
+    "TokenStore",
+    "StoredToken",
+    "MemoryTokenStore",
+    "SqliteTokenStore",
+    "token_key",
+    "HttpTransport",
+    "AsyncHttpTransport",
+    "PoolStats",
+    "StatusPoller",
+    "PollResult",
+    "is_terminal",
+    "TimingWheel",
+    "RateLimit",
+    "RateLimiter",
+    "BucketStore",
+    "MemoryBucketStore",
+    "SharedBucketStore",
+    "RetryPolicy",
+    "CircuitBreaker",
+    "CircuitState",
+    "CallbackReceiver",
+    "CallbackEvent",
+    "parse_callback",
+    "PaymentHandle",
+    "PaymentTracker",
+    "AccountHolderCache",
+    "SingleFlight",
+    "StatusCache",
+    "StatusStore",
+    "MemoryStatusStore",
+    "SqliteStatusStore",
+    "Idempotency",
+    "IdempotencyRecord",
+    "IdempotencyStore",
+    "MemoryIdempotencyStore",
+    "SqliteIdempotencyStore",
+    "RequestEvent",
+    "RequestObserver",
+    "RequestTrace",
+    "MetricsCollector",
+    "LatencyHistogram",
+    "HistogramSnapshot",
+    "LatencySummary",
+    "render_prometheus",
+    "JsonCodec",
+    "StdlibJsonCodec",
+    "OrjsonCodec",
+    "MsgspecCodec",
+    "get_codec",
+    "default_codec",
+    "available_codecs",
+]
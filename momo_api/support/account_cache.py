@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+
+class AccountHolderCache:
+    """Bounded LRU cache of ``check_account_holder`` results.
+
+    Active account holders are remembered for ``ttl`` seconds and inactive
+    or unknown ones for ``negative_ttl`` seconds, so a number that gets
+    registered is picked up sooner. At most ``max_size`` numbers are kept;
+    the least recently used are dropped first. One cache can be shared by
+    the Collection and Disbursement clients of the same environment.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        ttl: float = 300.0,
+        negative_ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._max_size = max_size
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[bool, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, phone: str) -> Optional[bool]:
+        """Return the cached result for ``phone``, or ``None`` on a miss."""
+        with self._lock:
+            entry = self._entries.get(phone)
+            if entry is not None and entry[1] > self._clock():
+                self._entries.move_to_end(phone)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[phone]
+            self.misses += 1
+            return None
+
+    def put(self, phone: str, active: bool) -> None:
+        ttl = self._ttl if active else self._negative_ttl
+        with self._lock:
+            self._entries[phone] = (active, self._clock() + ttl)
+            self._entries.move_to_end(phone)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, phone: Optional[str] = None) -> None:
+        """Forget ``phone``, or every cached number when none is given."""
+        with self._lock:
+            if phone is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(phone, None)
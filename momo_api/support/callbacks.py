@@ -0,0 +1,257 @@
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+from urllib.parse import parse_qs
+
+from ..airtel.transaction import AirtelTransaction
+from ..models.transaction import Transaction
+from .codec import JsonCodec, default_codec
+
+PROVIDER_MTN = "mtn"
+PROVIDER_AIRTEL = "airtel"
+
+_JSON = [(b"content-type", b"application/json")]
+_TOO_LARGE = b'{"error": "callback body too large"}'
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+}
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CallbackEvent:
+    """A parsed provider callback.
+
+    ``expected`` tells whether ``reference_id`` was registered with
+    :meth:`CallbackReceiver.expect`; ``context`` is what was registered with it.
+    """
+
+    provider: str
+    reference_id: Optional[str]
+    transaction: Union[Transaction, AirtelTransaction]
+    expected: bool = False
+    context: Any = None
+
+
+def parse_callback(
+    payload: dict, query: Optional[Mapping[str, str]] = None
+) -> Tuple[str, Optional[str], Union[Transaction, AirtelTransaction]]:
+    """Parse an MTN or Airtel callback body into ``(provider, reference_id, transaction)``.
+
+    Airtel posts ``{"transaction": {"id", "status_code", ...}}`` where ``id``
+    is the transaction id returned by ``request_to_pay`` / ``transfer``. MTN
+    posts the same body as the status endpoints, without the reference ID;
+    it is taken from a ``referenceId`` field or query parameter when present
+    (e.g. a callback URL per payment), else left to correlation by externalId.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("callback payload must be a JSON object")
+    query = query or {}
+    data = payload.get("transaction")
+    if isinstance(data, dict):
+        transaction = AirtelTransaction.parse({
+            **data,
+            "status": data.get("status_code", data.get("status", "")),
+        })
+        return PROVIDER_AIRTEL, transaction.id or None, transaction
+    if "status" not in payload:
+        raise ValueError("callback payload has no transaction status")
+    reference_id = (
+        payload.get("referenceId") or query.get("referenceId") or query.get("reference_id")
+    )
+    return PROVIDER_MTN, reference_id, Transaction.parse(payload)
+
+
+class CallbackReceiver:
+    """Receives provider callbacks sent to ``X-Callback-Url``.
+
+    Mount :meth:`asgi` or :meth:`wsgi` under the path configured as
+    ``callback_uri``. Register each outstanding payment with :meth:`expect`;
+    incoming callbacks are parsed, correlated with it (by reference ID, or
+    by externalId for MTN) and passed to every listener as a
+    :class:`CallbackEvent`. At most ``max_pending`` references are tracked;
+    the oldest are forgotten first.
+
+    The apps answer 413 to bodies over ``max_body`` bytes without parsing
+    them. A listener that raises is logged and skipped, so the callback is
+    still acknowledged and the other listeners still run.
+    """
+
+    def __init__(
+        self,
+        max_pending: int = 100_000,
+        codec: Optional[JsonCodec] = None,
+        max_body: int = 64 * 1024,
+    ) -> None:
+        self._max_pending = max_pending
+        self._max_body = max_body
+        self._codec = codec or default_codec()
+        self._pending: "OrderedDict[str, Any]" = OrderedDict()
+        self._by_external_id: Dict[str, str] = {}
+        self._external_ids: Dict[str, str] = {}
+        self._listeners: List[Callable[[CallbackEvent], Any]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def expect(
+        self, reference_id: str, external_id: Optional[str] = None, context: Any = None
+    ) -> None:
+        """Track an outstanding payment until its callback arrives."""
+        with self._lock:
+            self._pending[reference_id] = context
+            self._pending.move_to_end(reference_id)
+            if external_id:
+                self._by_external_id[external_id] = reference_id
+                self._external_ids[reference_id] = external_id
+            while len(self._pending) > self._max_pending:
+                self._drop(next(iter(self._pending)))
+
+    def expect_many(self, reference_ids: Iterable[str]) -> None:
+        for reference_id in reference_ids:
+            self.expect(reference_id)
+
+    def forget(self, reference_id: str) -> bool:
+        """Stop tracking ``reference_id``; returns whether it was tracked."""
+        with self._lock:
+            return self._drop(reference_id)
+
+    def _drop(self, reference_id: str) -> bool:
+        if reference_id not in self._pending:
+            return False
+        del self._pending[reference_id]
+        external_id = self._external_ids.pop(reference_id, None)
+        if external_id is not None:
+            self._by_external_id.pop(external_id, None)
+        return True
+
+    def add_listener(self, listener: Callable[[CallbackEvent], Any]) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[CallbackEvent], Any]) -> None:
+        self._listeners.remove(listener)
+
+    def handle(self, body: bytes, query: Optional[Mapping[str, str]] = None) -> CallbackEvent:
+        """Parse one callback body, correlate it and notify the listeners.
+
+        Raises ``ValueError`` for a body that is not a provider callback.
+        """
+        try:
+            payload = self._codec.loads(body)
+        except ValueError:
+            raise
+        except Exception as exc:
+            # A custom codec, or the stdlib's recursion limit, may raise something else.
+            raise ValueError(f"callback body is not valid JSON: {exc!r}") from exc
+        provider, reference_id, transaction = parse_callback(payload, query)
+        with self._lock:
+            if (
+                reference_id is None
+                and isinstance(transaction, Transaction)
+                and isinstance(transaction.external_id, str)
+            ):
+                reference_id = self._by_external_id.get(transaction.external_id)
+            expected = reference_id is not None and reference_id in self._pending
+            context = self._pending.get(reference_id) if expected else None
+            # A PENDING notification is intermediate: keep waiting for the final one.
+            if expected and not transaction.is_pending():
+                self._drop(reference_id)  # type: ignore[arg-type]
+        event = CallbackEvent(provider, reference_id, transaction, expected, context)
+        for listener in list(self._listeners):
+            try:
+                listener(event)
+            except Exception:
+                logger.exception("callback listener %r failed for %s", listener, reference_id)
+        return event
+
+    def _respond(self, method: str, body: bytes, query: Mapping[str, str]) -> Tuple[int, bytes]:
+        if method not in ("POST", "PUT"):
+            return 405, b'{"error": "method not allowed"}'
+        try:
+            self.handle(body, query)
+        except ValueError:
+            return 400, b'{"error": "invalid callback payload"}'
+        return 200, b'{"status": "ok"}'
+
+    async def asgi(self, scope: dict, receive: Callable, send: Callable) -> None:
+        """ASGI application receiving callbacks."""
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+        body = bytearray()
+        more = True
+        while more and len(body) <= self._max_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more = message.get("more_body", False)
+        if len(body) > self._max_body:
+            status, payload = 413, _TOO_LARGE
+        else:
+            query = _query(scope.get("query_string", b"").decode("latin-1"))
+            status, payload = self._respond(scope["method"], bytes(body), query)
+        await send({"type": "http.response.start", "status": status, "headers": _JSON})
+        await send({"type": "http.response.body", "body": payload})
+        # Discard the rest of a rejected body so the connection can be reused.
+        while more:
+            message = await receive()
+            more = message["type"] == "http.request" and message.get("more_body", False)
+
+    def wsgi(self, environ: dict, start_response: Callable) -> List[bytes]:
+        """WSGI application receiving callbacks.
+
+        A body without Content-Length (e.g. chunked) is read up to the size
+        limit when the server marks its input as terminated
+        (``wsgi.input_terminated``), and is taken as empty otherwise.
+        """
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or -1)
+        except ValueError:
+            length = 0
+        stream = environ["wsgi.input"]
+        if length < 0:
+            terminated = environ.get("wsgi.input_terminated")
+            body: Optional[bytes] = _read_until(stream, self._max_body + 1) if terminated else b""
+        elif length <= self._max_body:
+            body = stream.read(length) if length else b""
+        else:
+            body = None
+        if body is None or len(body) > self._max_body:
+            status, payload = 413, _TOO_LARGE
+        else:
+            query = _query(environ.get("QUERY_STRING", ""))
+            status, payload = self._respond(environ["REQUEST_METHOD"], body, query)
+        start_response(
+            f"{status} {_REASONS[status]}",
+            [("Content-Type", "application/json"), ("Content-Length", str(len(payload)))],
+        )
+        return [payload]
+
+
+def _read_until(stream: Any, limit: int) -> bytes:
+    """Read ``stream`` to its end or to ``limit`` bytes, whichever comes first."""
+    body = bytearray()
+    while len(body) < limit:
+        chunk = stream.read(limit - len(body))
+        if not chunk:
+            break
+        body += chunk
+    return bytes(body)
+
+
+def _query(query_string: str) -> Dict[str, str]:
+    return {key: values[-1] for key, values in parse_qs(query_string).items()}
@@ -0,0 +1,184 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from ..exceptions import CircuitOpenException
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+@dataclass
+class CircuitState:
+    """Snapshot of one circuit, e.g. for a dashboard."""
+
+    key: str
+    state: str
+    consecutive_failures: int
+    opened_at: Optional[float]
+    total_failures: int
+    total_rejected: int
+
+
+class _Circuit:
+    __slots__ = (
+        "key", "state", "failures", "opened_at", "probes",
+        "total_failures", "total_rejected",
+    )
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probes = 0
+        self.total_failures = 0
+        self.total_rejected = 0
+
+
+class CircuitBreaker:
+    """Fails fast while an API keeps failing, instead of waiting on timeouts.
+
+    The products keep one circuit per base URL and product (MTN
+    ``collection`` / ``disbursement``, Airtel ``merchant`` / ``standard`` /
+    ``auth``). A circuit opens after ``failure_threshold`` consecutive
+    failures (timeouts, connection errors or 5xx responses); while open,
+    requests raise :class:`CircuitOpenException` without being sent. After
+    ``recovery_timeout`` seconds the circuit turns half-open and lets up to
+    ``half_open_probes`` requests through: a success closes it, a failure
+    opens it again.
+
+    Share one breaker between products (and threads) to share their view of
+    each API's health.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_probes: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        if half_open_probes < 1:
+            raise ValueError("half_open_probes must be at least 1")
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._half_open_probes = half_open_probes
+        self._clock = clock
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def state(self, key: str) -> str:
+        """Current state of circuit ``key`` (``closed`` if never used)."""
+        with self._lock:
+            circuit = self._circuits.get(key)
+            return STATE_CLOSED if circuit is None else self._state(circuit)
+
+    def snapshot(self) -> Dict[str, CircuitState]:
+        """State of every circuit seen so far."""
+        with self._lock:
+            return {
+                key: CircuitState(
+                    key=key,
+                    state=self._state(circuit),
+                    consecutive_failures=circuit.failures,
+                    opened_at=circuit.opened_at,
+                    total_failures=circuit.total_failures,
+                    total_rejected=circuit.total_rejected,
+                )
+                for key, circuit in self._circuits.items()
+            }
+
+    def reset(self, key: Optional[str] = None) -> None:
+        """Close circuit ``key`` (or every circuit)."""
+        with self._lock:
+            if key is None:
+                self._circuits.clear()
+            else:
+                self._circuits.pop(key, None)
+
+    def _recovered(self, circuit: _Circuit) -> bool:
+        assert circuit.opened_at is not None
+        return self._clock() - circuit.opened_at >= self._recovery_timeout
+
+    def _state(self, circuit: _Circuit) -> str:
+        if circuit.state == STATE_OPEN and self._recovered(circuit):
+            return STATE_HALF_OPEN
+        return circuit.state
+
+    def _admit(self, key: str) -> _Circuit:
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None:
+                circuit = self._circuits[key] = _Circuit(key)
+            if circuit.state == STATE_OPEN and self._recovered(circuit):
+                circuit.state = STATE_HALF_OPEN
+                circuit.probes = 0
+            if circuit.state == STATE_CLOSED:
+                return circuit
+            if circuit.state == STATE_HALF_OPEN and circuit.probes < self._half_open_probes:
+                circuit.probes += 1
+                return circuit
+            circuit.total_rejected += 1
+            assert circuit.opened_at is not None
+            retry_after = max(0.0, circuit.opened_at + self._recovery_timeout - self._clock())
+        raise CircuitOpenException(
+            f"Circuit {key} is open after repeated failures", key=key, retry_after=retry_after
+        )
+
+    def _record(self, circuit: _Circuit, ok: bool) -> None:
+        with self._lock:
+            if circuit.state == STATE_HALF_OPEN:
+                circuit.probes = max(0, circuit.probes - 1)
+            if ok:
+                circuit.state = STATE_CLOSED
+                circuit.failures = 0
+                circuit.opened_at = None
+                return
+            circuit.failures += 1
+            circuit.total_failures += 1
+            if circuit.state == STATE_HALF_OPEN or circuit.failures >= self._failure_threshold:
+                circuit.state = STATE_OPEN
+                circuit.opened_at = self._clock()
+
+    def _release(self, circuit: _Circuit) -> None:
+        """Give back a probe slot for a call that ended without an outcome."""
+        with self._lock:
+            if circuit.state == STATE_HALF_OPEN:
+                circuit.probes = max(0, circuit.probes - 1)
+
+    def call(self, key: str, send: Callable[[], httpx.Response]) -> httpx.Response:
+        """Run ``send`` through circuit ``key``, recording its outcome."""
+        circuit = self._admit(key)
+        try:
+            response = send()
+        except httpx.TransportError:
+            self._record(circuit, ok=False)
+            raise
+        except BaseException:
+            self._release(circuit)
+            raise
+        self._record(circuit, ok=response.status_code < 500)
+        return response
+
+    async def acall(
+        self, key: str, send: Callable[[], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        """Asyncio counterpart of :meth:`call`."""
+        circuit = self._admit(key)
+        try:
+            response = await send()
+        except httpx.TransportError:
+            self._record(circuit, ok=False)
+            raise
+        except BaseException:
+            self._release(circuit)
+            raise
+        self._record(circuit, ok=response.status_code < 500)
+        return response
@@ -0,0 +1,125 @@
+import json
+import os
+from typing import Any, Dict, Optional, Protocol, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depends on the environment
+    msgspec = None  # type: ignore[assignment]
+
+CODEC_ENV = "MOMO_JSON_CODEC"
+
+
+class JsonCodec(Protocol):
+    """Encodes request bodies to bytes and decodes raw response bytes.
+
+    ``loads`` raises ``ValueError`` for a body that is not valid JSON.
+    """
+
+    name: str
+
+    def dumps(self, obj: Any) -> bytes:
+        ...
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        ...
+
+
+class StdlibJsonCodec:
+    """The standard library ``json`` module, always available."""
+
+    name = "stdlib"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    """`orjson <https://github.com/ijl/orjson>`_, encoding and decoding in Rust."""
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        if orjson is None:
+            raise ImportError("orjson is not installed")
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+
+class MsgspecCodec:
+    """`msgspec <https://jcristharif.com/msgspec/>`_ JSON encoder and decoder."""
+
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        if msgspec is None:
+            raise ImportError("msgspec is not installed")
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except msgspec.DecodeError as exc:
+            raise ValueError(str(exc)) from exc
+
+
+CODECS = {
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+    "stdlib": StdlibJsonCodec,
+}
+
+_codecs: Dict[str, JsonCodec] = {}
+
+
+def get_codec(name: str) -> JsonCodec:
+    """Return the codec called ``name`` (``orjson``, ``msgspec`` or ``stdlib``)."""
+    codec = _codecs.get(name)
+    if codec is None:
+        if name not in CODECS:
+            raise ValueError(f"Unknown JSON codec: {name}")
+        codec = _codecs[name] = CODECS[name]()
+    return codec
+
+
+def available_codecs() -> Dict[str, JsonCodec]:
+    """Every codec whose library is installed, fastest first."""
+    available = {}
+    for name in CODECS:
+        try:
+            available[name] = get_codec(name)
+        except ImportError:
+            continue
+    return available
+
+
+_default: Optional[JsonCodec] = None
+
+
+def default_codec() -> JsonCodec:
+    """The codec the products use unless given another one.
+
+    ``orjson`` when installed, else ``msgspec``, else the standard library;
+    the ``MOMO_JSON_CODEC`` environment variable forces a choice.
+    """
+    global _default
+    if _default is None:
+        forced = os.environ.get(CODEC_ENV)
+        _default = get_codec(forced) if forced else next(iter(available_codecs().values()))
+    return _default
@@ -0,0 +1,170 @@
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import httpx
+
+from ..exceptions import MomoException
+from ..models.batch_result import BatchResult
+from ..models.transaction import Transaction
+from ..models.transaction_batch import TransactionBatch
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Per-item failures that are reported in the result instead of aborting the batch.
+ITEM_ERRORS = (MomoException, httpx.HTTPError)
+
+
+def bounded_imap(
+    fn: Callable[[T], R], items: Iterable[T], concurrency: int
+) -> Iterator[Tuple[int, T, R]]:
+    """Run ``fn`` over ``items`` on at most ``concurrency`` threads.
+
+    Items are pulled from ``items`` lazily, so arbitrarily long iterables are
+    streamed, and ``(index, item, result)`` tuples are yielded as calls
+    complete. An exception raised by ``fn`` propagates to the caller.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    def call(index: int, item: T) -> Tuple[int, T, R]:
+        return index, item, fn(item)
+
+    pending: Set["Future[Tuple[int, T, R]]"] = set()
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="momo-batch")
+    try:
+        for index, item in enumerate(items):
+            pending.add(executor.submit(call, index, item))
+            if len(pending) < concurrency:
+                continue
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+async def abounded_imap(
+    fn: Callable[[T], Awaitable[R]], items: Iterable[T], concurrency: int
+) -> AsyncIterator[Tuple[int, T, R]]:
+    """Asyncio counterpart of :func:`bounded_imap` running at most ``concurrency`` tasks."""
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    async def call(index: int, item: T) -> Tuple[int, T, R]:
+        return index, item, await fn(item)
+
+    pending: Set["asyncio.Task[Tuple[int, T, R]]"] = set()
+    try:
+        for index, item in enumerate(items):
+            pending.add(asyncio.ensure_future(call(index, item)))
+            if len(pending) < concurrency:
+                continue
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def bounded_map(
+    fn: Callable[[T], str], items: Iterable[T], concurrency: int
+) -> Iterator[BatchResult]:
+    """Like :func:`bounded_imap` for calls returning a reference ID.
+
+    Item failures are captured in :class:`BatchResult` instead of raised.
+    """
+
+    def call(item: T) -> Tuple[Optional[str], Optional[Exception]]:
+        try:
+            return fn(item), None
+        except ITEM_ERRORS as exc:
+            return None, exc
+
+    for index, item, (reference_id, error) in bounded_imap(call, items, concurrency):
+        yield BatchResult(index=index, request=item, reference_id=reference_id, error=error)
+
+
+async def abounded_map(
+    fn: Callable[[T], Awaitable[str]], items: Iterable[T], concurrency: int
+) -> AsyncIterator[BatchResult]:
+    """Asyncio counterpart of :func:`bounded_map`."""
+
+    async def call(item: T) -> Tuple[Optional[str], Optional[Exception]]:
+        try:
+            return await fn(item), None
+        except ITEM_ERRORS as exc:
+            return None, exc
+
+    async for index, item, (reference_id, error) in abounded_imap(call, items, concurrency):
+        yield BatchResult(index=index, request=item, reference_id=reference_id, error=error)
+
+
+StatusRow = Union[Transaction, dict]
+
+
+def collect_statuses(
+    fetch: Callable[[str], StatusRow], reference_ids: Iterable[str], concurrency: int
+) -> TransactionBatch:
+    """Look up every reference with ``fetch`` into one :class:`TransactionBatch`.
+
+    ``fetch`` returns a transaction or a decoded status response; rows are
+    appended in completion order and failed lookups land in ``errors``.
+    """
+    batch = TransactionBatch()
+
+    def call(reference_id: str) -> Tuple[Optional[StatusRow], Optional[Exception]]:
+        try:
+            return fetch(reference_id), None
+        except ITEM_ERRORS as exc:
+            return None, exc
+
+    for _, reference_id, (row, error) in bounded_imap(call, reference_ids, concurrency):
+        if error is None:
+            batch.append(reference_id, row)  # type: ignore[arg-type]
+        else:
+            batch.errors[reference_id] = error
+    return batch
+
+
+async def acollect_statuses(
+    fetch: Callable[[str], Awaitable[StatusRow]], reference_ids: Iterable[str], concurrency: int
+) -> TransactionBatch:
+    """Asyncio counterpart of :func:`collect_statuses`."""
+    batch = TransactionBatch()
+
+    async def call(reference_id: str) -> Tuple[Optional[StatusRow], Optional[Exception]]:
+        try:
+            return await fetch(reference_id), None
+        except ITEM_ERRORS as exc:
+            return None, exc
+
+    async for _, reference_id, (row, error) in abounded_imap(call, reference_ids, concurrency):
+        if error is None:
+            batch.append(reference_id, row)  # type: ignore[arg-type]
+        else:
+            batch.errors[reference_id] = error
+    return batch
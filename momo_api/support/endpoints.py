@@ -0,0 +1,6 @@
+# Endpoint classes each product request belongs to. Rate limits, retries
+# and instrumentation are configured and reported per class.
+ENDPOINT_TOKEN = "token"
+ENDPOINT_INITIATE = "initiate"
+ENDPOINT_STATUS = "status"
+ENDPOINT_BALANCE = "balance"
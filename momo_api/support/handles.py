@@ -0,0 +1,223 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Generator, List, Optional, Tuple
+
+from ..exceptions import PaymentTimeoutException
+from .callbacks import CallbackEvent, CallbackReceiver
+from .poller import PollResult, StatusPoller, is_terminal
+
+
+class PaymentHandle:
+    """The eventual outcome of one initiated payment.
+
+    Resolves to the terminal ``Transaction`` / ``AirtelTransaction``, or
+    fails with :class:`PaymentTimeoutException` at its deadline (or with the
+    lookup error polling gave up on). Use :meth:`result` from threads, or
+    ``await handle`` from coroutines on any event loop.
+    """
+
+    def __init__(self, reference_id: str, context: Any = None) -> None:
+        self.reference_id = reference_id
+        self.context = context
+        self._future: "Future[Any]" = Future()
+
+    @property
+    def future(self) -> "Future[Any]":
+        return self._future
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """Block until the payment is final and return its transaction."""
+        return self._future.result(timeout)
+
+    def add_done_callback(self, fn: Callable[["Future[Any]"], Any]) -> None:
+        self._future.add_done_callback(fn)
+
+    def __await__(self) -> Generator[Any, None, Any]:
+        return asyncio.wrap_future(self._future).__await__()
+
+    def __repr__(self) -> str:
+        state = "done" if self.done() else "pending"
+        return f"PaymentHandle({self.reference_id!r}, {state})"
+
+
+class PaymentTracker:
+    """Hands out :class:`PaymentHandle` objects and resolves them.
+
+    A handle completes through whichever arrives first: a callback delivered
+    to ``receiver`` or a terminal status found by polling ``fetch`` (e.g.
+    ``collection.get_payment_status``) from a background thread. Each handle
+    has a ``deadline`` in seconds.
+
+    Pending handles are kept in a registry of at most ``max_handles``
+    entries; a handle still pending ``ttl`` seconds after it was created, or
+    evicted to make room, fails with :class:`PaymentTimeoutException` so
+    abandoned handles never pile up. Expired handles are swept whenever a
+    handle is tracked or resolved. Extra keyword arguments configure the
+    :class:`StatusPoller`, except ``on_result``: the tracker consumes the
+    poll results itself.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Any],
+        receiver: Optional[CallbackReceiver] = None,
+        deadline: float = 300.0,
+        ttl: float = 3600.0,
+        max_handles: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+        **poller_options: Any,
+    ) -> None:
+        if "on_result" in poller_options:
+            raise TypeError(
+                "PaymentTracker consumes poll results itself; "
+                "add a done callback to the handles instead of on_result"
+            )
+        self._deadline = deadline
+        self._ttl = ttl
+        self._max_handles = max_handles
+        self._clock = clock
+        self._handles: "OrderedDict[str, Tuple[PaymentHandle, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._poller = StatusPoller(
+            fetch, on_result=self._on_poll_result, clock=clock, **poller_options
+        )
+        self._receiver = receiver
+        if receiver is not None:
+            receiver.add_listener(self._on_callback)
+
+    @property
+    def pending(self) -> int:
+        return len(self._handles)
+
+    def start(self) -> None:
+        """Start the background polling thread."""
+        self._poller.start()
+
+    def stop(self) -> None:
+        """Stop polling; pending handles stay pending."""
+        self._poller.stop()
+
+    def __enter__(self) -> "PaymentTracker":
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def track(
+        self,
+        reference_id: str,
+        external_id: Optional[str] = None,
+        context: Any = None,
+        deadline: Optional[float] = None,
+    ) -> PaymentHandle:
+        """Return the handle for an initiated payment, tracking it if new.
+
+        Pass ``external_id`` so MTN callbacks, which lack the reference ID,
+        can be matched.
+        """
+        entry = self._handles.get(reference_id)
+        if entry is not None:
+            return entry[0]
+        self._evict()
+        with self._lock:
+            entry = self._handles.get(reference_id)
+            if entry is not None:
+                return entry[0]
+            handle = PaymentHandle(reference_id, context)
+            self._handles[reference_id] = (handle, self._clock() + self._ttl)
+        if self._receiver is not None:
+            self._receiver.expect(reference_id, external_id)
+        self._poller.add(reference_id, timeout=self._deadline if deadline is None else deadline)
+        return handle
+
+    def submit(self, initiate: Callable[..., str], *args: Any, **kwargs: Any) -> PaymentHandle:
+        """Call ``initiate`` (e.g. ``collection.request_to_pay``) and track its reference.
+
+        The external ID of a ``PaymentRequest`` / ``TransferRequest``
+        argument is tracked too, so MTN callbacks resolve the handle.
+        """
+        return self.track(initiate(*args, **kwargs), _external_id(args, kwargs))
+
+    async def asubmit(
+        self, initiate: Callable[..., Awaitable[str]], *args: Any, **kwargs: Any
+    ) -> PaymentHandle:
+        """Await ``initiate`` (e.g. an async ``request_to_pay``) and track its reference.
+
+        See :meth:`submit`.
+        """
+        return self.track(await initiate(*args, **kwargs), _external_id(args, kwargs))
+
+    def _take(self, reference_id: str) -> Optional[PaymentHandle]:
+        with self._lock:
+            entry = self._handles.pop(reference_id, None)
+        if entry is None:
+            return None
+        self._poller.remove(reference_id)
+        if self._receiver is not None:
+            self._receiver.forget(reference_id)
+        self._evict()
+        return entry[0]
+
+    def _evict(self) -> None:
+        now = self._clock()
+        expired: List[PaymentHandle] = []
+        with self._lock:
+            while self._handles:
+                reference_id, (handle, expires_at) = next(iter(self._handles.items()))
+                if expires_at > now and len(self._handles) < self._max_handles:
+                    break
+                del self._handles[reference_id]
+                expired.append(handle)
+        # Resolve outside the lock: done callbacks may call back into the tracker.
+        for handle in expired:
+            self._poller.remove(handle.reference_id)
+            if self._receiver is not None:
+                self._receiver.forget(handle.reference_id)
+            if handle.done():
+                continue
+            handle.future.set_exception(
+                PaymentTimeoutException(
+                    f"Payment {handle.reference_id} was evicted before it completed",
+                    reference_id=handle.reference_id,
+                )
+            )
+
+    def _on_callback(self, event: CallbackEvent) -> None:
+        if event.reference_id is None or not is_terminal(event.transaction):
+            return
+        handle = self._take(event.reference_id)
+        if handle is not None and not handle.done():
+            handle.future.set_result(event.transaction)
+
+    def _on_poll_result(self, result: PollResult) -> None:
+        handle = self._take(result.reference_id)
+        if handle is None or handle.done():
+            return
+        if result.ok:
+            handle.future.set_result(result.transaction)
+        elif result.timed_out:
+            handle.future.set_exception(
+                PaymentTimeoutException(
+                    f"Payment {result.reference_id} is not final after its deadline",
+                    reference_id=result.reference_id,
+                    transaction=result.transaction,
+                )
+            )
+        else:
+            handle.future.set_exception(result.error or RuntimeError("polling failed"))
+
+
+def _external_id(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Optional[str]:
+    """The ``external_id`` of the request object among an initiate call's arguments."""
+    for value in (*args, *kwargs.values()):
+        external_id = getattr(value, "external_id", None)
+        if isinstance(external_id, str) and external_id:
+            return external_id
+    return None
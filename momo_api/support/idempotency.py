@@ -0,0 +1,235 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Awaitable, Callable, Dict, Optional, Protocol, Tuple
+
+from ..exceptions import ConflictException, IdempotencyConflictException, MomoException
+
+STATE_PENDING = "pending"
+STATE_SENT = "sent"
+
+
+@dataclass(frozen=True)
+class IdempotencyRecord:
+    """The reference assigned to a business key, and what was sent under it.
+
+    ``state`` is ``pending`` until the provider accepted the request (or its
+    outcome is unknown), then ``sent``.
+    """
+
+    reference_id: str
+    fingerprint: str
+    state: str = STATE_PENDING
+
+
+class IdempotencyStore(Protocol):
+    """Backend mapping idempotency keys to :class:`IdempotencyRecord`."""
+
+    def load(self, key: str) -> Optional[IdempotencyRecord]:
+        ...
+
+    def reserve(self, key: str, record: IdempotencyRecord) -> Tuple[IdempotencyRecord, bool]:
+        """Store ``record`` unless ``key`` exists; return the stored one and if it is new."""
+        ...
+
+    def mark_sent(self, key: str) -> None:
+        ...
+
+    def delete(self, key: str) -> None:
+        ...
+
+
+class MemoryIdempotencyStore:
+    """Process-local idempotency store, mostly for tests."""
+
+    def __init__(self) -> None:
+        self._records: Dict[str, IdempotencyRecord] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def load(self, key: str) -> Optional[IdempotencyRecord]:
+        return self._records.get(key)
+
+    def reserve(self, key: str, record: IdempotencyRecord) -> Tuple[IdempotencyRecord, bool]:
+        with self._lock:
+            stored = self._records.setdefault(key, record)
+        return stored, stored is record
+
+    def mark_sent(self, key: str) -> None:
+        with self._lock:
+            record = self._records.get(key)
+            if record is not None:
+                self._records[key] = replace(record, state=STATE_SENT)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._records.pop(key, None)
+
+
+class SqliteIdempotencyStore:
+    """Idempotency store in a SQLite file, shared across processes and restarts.
+
+    Keys are the table's primary key (a clustered B-tree), so lookups stay
+    O(log n) at millions of rows. Like :class:`SqliteTokenStore` it runs in
+    WAL mode with one connection per thread.
+    """
+
+    def __init__(self, path: str, timeout: float = 5.0) -> None:
+        self._path = path
+        self._timeout = timeout
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS idempotency ("
+                " key TEXT PRIMARY KEY,"
+                " reference_id TEXT NOT NULL,"
+                " fingerprint TEXT NOT NULL,"
+                " state TEXT NOT NULL,"
+                " created_at REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self._path, timeout=self._timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM idempotency").fetchone()[0]
+
+    def load(self, key: str) -> Optional[IdempotencyRecord]:
+        row = self._connect().execute(
+            "SELECT reference_id, fingerprint, state FROM idempotency WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return IdempotencyRecord(reference_id=row[0], fingerprint=row[1], state=row[2])
+
+    def reserve(self, key: str, record: IdempotencyRecord) -> Tuple[IdempotencyRecord, bool]:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO idempotency"
+                " (key, reference_id, fingerprint, state, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, record.reference_id, record.fingerprint, record.state, time.time()),
+            )
+        if cursor.rowcount == 1:
+            return record, True
+        stored = self.load(key)
+        return (stored, False) if stored is not None else (record, False)
+
+    def mark_sent(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute("UPDATE idempotency SET state = ? WHERE key = ?", (STATE_SENT, key))
+
+    def delete(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM idempotency WHERE key = ?", (key,))
+
+
+def request_fingerprint(payload: dict) -> str:
+    """Digest of a request body, independent of key order."""
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _rejected(error: BaseException) -> bool:
+    """Whether the provider definitely refused the request, so it may be sent anew."""
+    if not isinstance(error, MomoException) or error.status_code is None:
+        return False
+    return 400 <= error.status_code < 500 and error.status_code not in (409, 429)
+
+
+class Idempotency:
+    """Makes payment initiation idempotent per business key.
+
+    The first call for a key (e.g. a ``PaymentRequest.external_id``) stores
+    the reference ID it sends under, with a fingerprint of the request. A
+    repeat call returns that reference without sending again once the
+    provider accepted it; while the outcome is unknown (timeout, 5xx) it
+    resends under the same reference, which the provider deduplicates. A
+    request the provider rejected (4xx) releases the key. Reusing a key for
+    a different request raises :class:`IdempotencyConflictException`.
+
+    Records go to a :class:`SqliteIdempotencyStore` at ``path`` unless
+    another ``store`` is given.
+    """
+
+    def __init__(self, path: Optional[str] = None, store: Optional[IdempotencyStore] = None):
+        if store is None:
+            if path is None:
+                raise ValueError("Idempotency needs a SQLite path or a store")
+            store = SqliteIdempotencyStore(path)
+        self._store: IdempotencyStore = store
+
+    @property
+    def store(self) -> IdempotencyStore:
+        return self._store
+
+    def lookup(self, key: str) -> Optional[IdempotencyRecord]:
+        return self._store.load(key)
+
+    def _reserve(
+        self, key: str, payload: dict, reference_id: str
+    ) -> Tuple[IdempotencyRecord, bool]:
+        fingerprint = request_fingerprint(payload)
+        record, fresh = self._store.reserve(key, IdempotencyRecord(reference_id, fingerprint))
+        if record.fingerprint != fingerprint:
+            raise IdempotencyConflictException(
+                f"Idempotency key {key} was already used for a different request",
+                key=key,
+                reference_id=record.reference_id,
+            )
+        return record, fresh
+
+    def _failed(self, key: str, error: BaseException, fresh: bool) -> bool:
+        """Record a failed send; returns whether it actually succeeded earlier."""
+        if isinstance(error, ConflictException) and not fresh:
+            # An earlier attempt under this reference was accepted.
+            self._store.mark_sent(key)
+            return True
+        if _rejected(error):
+            self._store.delete(key)
+        return False
+
+    def call(
+        self, key: str, payload: dict, reference_id: str, send: Callable[[str], object]
+    ) -> str:
+        """Send under the reference recorded for ``key``; returns that reference."""
+        record, fresh = self._reserve(key, payload, reference_id)
+        if record.state == STATE_SENT:
+            return record.reference_id
+        try:
+            send(record.reference_id)
+        except Exception as exc:
+            if not self._failed(key, exc, fresh):
+                raise
+            return record.reference_id
+        self._store.mark_sent(key)
+        return record.reference_id
+
+    async def acall(
+        self, key: str, payload: dict, reference_id: str, send: Callable[[str], Awaitable[object]]
+    ) -> str:
+        """Asyncio counterpart of :meth:`call`."""
+        record, fresh = self._reserve(key, payload, reference_id)
+        if record.state == STATE_SENT:
+            return record.reference_id
+        try:
+            await send(record.reference_id)
+        except Exception as exc:
+            if not self._failed(key, exc, fresh):
+                raise
+            return record.reference_id
+        self._store.mark_sent(key)
+        return record.reference_id
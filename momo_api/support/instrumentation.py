@@ -0,0 +1,158 @@
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Protocol, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_token_wait: ContextVar[Optional[float]] = ContextVar("momo_token_wait", default=None)
+
+
+@dataclass
+class RequestEvent:
+    """Timings and outcome of one API call, reported to every observer.
+
+    ``attempts`` counts the HTTP attempts made, so ``retries`` is one less.
+    Durations are in seconds. ``total`` spans every attempt, backoff and
+    rate-limit wait; the connection phases (``connect``, ``tls`` and
+    ``ttfb``, time to first byte of the response headers) are those of the
+    last attempt, and ``None`` when it reused a pooled connection or sent
+    nothing. ``token_wait`` is the time spent obtaining the access token
+    before the call, when it needed one.
+    """
+
+    provider: str
+    product: str
+    endpoint: str
+    method: str
+    url: str
+    status_code: Optional[int] = None
+    error: Optional[BaseException] = None
+    attempts: int = 0
+    token_wait: Optional[float] = None
+    connect: Optional[float] = None
+    tls: Optional[float] = None
+    ttfb: Optional[float] = None
+    total: float = 0.0
+
+    @property
+    def retries(self) -> int:
+        return max(self.attempts - 1, 0)
+
+
+class RequestObserver(Protocol):
+    """Receives a :class:`RequestEvent` after each API call completes.
+
+    An observer may also define ``on_request_start(event)``, called with the
+    still incomplete event when the call begins.
+    """
+
+    def on_request(self, event: RequestEvent) -> None:
+        ...
+
+
+def record_token_wait(seconds: float) -> None:
+    """Attribute ``seconds`` of token acquisition to the caller's next request."""
+    _token_wait.set(seconds)
+
+
+class RequestTrace:
+    """Collects the phase timings of one API call.
+
+    Created by a transport only while it has observers, so unobserved calls
+    pay for nothing but one truthiness check. Phase boundaries come from
+    httpcore's ``trace`` request extension.
+    """
+
+    __slots__ = ("_observers", "_event", "_started", "_marks")
+
+    def __init__(
+        self,
+        observers: Tuple[RequestObserver, ...],
+        provider: str,
+        product: str,
+        endpoint: str,
+        method: str,
+        url: str,
+    ) -> None:
+        self._observers = observers
+        self._event = RequestEvent(provider, product, endpoint, method, url)
+        self._event.token_wait = _token_wait.get()
+        _token_wait.set(None)
+        self._started = time.perf_counter()
+        self._marks: Dict[str, float] = {}
+        for observer in observers:
+            on_start = getattr(observer, "on_request_start", None)
+            if on_start is not None:
+                try:
+                    on_start(self._event)
+                except Exception:
+                    logger.exception("request observer %r failed for %s", observer, url)
+
+    def attempt(self) -> Dict[str, Any]:
+        """Start an HTTP attempt; returns the extensions to send it with."""
+        self._event.attempts += 1
+        self._marks = {}
+        return {"trace": self._on_trace}
+
+    def aattempt(self) -> Dict[str, Any]:
+        """Asyncio counterpart of :meth:`attempt`."""
+        self._event.attempts += 1
+        self._marks = {}
+        return {"trace": self._aon_trace}
+
+    def _on_trace(self, name: str, info: Dict[str, Any]) -> None:
+        self._marks[name.split(".", 1)[1]] = time.perf_counter()
+
+    async def _aon_trace(self, name: str, info: Dict[str, Any]) -> None:
+        self._marks[name.split(".", 1)[1]] = time.perf_counter()
+
+    def _span(self, start: str, end: str) -> Optional[float]:
+        started, ended = self._marks.get(start), self._marks.get(end)
+        if started is None or ended is None:
+            return None
+        return ended - started
+
+    def observe(self, send: Callable[[], httpx.Response]) -> httpx.Response:
+        """Run ``send`` (the whole call, retries included) and report it."""
+        try:
+            response = send()
+        except BaseException as exc:
+            self.finish(None, exc)
+            raise
+        self.finish(response)
+        return response
+
+    async def aobserve(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """Asyncio counterpart of :meth:`observe`."""
+        try:
+            response = await send()
+        except BaseException as exc:
+            self.finish(None, exc)
+            raise
+        self.finish(response)
+        return response
+
+    def finish(
+        self, response: Optional[httpx.Response], error: Optional[BaseException] = None
+    ) -> RequestEvent:
+        """Complete the event and hand it to every observer."""
+        event = self._event
+        event.total = time.perf_counter() - self._started
+        event.status_code = None if response is None else response.status_code
+        event.error = error
+        event.connect = self._span("connect_tcp.started", "connect_tcp.complete")
+        event.tls = self._span("start_tls.started", "start_tls.complete")
+        event.ttfb = self._span(
+            "send_request_headers.started", "receive_response_headers.complete"
+        )
+        for observer in self._observers:
+            try:
+                observer.on_request(event)
+            except Exception:
+                # A faulty observer must never fail the payment call itself.
+                logger.exception("request observer %r failed for %s", observer, event.url)
+        return event
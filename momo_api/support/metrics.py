@@ -0,0 +1,364 @@
+import itertools
+import math
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from ..exceptions import create_exception
+from .instrumentation import RequestEvent
+from .token_cache import TokenCache
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Path segments naming an operation; the rest are versions, prefixes or IDs.
+OPERATIONS = frozenset(
+    {
+        "token",
+        "requesttopay",
+        "deposit",
+        "transfer",
+        "refund",
+        "balance",
+        "accountholder",
+        "payments",
+        "disbursements",
+    }
+)
+
+LabelKey = Tuple[str, ...]
+
+
+def operation_name(url: str, default: str = "other") -> str:
+    """The operation a provider URL addresses, e.g. ``requesttopay`` or ``payments``."""
+    for segment in urlsplit(url).path.split("/"):
+        if segment in OPERATIONS:
+            return segment
+    return default
+
+
+# Number of shards a histogram or counter set spreads its writers over.
+STRIPES = 16
+
+
+class _Shard:
+    __slots__ = ("counts", "total", "lock")
+
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * size
+        self.total = 0.0
+        self.lock = threading.Lock()
+
+
+class _Striped:
+    """Hands each thread one of ``STRIPES`` shards, round-robin on first use.
+
+    The shard count is fixed however many threads come and go, and writers
+    on different stripes never contend for the same lock.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._next = itertools.count()
+
+    def stripe(self) -> int:
+        stripe = getattr(self._local, "stripe", None)
+        if stripe is None:
+            stripe = self._local.stripe = next(self._next) % STRIPES
+        return stripe
+
+
+@dataclass
+class HistogramSnapshot:
+    """Merged bucket counts of a :class:`LatencyHistogram` at one point in time.
+
+    ``bounds[i]`` is the upper bound of ``counts[i]``; the last count holds
+    the values above the last bound.
+    """
+
+    bounds: Tuple[float, ...]
+    counts: List[int]
+    sum: float
+    count: int
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q`` quantile, interpolating within its bucket."""
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if index == 0:
+                    return self.bounds[0]
+                if index == len(self.bounds):
+                    return self.bounds[-1]
+                lower, upper = self.bounds[index - 1], self.bounds[index]
+                return lower * (upper / lower) ** ((rank - seen) / count)
+            seen += count
+        return self.bounds[-1]
+
+
+class LatencyHistogram:
+    """Fixed-memory histogram of durations in log-spaced buckets.
+
+    Buckets run from ``low`` to ``high`` seconds with ``buckets_per_decade``
+    bounds per power of ten, so a quantile estimate is off by at most one
+    bucket width (about 26% at the default of 10) whatever the sample count.
+
+    Threads record into one of a fixed set of striped bucket arrays, each
+    behind its own small lock, so concurrent :meth:`observe` calls rarely
+    contend; :meth:`snapshot` merges the arrays.
+    """
+
+    def __init__(
+        self, low: float = 0.001, high: float = 120.0, buckets_per_decade: int = 10
+    ) -> None:
+        if not 0 < low < high:
+            raise ValueError("low must be positive and below high")
+        if buckets_per_decade < 1:
+            raise ValueError("buckets_per_decade must be at least 1")
+        size = math.ceil(math.log10(high / low) * buckets_per_decade)
+        self._bounds = tuple(low * 10 ** (i / buckets_per_decade) for i in range(size + 1))
+        self._log_low = math.log10(low)
+        self._scale = buckets_per_decade
+        self._striped = _Striped()
+        self._shards = [_Shard(len(self._bounds) + 1) for _ in range(STRIPES)]
+
+    @property
+    def bounds(self) -> Tuple[float, ...]:
+        return self._bounds
+
+    def observe(self, seconds: float) -> None:
+        shard = self._shards[self._striped.stripe()]
+        if seconds <= self._bounds[0]:
+            index = 0
+        else:
+            index = min(
+                math.ceil((math.log10(seconds) - self._log_low) * self._scale),
+                len(self._bounds),
+            )
+        with shard.lock:
+            shard.counts[index] += 1
+            shard.total += seconds
+
+    def snapshot(self) -> HistogramSnapshot:
+        counts = [0] * (len(self._bounds) + 1)
+        total = 0.0
+        for shard in self._shards:
+            with shard.lock:
+                shard_counts = list(shard.counts)
+                total += shard.total
+            for index, count in enumerate(shard_counts):
+                counts[index] += count
+        return HistogramSnapshot(self._bounds, counts, total, sum(counts))
+
+
+class _Counters:
+    """Labelled counters kept in striped shards and summed on read."""
+
+    def __init__(self) -> None:
+        self._striped = _Striped()
+        self._shards: List[Dict[LabelKey, float]] = [{} for _ in range(STRIPES)]
+        self._locks = [threading.Lock() for _ in range(STRIPES)]
+
+    def add(self, key: LabelKey, amount: float = 1) -> None:
+        stripe = self._striped.stripe()
+        shard = self._shards[stripe]
+        with self._locks[stripe]:
+            shard[key] = shard.get(key, 0) + amount
+
+    def values(self) -> Dict[LabelKey, float]:
+        merged: Dict[LabelKey, float] = {}
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                items = list(shard.items())
+            for key, value in items:
+                merged[key] = merged.get(key, 0) + value
+        return merged
+
+
+@dataclass
+class LatencySummary:
+    count: int
+    sum: float
+    p50: float
+    p95: float
+    p99: float
+
+
+class MetricsCollector:
+    """Aggregates API call metrics from a transport's request events.
+
+    Add it to a transport with ``transport.add_observer(collector)``. Calls
+    are labelled by provider, product, operation (the path segment such as
+    ``requesttopay``, ``deposit``, ``transfer``, ``token`` or ``payments``)
+    and endpoint (``initiate``, ``status``, ...). The collector keeps a
+    :class:`LatencyHistogram` per label set, failed calls per exception
+    class (as raised by :func:`~momo_api.exceptions.create_exception` for
+    error responses), the calls in flight, and the hit ratio of every
+    :class:`TokenCache` passed to :meth:`watch_token_cache`.
+
+    Recording only takes the lock of one of a fixed set of striped shards,
+    so memory stays bounded however many threads record.
+    """
+
+    def __init__(
+        self,
+        token_caches: Iterable[TokenCache] = (),
+        low: float = 0.001,
+        high: float = 120.0,
+        buckets_per_decade: int = 10,
+    ) -> None:
+        self._histogram_options = (low, high, buckets_per_decade)
+        self._latency: Dict[LabelKey, LatencyHistogram] = {}
+        self._errors = _Counters()
+        self._in_flight = _Counters()
+        self._token_caches: List[TokenCache] = list(token_caches)
+        self._lock = threading.Lock()
+
+    def watch_token_cache(self, cache: TokenCache) -> None:
+        """Report the hit ratio of ``cache`` (and of the caches bound from it)."""
+        self._token_caches.append(cache)
+
+    def _histogram(self, key: LabelKey) -> LatencyHistogram:
+        histogram = self._latency.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._latency.get(key)
+                if histogram is None:
+                    histogram = LatencyHistogram(*self._histogram_options)
+                    self._latency[key] = histogram
+        return histogram
+
+    def on_request_start(self, event: RequestEvent) -> None:
+        self._in_flight.add((event.provider, event.product, operation_name(event.url)), 1)
+
+    def on_request(self, event: RequestEvent) -> None:
+        operation = operation_name(event.url)
+        self._in_flight.add((event.provider, event.product, operation), -1)
+        key = (event.provider, event.product, operation, event.endpoint)
+        self._histogram(key).observe(event.total)
+        error = _error_name(event)
+        if error is not None:
+            self._errors.add((event.provider, event.product, operation, error), 1)
+
+    def latency(self) -> Dict[LabelKey, LatencySummary]:
+        """p50/p95/p99 per ``(provider, product, operation, endpoint)``."""
+        summaries = {}
+        for key, histogram in list(self._latency.items()):
+            snapshot = histogram.snapshot()
+            p50, p95, p99 = (snapshot.quantile(q) for q in QUANTILES)
+            summaries[key] = LatencySummary(snapshot.count, snapshot.sum, p50, p95, p99)
+        return summaries
+
+    def errors(self) -> Dict[LabelKey, int]:
+        """Failed calls per ``(provider, product, operation, exception class)``."""
+        return {key: int(value) for key, value in self._errors.values().items() if value}
+
+    def in_flight(self) -> Dict[LabelKey, int]:
+        """Calls in progress per ``(provider, product, operation)``."""
+        return {key: int(value) for key, value in self._in_flight.values().items()}
+
+    def token_caches(self) -> Sequence[TokenCache]:
+        return tuple(self._token_caches)
+
+    def histograms(self) -> Dict[LabelKey, HistogramSnapshot]:
+        return {key: h.snapshot() for key, h in list(self._latency.items())}
+
+
+_error_names: Dict[int, str] = {}
+
+
+def _error_name(event: RequestEvent) -> Optional[str]:
+    if event.error is not None:
+        return type(event.error).__name__
+    status = event.status_code
+    if status is None or status < 400:
+        return None
+    name = _error_names.get(status)
+    if name is None:
+        name = _error_names[status] = type(create_exception(status)).__name__
+    return name
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], **extra: str) -> str:
+    pairs = list(zip(names, values)) + list(extra.items())
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+_REQUEST_LABELS = ("provider", "product", "operation", "endpoint")
+_ERROR_LABELS = ("provider", "product", "operation", "error")
+_FLIGHT_LABELS = ("provider", "product", "operation")
+
+
+def render_prometheus(
+    collector: MetricsCollector, prefix: str = "momo", buckets: bool = False
+) -> str:
+    """Render ``collector`` in the Prometheus text exposition format.
+
+    Latencies are a summary with the p50/p95/p99 estimates, or with
+    ``buckets`` the full histogram, which Prometheus can aggregate across
+    instances.
+    """
+    lines: List[str] = []
+    name = f"{prefix}_request_duration_seconds"
+    lines.append(f"# HELP {name} Duration of API calls, retries and backoff included.")
+    lines.append(f"# TYPE {name} {'histogram' if buckets else 'summary'}")
+    for key, snapshot in sorted(collector.histograms().items()):
+        if buckets:
+            cumulative = 0
+            for bound, count in zip(snapshot.bounds + (math.inf,), snapshot.counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else f"{bound:.6g}"
+                lines.append(f"{name}_bucket{_labels(_REQUEST_LABELS, key, le=le)} {cumulative}")
+        else:
+            for q in QUANTILES:
+                labels = _labels(_REQUEST_LABELS, key, quantile=str(q))
+                lines.append(f"{name}{labels} {_number(snapshot.quantile(q))}")
+        labels = _labels(_REQUEST_LABELS, key)
+        lines.append(f"{name}_sum{labels} {_number(snapshot.sum)}")
+        lines.append(f"{name}_count{labels} {snapshot.count}")
+
+    name = f"{prefix}_request_errors_total"
+    lines.append(f"# HELP {name} Failed API calls by exception class.")
+    lines.append(f"# TYPE {name} counter")
+    for key, count in sorted(collector.errors().items()):
+        lines.append(f"{name}{_labels(_ERROR_LABELS, key)} {count}")
+
+    name = f"{prefix}_requests_in_flight"
+    lines.append(f"# HELP {name} API calls in progress.")
+    lines.append(f"# TYPE {name} gauge")
+    for key, count in sorted(collector.in_flight().items()):
+        lines.append(f"{name}{_labels(_FLIGHT_LABELS, key)} {count}")
+
+    caches = collector.token_caches()
+    if caches:
+        for suffix, kind, help_text in (
+            ("hits_total", "counter", "Token lookups served from the cache."),
+            ("misses_total", "counter", "Token lookups that waited for a fetch."),
+            ("hit_ratio", "gauge", "Share of token lookups served from the cache."),
+        ):
+            name = f"{prefix}_token_cache_{suffix}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for cache in caches:
+                value = {
+                    "hits_total": cache.hits,
+                    "misses_total": cache.misses,
+                    "hit_ratio": cache.hit_ratio,
+                }[suffix]
+                lines.append(f"{name}{_labels(('cache',), (cache.key,))} {_number(value)}")
+    return "\n".join(lines) + "\n"
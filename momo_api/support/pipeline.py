@@ -0,0 +1,232 @@
+import dataclasses
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional, Tuple, TypeVar
+
+import httpx
+
+from ..exceptions import create_exception
+from ..models.api_token import ApiToken
+from .account_cache import AccountHolderCache
+from .circuit_breaker import CircuitBreaker
+from .codec import JsonCodec, default_codec
+from .idempotency import Idempotency
+from .instrumentation import record_token_wait
+from .rate_limit import RateLimiter
+from .retry import RetryPolicy
+from .single_flight import SingleFlight
+from .token_cache import TokenCache
+from .token_store import token_key
+
+if TYPE_CHECKING:
+    # status_cache imports the airtel package, whose products import this module.
+    from .status_cache import StatusCache
+
+T = TypeVar("T")
+
+
+@dataclass
+class ProductOptions:
+    """The optional policies of a product client.
+
+    Every product takes them as one ``options=`` object, as keyword
+    arguments, or both, the keywords overriding the object's fields. One
+    instance can configure several products. ``account_cache`` and
+    ``lazy_transactions`` apply to the MTN products only.
+    """
+
+    token_cache: Optional[TokenCache] = None
+    rate_limiter: Optional[RateLimiter] = None
+    retry: Optional[RetryPolicy] = None
+    circuit_breaker: Optional[CircuitBreaker] = None
+    account_cache: Optional[AccountHolderCache] = None
+    single_flight: Optional[SingleFlight] = None
+    status_cache: Optional["StatusCache"] = None
+    idempotency: Optional[Idempotency] = None
+    codec: Optional[JsonCodec] = None
+    lazy_transactions: bool = False
+
+
+class ProductBase:
+    """Option handling and request keys shared by every product client.
+
+    ``account`` names the credentials the token cache is bound to and
+    ``rate_account`` the rate limiter bucket. Statuses are cached under
+    :meth:`_request_key` of their URL, which includes the token key, so
+    products under different credentials never share one. Options listed in
+    ``UNSUPPORTED_OPTIONS`` are rejected when set.
+    """
+
+    PROVIDER = ""
+    PRODUCT_PATH = ""
+    UNSUPPORTED_OPTIONS: Tuple[str, ...] = ()
+
+    def __init__(
+        self,
+        config: Any,
+        base_url: str,
+        environment: str,
+        account: str,
+        rate_account: str,
+        options: Optional[ProductOptions] = None,
+        **overrides: Any,
+    ) -> None:
+        options = dataclasses.replace(options or ProductOptions(), **overrides)
+        for name in self.UNSUPPORTED_OPTIONS:
+            if getattr(options, name) not in (None, False):
+                raise TypeError(f"{type(self).__name__} does not support {name}")
+        self._config = config
+        self._base_url = base_url.rstrip("/")
+        self._environment = environment
+        self._token_cache = (options.token_cache or TokenCache()).bind(
+            token_key(self.PROVIDER, environment, self.PRODUCT_PATH, account)
+        )
+        self._rate_limiter = options.rate_limiter
+        self._retry = options.retry
+        self._circuit_breaker = options.circuit_breaker
+        self._account_cache = options.account_cache
+        self._single_flight = options.single_flight
+        self._status_cache = options.status_cache
+        self._idempotency = options.idempotency
+        self._codec = options.codec or default_codec()
+        self._lazy_transactions = options.lazy_transactions
+        self._rate_key = f"{self.PROVIDER}:{rate_account}"
+
+    def _raise_for_status(self, response: httpx.Response) -> None:
+        if response.status_code >= 400:
+            try:
+                body = self._codec.loads(response.content)
+                message = body.get("message") or body.get("error") or str(body)
+            except Exception:
+                message = response.text
+            raise create_exception(response.status_code, message)
+
+    def _request_key(self, url: str) -> str:
+        return f"{self._token_cache.key} {url}"
+
+    def _idempotency_key(self, operation: str, key: str) -> str:
+        return f"{self._token_cache.key} {operation} {key}"
+
+    def _circuit_key(self, url: str) -> str:
+        return f"{self._base_url}/{self.PRODUCT_PATH}"
+
+    def _cached_status(self, url: str) -> Any:
+        if self._status_cache is None:
+            return None
+        return self._status_cache.get(self._request_key(url))
+
+    def _store_status(self, url: str, transaction: T) -> T:
+        if self._status_cache is not None:
+            self._status_cache.put(self._request_key(url), transaction)
+        return transaction
+
+
+class RequestPipeline:
+    """The request path shared by the sync product clients.
+
+    Every request goes through the same layers, outermost first: tracing,
+    single-flight (GETs only), retry, circuit breaker, then the rate limiter
+    right before the transport. A layer that is not configured is skipped.
+
+    Mixed into the clients next to :class:`ProductBase`, which holds the
+    policies and keys; the clients provide ``_transport`` and
+    ``_fetch_access_token``.
+    """
+
+    def _send(self, endpoint: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        trace = self._transport.trace(self.PROVIDER, self.PRODUCT_PATH, endpoint, method, url)
+
+        def request() -> httpx.Response:
+            if self._rate_limiter is not None:
+                self._rate_limiter.acquire(self._rate_key, endpoint)
+            return self._transport.request(method, url, trace, **kwargs)
+
+        def attempt() -> httpx.Response:
+            if self._circuit_breaker is None:
+                return request()
+            return self._circuit_breaker.call(self._circuit_key(url), request)
+
+        def send() -> httpx.Response:
+            if self._retry is None:
+                return attempt()
+            return self._retry.call(attempt, endpoint)
+
+        def dispatch() -> httpx.Response:
+            if self._single_flight is None or method != "GET":
+                return send()
+            return self._single_flight.do(self._request_key(url), send)
+
+        return dispatch() if trace is None else trace.observe(dispatch)
+
+    def _initiate(
+        self, operation: str, key: Optional[str], payload: dict, reference_id: str,
+        send: Callable[[str], None],
+    ) -> str:
+        """Send under ``reference_id``, or under the one recorded for ``key``."""
+        if self._idempotency is None or not key:
+            send(reference_id)
+            return reference_id
+        return self._idempotency.call(
+            self._idempotency_key(operation, key), payload, reference_id, send
+        )
+
+    def _cached_token(self) -> ApiToken:
+        """The cached token, timing the wait only when someone observes it."""
+        if not self._transport.observers:
+            return self._token_cache.get_or_fetch(self._fetch_access_token)
+        started = time.perf_counter()
+        token = self._token_cache.get_or_fetch(self._fetch_access_token)
+        record_token_wait(time.perf_counter() - started)
+        return token
+
+
+class AsyncRequestPipeline:
+    """The asyncio counterpart of :class:`RequestPipeline`."""
+
+    async def _send(
+        self, endpoint: str, method: str, url: str, **kwargs: Any
+    ) -> httpx.Response:
+        trace = self._transport.trace(self.PROVIDER, self.PRODUCT_PATH, endpoint, method, url)
+
+        async def request() -> httpx.Response:
+            if self._rate_limiter is not None:
+                await self._rate_limiter.aacquire(self._rate_key, endpoint)
+            return await self._transport.request(method, url, trace, **kwargs)
+
+        async def attempt() -> httpx.Response:
+            if self._circuit_breaker is None:
+                return await request()
+            return await self._circuit_breaker.acall(self._circuit_key(url), request)
+
+        async def send() -> httpx.Response:
+            if self._retry is None:
+                return await attempt()
+            return await self._retry.acall(attempt, endpoint)
+
+        async def dispatch() -> httpx.Response:
+            if self._single_flight is None or method != "GET":
+                return await send()
+            return await self._single_flight.ado(self._request_key(url), send)
+
+        return await dispatch() if trace is None else await trace.aobserve(dispatch)
+
+    async def _initiate(
+        self, operation: str, key: Optional[str], payload: dict, reference_id: str,
+        send: Callable[[str], Awaitable[None]],
+    ) -> str:
+        """Send under ``reference_id``, or under the one recorded for ``key``."""
+        if self._idempotency is None or not key:
+            await send(reference_id)
+            return reference_id
+        return await self._idempotency.acall(
+            self._idempotency_key(operation, key), payload, reference_id, send
+        )
+
+    async def _cached_token(self) -> ApiToken:
+        """The cached token, timing the wait only when someone observes it."""
+        if not self._transport.observers:
+            return await self._token_cache.aget_or_fetch(self._fetch_access_token)
+        started = time.perf_counter()
+        token = await self._token_cache.aget_or_fetch(self._fetch_access_token)
+        record_token_wait(time.perf_counter() - started)
+        return token
@@ -0,0 +1,272 @@
+import logging
+import queue
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .concurrency import ITEM_ERRORS
+from .timing_wheel import TimingWheel
+
+logger = logging.getLogger(__name__)
+
+
+def is_terminal(transaction: Any) -> bool:
+    """Whether an MTN ``Transaction`` or ``AirtelTransaction`` reached a final state."""
+    return transaction.is_successful() or transaction.is_failed()
+
+
+@dataclass
+class PollResult:
+    """Final outcome of polling one reference.
+
+    ``transaction`` is the last status seen: terminal unless ``timed_out``
+    is set or polling gave up with ``error``.
+    """
+
+    reference_id: str
+    transaction: Optional[Any] = None
+    error: Optional[Exception] = None
+    timed_out: bool = False
+    attempts: int = 0
+    context: Any = None
+
+    @property
+    def ok(self) -> bool:
+        return self.transaction is not None and is_terminal(self.transaction)
+
+
+class _Tracked:
+    __slots__ = (
+        "reference_id", "context", "delay", "deadline",
+        "attempts", "errors", "transaction", "cancelled",
+    )
+
+    def __init__(self, reference_id: str, context: Any, delay: float, deadline: Optional[float]):
+        self.reference_id = reference_id
+        self.context = context
+        self.delay = delay
+        self.deadline = deadline
+        self.attempts = 0
+        self.errors = 0
+        self.transaction: Any = None
+        self.cancelled = False
+
+
+class StatusPoller:
+    """Polls pending references until they reach a terminal status.
+
+    ``fetch`` is a status lookup such as ``collection.get_payment_status`` or
+    ``airtel_disbursement.get_transfer_status``. References wait in a
+    :class:`TimingWheel` between polls, so tracking many thousands of them
+    costs a small record each and no thread or timer per reference. The first
+    poll happens ``initial_delay`` seconds after :meth:`add`; while a
+    reference stays pending the interval grows by ``multiplier`` up to
+    ``max_delay``, shortened by up to ``jitter`` (a fraction) so references
+    added together spread out. At most ``concurrency`` lookups run at once.
+
+    A reference is reported once, when its transaction is successful or
+    failed, when ``timeout`` seconds have passed since it was added, or after
+    ``max_errors`` consecutive failed lookups. Consume results either from
+    :meth:`results` in the calling thread or through ``on_result`` from a
+    background thread started with :meth:`start`; an ``on_result`` that
+    raises is logged and polling carries on with the next result.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Any],
+        initial_delay: float = 2.0,
+        max_delay: float = 60.0,
+        multiplier: float = 1.5,
+        jitter: float = 0.1,
+        timeout: Optional[float] = None,
+        max_errors: int = 5,
+        concurrency: int = 8,
+        tick: float = 0.1,
+        wheel_size: int = 512,
+        on_result: Optional[Callable[[PollResult], Any]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be between 0 and 1")
+        self._fetch = fetch
+        self._initial_delay = initial_delay
+        self._max_delay = max_delay
+        self._multiplier = multiplier
+        self._jitter = jitter
+        self._timeout = timeout
+        self._max_errors = max_errors
+        self._concurrency = concurrency
+        self._on_result = on_result
+        self._clock = clock
+        self._wheel: TimingWheel[_Tracked] = TimingWheel(tick, wheel_size, clock)
+        self._tracked: Dict[str, _Tracked] = {}
+        self._ready: Deque[_Tracked] = deque()
+        self._done: "queue.Queue[Tuple[_Tracked, Any, Optional[Exception]]]" = queue.Queue()
+        self._inflight = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    @property
+    def pending(self) -> int:
+        """Number of references not reported yet."""
+        return len(self._tracked)
+
+    def add(
+        self, reference_id: str, context: Any = None, timeout: Optional[float] = None
+    ) -> None:
+        """Start tracking ``reference_id``; ``context`` is echoed in its result.
+
+        ``timeout`` overrides the poller's timeout for this reference.
+        """
+        timeout = self._timeout if timeout is None else timeout
+        with self._lock:
+            if reference_id in self._tracked:
+                return
+            deadline = None if timeout is None else self._clock() + timeout
+            entry = _Tracked(reference_id, context, self._initial_delay, deadline)
+            self._tracked[reference_id] = entry
+            delay = self._initial_delay if timeout is None else min(self._initial_delay, timeout)
+            self._wheel.schedule(entry, delay)
+
+    def add_many(self, reference_ids: Iterable[str]) -> None:
+        for reference_id in reference_ids:
+            self.add(reference_id)
+
+    def remove(self, reference_id: str) -> bool:
+        """Stop tracking ``reference_id`` (e.g. its callback arrived)."""
+        with self._lock:
+            entry = self._tracked.pop(reference_id, None)
+        if entry is None:
+            return False
+        entry.cancelled = True
+        return True
+
+    # ------------------------------------------------------------------
+    # Scheduling loop
+    # ------------------------------------------------------------------
+
+    def _poll(self, entry: _Tracked) -> None:
+        try:
+            transaction, error = self._fetch(entry.reference_id), None
+        except Exception as exc:
+            transaction, error = None, exc
+        self._done.put((entry, transaction, error))
+
+    def _dispatch(self) -> None:
+        with self._lock:
+            due = self._wheel.expire()
+        self._ready.extend(entry for entry in due if not entry.cancelled)
+        while self._ready and self._inflight < self._concurrency:
+            entry = self._ready.popleft()
+            if entry.cancelled:
+                continue
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._concurrency, thread_name_prefix="momo-poll"
+                )
+            self._inflight += 1
+            self._executor.submit(self._poll, entry)
+
+    def _settle(
+        self, entry: _Tracked, transaction: Any, error: Optional[Exception]
+    ) -> Optional[PollResult]:
+        """Reschedule ``entry`` or return its final result."""
+        entry.attempts += 1
+        if entry.cancelled:
+            return None
+        final = False
+        if error is None:
+            entry.errors = 0
+            entry.transaction = transaction
+            final = is_terminal(transaction)
+        else:
+            entry.errors += 1
+            final = not isinstance(error, ITEM_ERRORS) or entry.errors >= self._max_errors
+
+        now = self._clock()
+        timed_out = not final and entry.deadline is not None and now >= entry.deadline
+        if final or timed_out:
+            with self._lock:
+                self._tracked.pop(entry.reference_id, None)
+            return PollResult(
+                reference_id=entry.reference_id,
+                transaction=entry.transaction,
+                error=error,
+                timed_out=timed_out,
+                attempts=entry.attempts,
+                context=entry.context,
+            )
+
+        entry.delay = min(entry.delay * self._multiplier, self._max_delay)
+        delay = entry.delay * (1 - self._jitter * random.random())
+        if entry.deadline is not None:
+            delay = min(delay, entry.deadline - now)
+        with self._lock:
+            self._wheel.schedule(entry, delay)
+        return None
+
+    def _step(self) -> List[PollResult]:
+        self._dispatch()
+        results = []
+        try:
+            item = self._done.get(timeout=self._wheel.tick)
+        except queue.Empty:
+            return results
+        while True:
+            self._inflight -= 1
+            result = self._settle(*item)
+            if result is not None:
+                results.append(result)
+            try:
+                item = self._done.get_nowait()
+            except queue.Empty:
+                return results
+
+    def results(self) -> Iterator[PollResult]:
+        """Poll in the calling thread, yielding results until nothing is pending."""
+        while self._tracked or self._inflight:
+            yield from self._step()
+
+    def start(self) -> None:
+        """Poll in a background thread, delivering each result to ``on_result``."""
+        if self._on_result is None:
+            raise ValueError("start() requires an on_result callback")
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+
+        def run() -> None:
+            while not self._stopping.is_set():
+                for result in self._step():
+                    try:
+                        self._on_result(result)  # type: ignore[misc]
+                    except Exception:
+                        logger.exception("on_result failed for %s", result.reference_id)
+
+        self._thread = threading.Thread(target=run, name="momo-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and release the lookup threads."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self) -> "StatusPoller":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
@@ -0,0 +1,209 @@
+import asyncio
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Protocol, Tuple
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Sustained ``rate`` (requests per second) with bursts up to ``burst``."""
+
+    rate: float
+    burst: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        if self.rate <= 0:
+            raise ValueError("rate must be positive")
+        if self.burst is not None and self.burst < 1:
+            raise ValueError("burst must be at least 1")
+
+    @property
+    def capacity(self) -> float:
+        return self.burst if self.burst is not None else max(1.0, self.rate)
+
+
+class BucketStore(Protocol):
+    """Backend holding token-bucket state keyed by bucket name."""
+
+    def reserve(self, key: str, rate: float, capacity: float, now: float) -> float:
+        """Take one token from bucket ``key``; return the seconds to wait before using it."""
+        ...
+
+
+def _take(
+    tokens: float, updated: float, rate: float, capacity: float, now: float
+) -> Tuple[float, float, float]:
+    """Refill a bucket up to ``now`` and reserve one token from it.
+
+    The balance may go negative: each caller then waits for its own token to
+    accrue, so concurrent callers are spaced out instead of racing.
+    """
+    tokens = min(capacity, tokens + max(0.0, now - updated) * rate) - 1
+    wait = -tokens / rate if tokens < 0 else 0.0
+    return tokens, now, wait
+
+
+class MemoryBucketStore:
+    """Process-local bucket store (the default)."""
+
+    def __init__(self) -> None:
+        self._buckets: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, key: str, rate: float, capacity: float, now: float) -> float:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [capacity, now]
+            bucket[0], bucket[1], wait = _take(bucket[0], bucket[1], rate, capacity, now)
+            return wait
+
+
+class SharedBucketStore:
+    """Bucket store shared by every process on a host through a memory-mapped file.
+
+    Point ``path`` at a tmpfs location such as ``/dev/shm/momo-rate-limit`` to
+    keep it in shared memory. Buckets live in a fixed table of ``slots``
+    entries guarded by an ``flock``, so only POSIX systems are supported.
+    The file records its ``slots`` in a header, and opening it with a
+    different value raises ``ValueError`` rather than hashing keys to other
+    slots than the processes already using it. Processes must use a clock
+    shared across the host; ``time.monotonic`` (the :class:`RateLimiter`
+    default) is on Linux and macOS.
+    """
+
+    _MAGIC = b"momo-rl1"
+    _HEADER = struct.Struct("<8sQ")
+    _SLOT = struct.Struct("<Qdd")
+
+    def __init__(self, path: str, slots: int = 1024) -> None:
+        self._path = path
+        self._slots = slots
+        self._size = self._HEADER.size + slots * self._SLOT.size
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._fd = -1
+        self._map: Optional[mmap.mmap] = None
+
+    def _open(self) -> mmap.mmap:
+        # flock locks belong to the open file, so a forked worker reopens it.
+        if self._map is None or self._pid != os.getpid():
+            fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                self._prepare(fd)
+            except BaseException:
+                os.close(fd)
+                raise
+            self._fd = fd
+            self._map = mmap.mmap(fd, self._size)
+            self._pid = os.getpid()
+        return self._map
+
+    def _prepare(self, fd: int) -> None:
+        """Write the header of a new table, or check the one already there."""
+        import fcntl
+
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(fd).st_size < self._HEADER.size:
+                os.ftruncate(fd, self._size)
+                os.pwrite(fd, self._HEADER.pack(self._MAGIC, self._slots), 0)
+                return
+            magic, slots = self._HEADER.unpack(os.pread(fd, self._HEADER.size, 0))
+            if magic != self._MAGIC:
+                raise ValueError(f"{self._path} is not a rate limit table")
+            if slots != self._slots:
+                raise ValueError(
+                    f"rate limit table {self._path} has {slots} slots, not {self._slots}"
+                )
+            if os.fstat(fd).st_size < self._size:
+                os.ftruncate(fd, self._size)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") | 1
+
+    def reserve(self, key: str, rate: float, capacity: float, now: float) -> float:
+        import fcntl
+
+        wanted = self._hash(key)
+        with self._lock:
+            table = self._open()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                start = wanted % self._slots
+                for probe in range(self._slots):
+                    index = (start + probe) % self._slots
+                    offset = self._HEADER.size + index * self._SLOT.size
+                    stored, tokens, updated = self._SLOT.unpack_from(table, offset)
+                    if stored == 0:
+                        tokens, updated = capacity, now
+                    elif stored != wanted:
+                        continue
+                    tokens, updated, wait = _take(tokens, updated, rate, capacity, now)
+                    self._SLOT.pack_into(table, offset, wanted, tokens, updated)
+                    return wait
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        raise RuntimeError(f"rate limit table {self._path} is full ({self._slots} slots)")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._map is not None and self._pid == os.getpid():
+                self._map.close()
+                os.close(self._fd)
+            self._map = None
+
+
+class RateLimiter:
+    """Client-side token-bucket limiter consulted by the products before each request.
+
+    Buckets are kept per credential (MTN subscription key, Airtel client ID)
+    and endpoint class: ``token``, ``initiate``, ``status`` or ``balance``.
+    ``limits`` maps endpoint classes to their :class:`RateLimit`; classes not
+    listed use ``default``, and are not limited when it is ``None``. Pass a
+    :class:`SharedBucketStore` so that every worker process on a host draws
+    from the same budget.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, RateLimit]] = None,
+        default: Optional[RateLimit] = None,
+        store: Optional[BucketStore] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._limits = dict(limits or {})
+        self._default = default
+        self._store: BucketStore = store if store is not None else MemoryBucketStore()
+        self._clock = clock
+
+    def limit_for(self, endpoint: str) -> Optional[RateLimit]:
+        return self._limits.get(endpoint, self._default)
+
+    def reserve(self, key: str, endpoint: str) -> float:
+        """Reserve a slot; return how many seconds the caller must wait for it."""
+        limit = self.limit_for(endpoint)
+        if limit is None:
+            return 0.0
+        return self._store.reserve(f"{key}:{endpoint}", limit.rate, limit.capacity, self._clock())
+
+    def acquire(self, key: str, endpoint: str) -> None:
+        """Block until a request to ``endpoint`` fits the budget of ``key``."""
+        wait = self.reserve(key, endpoint)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, key: str, endpoint: str) -> None:
+        """Asyncio counterpart of :meth:`acquire`."""
+        wait = self.reserve(key, endpoint)
+        if wait > 0:
+            await asyncio.sleep(wait)
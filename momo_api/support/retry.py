@@ -0,0 +1,113 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, FrozenSet, Optional
+
+import httpx
+
+from .endpoints import ENDPOINT_INITIATE
+
+DEFAULT_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def _accepted(response: httpx.Response) -> httpx.Response:
+    """Stand-in success for a resent request the provider already holds."""
+    return httpx.Response(202, request=response.request)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retries a product request on timeouts, connection errors and retryable statuses.
+
+    A retry resends the exact same request, so a payment keeps its
+    X-Reference-Id (Airtel: its transaction ``id``) across attempts and the
+    provider can never book it twice. If a retried payment is answered with
+    409 Conflict, the provider has already accepted an earlier attempt and
+    the call succeeds.
+
+    Attempt ``n`` waits ``backoff * multiplier ** (n - 1)`` seconds, capped
+    at ``max_backoff`` and shortened by up to ``jitter`` (a fraction). A
+    ``Retry-After`` header sent with a 429 or 503 is honoured when it is
+    longer.
+    """
+
+    max_attempts: int = 3
+    backoff: float = 0.5
+    multiplier: float = 2.0
+    max_backoff: float = 8.0
+    jitter: float = 0.5
+    retry_statuses: FrozenSet[int] = field(default=DEFAULT_RETRY_STATUSES)
+
+    def __post_init__(self) -> None:
+        if self.max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        if not 0 <= self.jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1")
+
+    def delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Seconds to wait after failed attempt number ``attempt``."""
+        delay = min(self.backoff * self.multiplier ** (attempt - 1), self.max_backoff)
+        delay *= 1 - self.jitter * random.random()
+        retry_after = _retry_after(response) if response is not None else None
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _next(self, attempt: int, response: Optional[httpx.Response]) -> Optional[float]:
+        """Return the delay before another attempt, or ``None`` to stop."""
+        if attempt >= self.max_attempts:
+            return None
+        if response is not None and response.status_code not in self.retry_statuses:
+            return None
+        return self.delay(attempt, response)
+
+    def call(self, send: Callable[[], httpx.Response], endpoint: str) -> httpx.Response:
+        """Run ``send`` until it succeeds, fails for good, or attempts run out."""
+        attempt = 1
+        while True:
+            try:
+                response = send()
+            except httpx.TransportError:
+                delay = self._next(attempt, None)
+                if delay is None:
+                    raise
+            else:
+                if attempt > 1 and endpoint == ENDPOINT_INITIATE and response.status_code == 409:
+                    return _accepted(response)
+                delay = self._next(attempt, response)
+                if delay is None:
+                    return response
+            time.sleep(delay)
+            attempt += 1
+
+    async def acall(
+        self, send: Callable[[], Awaitable[httpx.Response]], endpoint: str
+    ) -> httpx.Response:
+        """Asyncio counterpart of :meth:`call`."""
+        attempt = 1
+        while True:
+            try:
+                response = await send()
+            except httpx.TransportError:
+                delay = self._next(attempt, None)
+                if delay is None:
+                    raise
+            else:
+                if attempt > 1 and endpoint == ENDPOINT_INITIATE and response.status_code == 409:
+                    return _accepted(response)
+                delay = self._next(attempt, response)
+                if delay is None:
+                    return response
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    """A call in progress that concurrent callers with the same key wait on."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one.
+
+    While a call for ``key`` is in flight, further :meth:`do` (threads) or
+    :meth:`ado` (coroutines) calls with the same key do not start their own:
+    they wait for it and share its result or error. Nothing is cached; the
+    next call after it completes starts afresh. ``shared`` counts the calls
+    answered by another caller's flight.
+
+    Products coalesce their read-only GETs (status lookups, balance and
+    account holder checks) through it when given ``single_flight=``.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, _Call] = {}
+        self._async_calls: Dict[Tuple[int, str], "asyncio.Future[Any]"] = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls) + len(self._async_calls)
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """Run ``fn`` unless a call for ``key`` is in flight; share its outcome."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Asyncio counterpart of :meth:`do`, sharing calls within one event loop."""
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+        while True:
+            flight = self._async_calls.get(slot)
+            if flight is None:
+                break
+            self.shared += 1
+            try:
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                # The leading task was cancelled: retry and lead a new call.
+                if flight.cancelled():
+                    continue
+                raise
+
+        flight = loop.create_future()
+        self._async_calls[slot] = flight
+        try:
+            result = await fn()
+            flight.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as exc:
+            flight.set_exception(exc)
+            # Mark the exception as retrieved when nobody else was waiting.
+            flight.exception()
+            raise
+        finally:
+            del self._async_calls[slot]
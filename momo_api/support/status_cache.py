@@ -0,0 +1,205 @@
+import dataclasses
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Protocol, Tuple, Union
+
+from ..airtel.transaction import AirtelTransaction
+from ..models.transaction import Transaction
+from .poller import is_terminal
+
+_KINDS: Dict[str, Any] = {"mtn": Transaction, "airtel": AirtelTransaction}
+
+
+class StatusStore(Protocol):
+    """Backend holding terminal transaction statuses as serialized text."""
+
+    def load(self, key: str) -> Optional[str]:
+        ...
+
+    def save(self, key: str, value: str) -> None:
+        ...
+
+    def delete(self, key: str) -> None:
+        ...
+
+
+class MemoryStatusStore:
+    """Process-local status store keeping at most ``max_size`` entries (LRU)."""
+
+    def __init__(self, max_size: int = 100_000) -> None:
+        self._max_size = max_size
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def save(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SqliteStatusStore:
+    """Status store in a SQLite file, shared across processes and restarts.
+
+    Holds at most about ``max_size`` entries: once exceeded, the oldest are
+    trimmed every ``trim_every`` saves. Like :class:`SqliteTokenStore` it
+    runs in WAL mode with one connection per thread.
+    """
+
+    def __init__(
+        self, path: str, max_size: int = 1_000_000, trim_every: int = 1000, timeout: float = 5.0
+    ) -> None:
+        self._path = path
+        self._max_size = max_size
+        self._trim_every = trim_every
+        self._timeout = timeout
+        self._saves = 0
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS statuses ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " stored_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS statuses_stored_at ON statuses (stored_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self._path, timeout=self._timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM statuses").fetchone()[0]
+
+    def load(self, key: str) -> Optional[str]:
+        row = self._connect().execute(
+            "SELECT value FROM statuses WHERE key = ?", (key,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def save(self, key: str, value: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO statuses (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+        self._saves += 1
+        if self._saves % self._trim_every == 0:
+            self.trim()
+
+    def trim(self) -> None:
+        """Delete the oldest entries beyond ``max_size``."""
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM statuses WHERE key IN ("
+                " SELECT key FROM statuses ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self._max_size,),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM statuses WHERE key = ?", (key,))
+
+
+def _dump(transaction: Union[Transaction, AirtelTransaction]) -> str:
+    kind = "airtel" if isinstance(transaction, AirtelTransaction) else "mtn"
+    return json.dumps({"kind": kind, "data": dataclasses.asdict(transaction)})
+
+
+def _load(value: str) -> Union[Transaction, AirtelTransaction]:
+    entry = json.loads(value)
+    return _KINDS[entry["kind"]](**entry["data"])
+
+
+class StatusCache:
+    """Cache of status lookups keyed by reference.
+
+    A successful or failed transaction (Airtel ``TS`` / ``TF``) never changes,
+    so it is kept in ``store`` (a :class:`MemoryStatusStore` by default, or
+    e.g. a :class:`SqliteStatusStore`) for as long as the store's size bound
+    allows. A pending result is only remembered in memory for
+    ``pending_ttl`` seconds, for at most ``max_pending`` references.
+    """
+
+    def __init__(
+        self,
+        store: Optional[StatusStore] = None,
+        pending_ttl: float = 2.0,
+        max_pending: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._store: StatusStore = store if store is not None else MemoryStatusStore()
+        self._pending_ttl = pending_ttl
+        self._max_pending = max_pending
+        self._clock = clock
+        self._pending: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: str) -> Optional[Union[Transaction, AirtelTransaction]]:
+        """Return the cached transaction for ``key``, or ``None`` on a miss."""
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is not None:
+                if entry[1] > self._clock():
+                    self.hits += 1
+                    return _load(entry[0])
+                del self._pending[key]
+        value = self._store.load(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return _load(value)
+
+    def put(self, key: str, transaction: Union[Transaction, AirtelTransaction]) -> None:
+        value = _dump(transaction)
+        if is_terminal(transaction):
+            with self._lock:
+                self._pending.pop(key, None)
+            self._store.save(key, value)
+            return
+        if self._pending_ttl <= 0:
+            return
+        with self._lock:
+            self._pending[key] = (value, self._clock() + self._pending_ttl)
+            self._pending.move_to_end(key)
+            while len(self._pending) > self._max_pending:
+                self._pending.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._pending.pop(key, None)
+        self._store.delete(key)
@@ -0,0 +1,72 @@
+import math
+import time
+from typing import Callable, Generic, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class TimingWheel(Generic[T]):
+    """Hashed timing wheel holding items until their delay has elapsed.
+
+    Time is divided into ticks of ``tick`` seconds spread over ``size``
+    slots; scheduling and expiring an item are O(1) regardless of how many
+    items are waiting, so hundreds of thousands of timers cost one small
+    tuple each. Delays are rounded up to the next tick.
+
+    The wheel is not thread-safe: callers serialise access themselves.
+    """
+
+    def __init__(
+        self,
+        tick: float = 0.1,
+        size: int = 512,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if tick <= 0:
+            raise ValueError("tick must be positive")
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self._tick = tick
+        self._size = size
+        self._clock = clock
+        self._origin = clock()
+        self._current = 0
+        self._count = 0
+        self._slots: List[List[Tuple[int, T]]] = [[] for _ in range(size)]
+
+    @property
+    def tick(self) -> float:
+        return self._tick
+
+    def __len__(self) -> int:
+        return self._count
+
+    def schedule(self, item: T, delay: float) -> None:
+        """Expire ``item`` once ``delay`` seconds have elapsed."""
+        due = math.ceil((self._clock() + delay - self._origin) / self._tick)
+        due = max(due, self._current + 1)
+        self._slots[due % self._size].append((due, item))
+        self._count += 1
+
+    def expire(self) -> List[T]:
+        """Return (and remove) every item whose delay has elapsed."""
+        target = int((self._clock() - self._origin) / self._tick)
+        if target <= self._current:
+            return []
+        expired: List[T] = []
+        # Past one full turn every slot is visited once; the due tick decides.
+        for step in range(1, min(target - self._current, self._size) + 1):
+            index = (self._current + step) % self._size
+            slot = self._slots[index]
+            if not slot:
+                continue
+            keep = []
+            for due, item in slot:
+                if due <= target:
+                    expired.append(item)
+                else:
+                    keep.append((due, item))
+            self._slots[index] = keep
+        self._current = target
+        self._count -= len(expired)
+        return expired
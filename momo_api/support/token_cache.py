@@ -1,20 +1,261 @@
+import asyncio
+import random
+import threading
 import time
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 
+from ..models.api_token import ApiToken
+from .token_store import MemoryTokenStore, StoredToken, TokenStore
 
-class TokenCache:
-    """In-memory token cache with TTL expiry."""
+
+class _Flight:
+    """A token fetch in progress that concurrent callers wait on."""
 
     def __init__(self) -> None:
+        self.done = threading.Event()
+        self.token: Optional[ApiToken] = None
+        self.error: Optional[BaseException] = None
+
+
+class TokenCache:
+    """Token cache with TTL expiry, backed by a pluggable :class:`TokenStore`.
+
+    Tokens live in a process-local :class:`MemoryTokenStore` by default. Pass
+    a shared store (e.g. :class:`SqliteTokenStore`) so that every worker on a
+    host, and every restart, reuses a live token instead of fetching its own.
+    Entries are kept under ``key``; products :meth:`bind` the cache to a key
+    built from provider, environment, product and API user.
+
+    :meth:`get_or_fetch` and :meth:`aget_or_fetch` coalesce refreshes: when
+    the token is missing or expired, a single caller runs the fetch and every
+    concurrent caller waits for (and shares) its result or error.
+
+    With ``refresh_ahead`` set (a fraction of ``expires_in``, e.g. ``0.8``),
+    the token is renewed in the background once that fraction of its lifetime
+    has elapsed, while callers keep using the still-valid token. The renewal
+    point is pulled earlier by up to ``jitter`` (a fraction of it) so that
+    many workers sharing credentials do not refresh in lockstep. With a shared
+    store, a worker reaching its renewal point first adopts a token another
+    worker has already renewed.
+    """
+
+    RETRY_AFTER_FAILED_REFRESH = 5.0
+
+    def __init__(
+        self,
+        refresh_ahead: Optional[float] = None,
+        jitter: float = 0.1,
+        store: Optional[TokenStore] = None,
+        key: str = "default",
+    ) -> None:
+        if refresh_ahead is not None and not 0 < refresh_ahead < 1:
+            raise ValueError("refresh_ahead must be between 0 and 1")
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be between 0 and 1")
+        self._refresh_ahead = refresh_ahead
+        self._jitter = jitter
+        self._store: TokenStore = store if store is not None else MemoryTokenStore()
+        self._key = key
         self._token: Optional[str] = None
+        self._issued_at: float = 0.0
         self._expires_at: float = 0.0
+        self._refresh_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._flight: Optional[_Flight] = None
+        self._async_flight: Optional["asyncio.Future[ApiToken]"] = None
+        self._refresh_task: Optional["asyncio.Task[None]"] = None
+        self._counts = [0, 0]
+
+    @property
+    def key(self) -> str:
+        return self._key
+
+    def bind(self, key: str) -> "TokenCache":
+        """Return a cache sharing this cache's store and settings under ``key``."""
+        if key == self._key:
+            return self
+        cache = TokenCache(self._refresh_ahead, self._jitter, self._store, key)
+        cache._counts = self._counts
+        return cache
+
+    @property
+    def hits(self) -> int:
+        return self._counts[0]
+
+    @property
+    def misses(self) -> int:
+        return self._counts[1]
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self._counts[0] + self._counts[1]
+        return self._counts[0] / total if total else 0.0
 
     def get(self) -> Optional[str]:
-        if self._token is None or time.monotonic() >= self._expires_at:
-            self._token = None
-            return None
+        if self._token is None or time.time() >= self._expires_at:
+            if not self._adopt(self._store.load(self._key)):
+                return None
         return self._token
 
     def set(self, token: str, expires_in: int) -> None:
-        self._token = token
-        self._expires_at = time.monotonic() + max(0, expires_in - 60)
+        entry = StoredToken(access_token=token, issued_at=time.time(), expires_in=expires_in)
+        self._store.save(self._key, entry)
+        self._adopt(entry)
+
+    def _adopt(self, entry: Optional[StoredToken]) -> bool:
+        """Make ``entry`` the local token if it is still valid."""
+        if entry is None:
+            self._token = None
+            return False
+        expires_at = entry.issued_at + max(0, entry.expires_in - 60)
+        if time.time() >= expires_at:
+            self._token = None
+            return False
+        refresh_at = None
+        if self._refresh_ahead is not None:
+            delay = entry.expires_in * self._refresh_ahead
+            delay *= 1 - self._jitter * random.random()
+            refresh_at = min(entry.issued_at + delay, expires_at)
+        self._issued_at = entry.issued_at
+        self._expires_at = expires_at
+        self._refresh_at = refresh_at
+        self._token = entry.access_token
+        return True
+
+    def _renewed_in_store(self) -> Optional[ApiToken]:
+        """Return a token another process stored since ours was issued."""
+        entry = self._store.load(self._key)
+        if entry is None or entry.issued_at <= self._issued_at or not self._adopt(entry):
+            return None
+        if self._refresh_due():
+            return None
+        remaining = int(self._expires_at - time.time())
+        return ApiToken(access_token=entry.access_token, token_type="Bearer", expires_in=remaining)
+
+    def _refresh_due(self) -> bool:
+        refresh_at = self._refresh_at
+        return refresh_at is not None and time.time() >= refresh_at
+
+    def _cached(self) -> Optional[ApiToken]:
+        token = self.get()
+        if token is None:
+            return None
+        return ApiToken(access_token=token, token_type="Bearer", expires_in=0)
+
+    def get_or_fetch(self, fetch: Callable[[], ApiToken]) -> ApiToken:
+        """Return the cached token, or fetch one while other threads wait."""
+        cached = self._cached()
+        if cached is not None:
+            self._counts[0] += 1
+            if self._refresh_due():
+                self._start_background_refresh(fetch)
+            return cached
+
+        with self._lock:
+            cached = self._cached()
+            if cached is not None:
+                self._counts[0] += 1
+                return cached
+            self._counts[1] += 1
+            flight = self._flight
+            leader = flight is None
+            if flight is None:
+                flight = self._flight = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            assert flight.token is not None
+            return flight.token
+        return self._run_flight(flight, fetch)
+
+    def _run_flight(self, flight: _Flight, fetch: Callable[[], ApiToken]) -> ApiToken:
+        try:
+            token = self._renewed_in_store()
+            if token is None:
+                token = fetch()
+                self.set(token.access_token, token.expires_in)
+            flight.token = token
+            return token
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._flight = None
+            flight.done.set()
+
+    def _start_background_refresh(self, fetch: Callable[[], ApiToken]) -> None:
+        with self._lock:
+            if self._flight is not None or not self._refresh_due():
+                return
+            flight = self._flight = _Flight()
+            self._refresh_at = None
+
+        def refresh() -> None:
+            try:
+                self._run_flight(flight, fetch)
+            except Exception:
+                # Keep serving the current token; try again a little later.
+                self._refresh_at = time.time() + self.RETRY_AFTER_FAILED_REFRESH
+
+        threading.Thread(target=refresh, name="momo-token-refresh", daemon=True).start()
+
+    async def aget_or_fetch(self, fetch: Callable[[], Awaitable[ApiToken]]) -> ApiToken:
+        """Asyncio counterpart of :meth:`get_or_fetch` for coroutines on one loop."""
+        counted = False
+        while True:
+            cached = self._cached()
+            if cached is not None:
+                if not counted:
+                    self._counts[0] += 1
+                if self._refresh_due() and self._async_flight is None:
+                    self._refresh_at = None
+                    self._refresh_task = asyncio.ensure_future(self._arefresh(fetch))
+                return cached
+            if not counted:
+                self._counts[1] += 1
+                counted = True
+            flight = self._async_flight
+            if flight is None:
+                break
+            try:
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                # The fetching task was cancelled: retry and lead a new fetch.
+                if flight.cancelled():
+                    continue
+                raise
+
+        return await self._arun_flight(fetch)
+
+    async def _arun_flight(self, fetch: Callable[[], Awaitable[ApiToken]]) -> ApiToken:
+        flight = asyncio.get_running_loop().create_future()
+        self._async_flight = flight
+        try:
+            token = self._renewed_in_store()
+            if token is None:
+                token = await fetch()
+                self.set(token.access_token, token.expires_in)
+            flight.set_result(token)
+            return token
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as exc:
+            flight.set_exception(exc)
+            # Mark the exception as retrieved when nobody else was waiting.
+            flight.exception()
+            raise
+        finally:
+            self._async_flight = None
+
+    async def _arefresh(self, fetch: Callable[[], Awaitable[ApiToken]]) -> None:
+        try:
+            await self._arun_flight(fetch)
+        except Exception:
+            # Keep serving the current token; try again a little later.
+            self._refresh_at = time.time() + self.RETRY_AFTER_FAILED_REFRESH
+        finally:
+            self._refresh_task = None
@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Protocol
+
+
+@dataclass
+class StoredToken:
+    """An access token as persisted by a :class:`TokenStore`.
+
+    ``issued_at`` is a wall-clock (``time.time()``) timestamp so entries stay
+    meaningful across processes and restarts.
+    """
+
+    access_token: str
+    issued_at: float
+    expires_in: int
+
+
+class TokenStore(Protocol):
+    """Backend holding access tokens keyed by :func:`token_key`."""
+
+    def load(self, key: str) -> Optional[StoredToken]:
+        ...
+
+    def save(self, key: str, token: StoredToken) -> None:
+        ...
+
+    def delete(self, key: str) -> None:
+        ...
+
+
+def token_key(provider: str, environment: str, product: str, user: str) -> str:
+    """Build the store key identifying one set of credentials."""
+    return f"{provider}:{environment}:{product}:{user}"
+
+
+class MemoryTokenStore:
+    """Process-local token store (the default)."""
+
+    def __init__(self) -> None:
+        self._tokens: Dict[str, StoredToken] = {}
+        self._lock = threading.Lock()
+
+    def load(self, key: str) -> Optional[StoredToken]:
+        return self._tokens.get(key)
+
+    def save(self, key: str, token: StoredToken) -> None:
+        with self._lock:
+            self._tokens[key] = token
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._tokens.pop(key, None)
+
+
+class SqliteTokenStore:
+    """Token store shared by every process on a host through a SQLite file.
+
+    The database runs in WAL mode so readers never block on a writer; each
+    thread (and each forked worker) opens its own connection.
+    """
+
+    def __init__(self, path: str, timeout: float = 5.0) -> None:
+        self._path = path
+        self._timeout = timeout
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tokens ("
+                " key TEXT PRIMARY KEY,"
+                " access_token TEXT NOT NULL,"
+                " issued_at REAL NOT NULL,"
+                " expires_in INTEGER NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self._path, timeout=self._timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def load(self, key: str) -> Optional[StoredToken]:
+        row = self._connect().execute(
+            "SELECT access_token, issued_at, expires_in FROM tokens WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        return StoredToken(access_token=row[0], issued_at=row[1], expires_in=row[2])
+
+    def save(self, key: str, token: StoredToken) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO tokens (key, access_token, issued_at, expires_in)"
+                " VALUES (?, ?, ?, ?)",
+                (key, token.access_token, token.issued_at, token.expires_in),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM tokens WHERE key = ?", (key,))
@@ -0,0 +1,236 @@
+import threading
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+import httpx
+
+from .instrumentation import RequestObserver, RequestTrace
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_TIMEOUT = 30.0
+
+
+@dataclass
+class PoolStats:
+    """Snapshot of the connections held by an HTTP transport."""
+
+    active: int
+    idle: int
+    max_connections: Optional[int]
+    max_keepalive_connections: Optional[int]
+
+    @property
+    def total(self) -> int:
+        return self.active + self.idle
+
+
+def _pool_stats(client: Optional[Any], limits: httpx.Limits) -> PoolStats:
+    active = idle = 0
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    for connection in getattr(pool, "connections", None) or []:
+        if connection.is_idle():
+            idle += 1
+        else:
+            active += 1
+    return PoolStats(
+        active=active,
+        idle=idle,
+        max_connections=limits.max_connections,
+        max_keepalive_connections=limits.max_keepalive_connections,
+    )
+
+
+class HttpTransport:
+    """Long-lived, pooled HTTP transport shared by the API products.
+
+    The underlying ``httpx.Client`` is created lazily on first use and keeps
+    connections alive between calls, so consecutive requests to the same host
+    reuse the TCP/TLS session instead of paying a new handshake each time.
+
+    Observers added with :meth:`add_observer` receive a
+    :class:`~momo_api.support.instrumentation.RequestEvent` with the phase
+    timings of every API call the products send through the transport.
+    """
+
+    _default: Optional["HttpTransport"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: Optional[int] = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: Optional[float] = DEFAULT_KEEPALIVE_EXPIRY,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+    ) -> None:
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._timeout = httpx.Timeout(timeout)
+        self._client: Optional[httpx.Client] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._observers: Tuple[RequestObserver, ...] = ()
+
+    @classmethod
+    def default(cls) -> "HttpTransport":
+        """Return the process-wide shared transport, creating it if needed."""
+        with cls._default_lock:
+            if cls._default is None or cls._default.closed:
+                cls._default = cls()
+            return cls._default
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def client(self) -> httpx.Client:
+        client = self._client
+        if client is not None:
+            return client
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Cannot send a request, the transport has been closed.")
+            if self._client is None:
+                self._client = httpx.Client(limits=self._limits, timeout=self._timeout)
+            return self._client
+
+    @property
+    def observers(self) -> Tuple[RequestObserver, ...]:
+        return self._observers
+
+    def add_observer(self, observer: RequestObserver) -> None:
+        """Report every API call sent through this transport to ``observer``."""
+        self._observers = self._observers + (observer,)
+
+    def remove_observer(self, observer: RequestObserver) -> None:
+        self._observers = tuple(o for o in self._observers if o is not observer)
+
+    def trace(
+        self, provider: str, product: str, endpoint: str, method: str, url: str
+    ) -> Optional[RequestTrace]:
+        """Start timing an API call, or return ``None`` when nobody observes."""
+        if not self._observers:
+            return None
+        return RequestTrace(self._observers, provider, product, endpoint, method, url)
+
+    def request(
+        self, method: str, url: str, trace: Optional[RequestTrace] = None, **kwargs: Any
+    ) -> httpx.Response:
+        if trace is not None:
+            kwargs["extensions"] = trace.attempt()
+        return self.client.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> PoolStats:
+        """Return the number of active and idle pooled connections."""
+        return _pool_stats(self._client, self._limits)
+
+    def close(self) -> None:
+        """Close every pooled connection. The transport cannot be reused afterwards."""
+        with self._lock:
+            self._closed = True
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+
+    def __enter__(self) -> "HttpTransport":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class AsyncHttpTransport:
+    """Pooled ``httpx.AsyncClient`` counterpart of :class:`HttpTransport`.
+
+    An async client is tied to the event loop it first runs on, so there is
+    no process-wide default: create one per loop and ``aclose()`` it when done.
+    """
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: Optional[int] = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: Optional[float] = DEFAULT_KEEPALIVE_EXPIRY,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+    ) -> None:
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._timeout = httpx.Timeout(timeout)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._closed = False
+        self._observers: Tuple[RequestObserver, ...] = ()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._closed:
+            raise RuntimeError("Cannot send a request, the transport has been closed.")
+        if self._client is None:
+            self._client = httpx.AsyncClient(limits=self._limits, timeout=self._timeout)
+        return self._client
+
+    @property
+    def observers(self) -> Tuple[RequestObserver, ...]:
+        return self._observers
+
+    def add_observer(self, observer: RequestObserver) -> None:
+        """Report every API call sent through this transport to ``observer``."""
+        self._observers = self._observers + (observer,)
+
+    def remove_observer(self, observer: RequestObserver) -> None:
+        self._observers = tuple(o for o in self._observers if o is not observer)
+
+    def trace(
+        self, provider: str, product: str, endpoint: str, method: str, url: str
+    ) -> Optional[RequestTrace]:
+        """Start timing an API call, or return ``None`` when nobody observes."""
+        if not self._observers:
+            return None
+        return RequestTrace(self._observers, provider, product, endpoint, method, url)
+
+    async def request(
+        self, method: str, url: str, trace: Optional[RequestTrace] = None, **kwargs: Any
+    ) -> httpx.Response:
+        if trace is not None:
+            kwargs["extensions"] = trace.aattempt()
+        return await self.client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    def stats(self) -> PoolStats:
+        """Return the number of active and idle pooled connections."""
+        return _pool_stats(self._client, self._limits)
+
+    async def aclose(self) -> None:
+        """Close every pooled connection. The transport cannot be reused afterwards."""
+        self._closed = True
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    async def __aenter__(self) -> "AsyncHttpTransport":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
@@ -71,3 +71,19 @@ def token_response() -> dict:
 @pytest.fixture
 def account_balance_response() -> dict:
     return load_fixture("account_balance.json")
+
+
+class FakeClock:
+    """A clock for injected ``clock=`` callables; tests move it by setting ``now``."""
+
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def fake_clock():
+    """Build a :class:`FakeClock` starting at the given time."""
+    return FakeClock
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from momo_api import AccountHolderCache, AirtelApi, AirtelConfig, MomoApi, ProductOptions
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+
+
+def _holder_url(product: str, phone: str) -> str:
+    return f"{SANDBOX_BASE}/{product}/v1_0/accountholder/msisdn/{phone}/active"
+
+
+def test_positive_and_negative_ttls(fake_clock):
+    clock = fake_clock(100.0)
+    cache = AccountHolderCache(ttl=300, negative_ttl=30, clock=clock)
+    cache.put("active", True)
+    cache.put("inactive", False)
+
+    clock.now += 30
+    assert cache.get("active") is True
+    assert cache.get("inactive") is None
+    clock.now += 270
+    assert cache.get("active") is None
+
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(cache) == 0
+
+
+def test_least_recently_used_numbers_are_dropped():
+    cache = AccountHolderCache(max_size=2)
+    cache.put("a", True)
+    cache.put("b", True)
+    cache.get("a")
+    cache.put("c", True)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is True
+    assert cache.get("c") is True
+
+
+def test_collection_answers_repeat_checks_from_cache(
+    collection_config, token_response, httpx_mock: HTTPXMock
+):
+    phone = "46733123454"
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_response(
+        method="GET", url=_holder_url("collection", phone), json={"result": True}, is_reusable=True
+    )
+    cache = AccountHolderCache()
+    collection = MomoApi.collection(collection_config, account_cache=cache)
+
+    assert collection.check_account_holder(phone) is True
+    assert collection.check_account_holder(phone) is True
+    assert len(httpx_mock.get_requests(url=_holder_url("collection", phone))) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    collection.invalidate_account_holder(phone)
+    collection.check_account_holder(phone)
+    assert len(httpx_mock.get_requests(url=_holder_url("collection", phone))) == 2
+
+
+def test_async_disbursement_uses_cache(disbursement_config, token_response, httpx_mock: HTTPXMock):
+    phone = "46733123454"
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/disbursement/token/", json=token_response)
+    httpx_mock.add_response(method="GET", url=_holder_url("disbursement", phone), json={"result": False})
+    cache = AccountHolderCache()
+
+    async def main():
+        async with MomoApi.async_disbursement(disbursement_config, account_cache=cache) as api:
+            return [await api.check_account_holder(phone) for _ in range(2)]
+
+    assert asyncio.run(main()) == [False, False]
+    assert cache.hits == 1
+
+
+def test_products_share_one_options_object(collection_config, disbursement_config):
+    cache = AccountHolderCache()
+    options = ProductOptions(account_cache=cache, lazy_transactions=True)
+    collection = MomoApi.collection(collection_config, options=options)
+    disbursement = MomoApi.disbursement(disbursement_config, options=options, lazy_transactions=False)
+
+    assert collection._account_cache is disbursement._account_cache is cache
+    assert collection._lazy_transactions and not disbursement._lazy_transactions
+    with pytest.raises(TypeError):
+        MomoApi.collection(collection_config, account_cahce=cache)
+
+
+def test_airtel_products_reject_the_account_cache():
+    airtel = AirtelApi.create()
+    with pytest.raises(TypeError, match="account_cache"):
+        airtel.get_collection(AirtelConfig.collection("id", "secret"), account_cache=AccountHolderCache())
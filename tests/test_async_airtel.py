@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from momo_api.airtel.api import STAGING_URL, AirtelApi
+from momo_api.airtel.config import AirtelConfig
+from momo_api.airtel.transaction import AirtelTransaction
+from momo_api.exceptions import MomoException
+
+BASE_URL = STAGING_URL
+
+
+@pytest.fixture
+def token_json() -> dict:
+    return {"access_token": "test-airtel-token", "expires_in": 3600}
+
+
+def test_collection_request_to_pay_and_status(token_json, httpx_mock: HTTPXMock):
+    config = AirtelConfig.collection("client-id", "client-secret")
+    httpx_mock.add_response(method="POST", url=f"{BASE_URL}/auth/oauth2/token", json=token_json)
+    httpx_mock.add_response(method="POST", url=f"{BASE_URL}/merchant/v1/payments/", json={})
+
+    async def run():
+        async with AirtelApi.async_collection(AirtelApi.ENVIRONMENT_STAGING, config) as api:
+            external_id = await api.request_to_pay("5000", "068511358", "ORDER-001")
+            httpx_mock.add_response(
+                method="GET",
+                url=f"{BASE_URL}/standard/v1/payments/{external_id}",
+                json={"data": {"transaction": {"id": external_id, "status": "TS"}}},
+            )
+            return await api.get_payment_status(external_id)
+
+    transaction = asyncio.run(run())
+    assert isinstance(transaction, AirtelTransaction)
+    assert transaction.is_successful()
+    # The token was fetched once and reused for the status call
+    assert len(httpx_mock.get_requests(url=f"{BASE_URL}/auth/oauth2/token")) == 1
+
+
+def test_disbursement_transfer_requires_pin():
+    config = AirtelConfig.collection("client-id", "client-secret")
+
+    async def run():
+        async with AirtelApi.async_disbursement(AirtelApi.ENVIRONMENT_STAGING, config) as api:
+            await api.transfer("1000", "068511358", "PAY-1")
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+
+
+def test_disbursement_get_balance_raises_on_error(token_json, httpx_mock: HTTPXMock):
+    config = AirtelConfig.disbursement("client-id", "client-secret", "pin")
+    httpx_mock.add_response(method="POST", url=f"{BASE_URL}/auth/oauth2/token", json=token_json)
+    httpx_mock.add_response(
+        method="GET", url=f"{BASE_URL}/standard/v1/users/balance", status_code=500, json={}
+    )
+
+    async def run():
+        api = AirtelApi.create().get_async_disbursement(config)
+        try:
+            await api.get_balance()
+        finally:
+            await api.aclose()
+
+    with pytest.raises(MomoException):
+        asyncio.run(run())
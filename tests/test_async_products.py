@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from momo_api import AsyncHttpTransport, MomoApi
+from momo_api.exceptions import ResourceNotFoundException
+from momo_api.models.payment_request import PaymentRequest
+from momo_api.models.transfer_request import TransferRequest
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+
+
+def test_request_to_pay(collection_config, token_response, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/v1_0/requesttopay", status_code=202)
+
+    async def run():
+        async with MomoApi.async_collection(collection_config) as api:
+            return await api.request_to_pay(PaymentRequest.make("100", "46733123450", "order-1"))
+
+    reference_id = asyncio.run(run())
+    assert len(reference_id) == 36
+    request = httpx_mock.get_requests()[-1]
+    assert request.headers["X-Reference-Id"] == reference_id
+
+
+def test_get_payment_status(collection_config, token_response, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{SANDBOX_BASE}/collection/v1_0/requesttopay/some-uuid",
+        json={"amount": "100", "currency": "EUR", "status": "SUCCESSFUL"},
+    )
+
+    async def run():
+        async with MomoApi.async_collection(collection_config) as api:
+            return await api.get_payment_status("some-uuid")
+
+    transaction = asyncio.run(run())
+    assert transaction.is_successful()
+    assert transaction.amount == "100"
+
+
+def test_concurrent_calls_share_transport_and_token(
+    collection_config, token_response, account_balance_response, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{SANDBOX_BASE}/collection/v1_0/account/balance",
+        json=account_balance_response,
+        is_reusable=True,
+    )
+
+    async def run():
+        async with AsyncHttpTransport() as transport:
+            api = MomoApi.async_collection(collection_config, transport=transport)
+            await api.get_access_token()
+            return await asyncio.gather(*(api.get_balance() for _ in range(5)))
+
+    balances = asyncio.run(run())
+    assert [b.available_balance for b in balances] == ["1000"] * 5
+
+
+def test_transfer_and_status(disbursement_config, token_response, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/disbursement/token/", json=token_response)
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/disbursement/v1_0/transfer", status_code=202)
+
+    async def run():
+        async with MomoApi.async_disbursement(disbursement_config) as api:
+            return await api.transfer(TransferRequest.make("150", "46733123450", "tr-1"))
+
+    assert len(asyncio.run(run())) == 36
+
+
+def test_get_refund_status_not_found(disbursement_config, token_response, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/disbursement/token/", json=token_response)
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{SANDBOX_BASE}/disbursement/v1_0/refund/unknown",
+        json={"message": "Not found"},
+        status_code=404,
+    )
+
+    async def run():
+        async with MomoApi.async_disbursement(disbursement_config) as api:
+            await api.get_refund_status("unknown")
+
+    with pytest.raises(ResourceNotFoundException):
+        asyncio.run(run())
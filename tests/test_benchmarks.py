@@ -0,0 +1,48 @@
+import json
+
+from benchmarks.run import SCENARIOS, main, percentile, run
+
+
+def test_percentile_is_nearest_rank():
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 0.5) == 50.0
+    assert percentile(samples, 0.99) == 99.0
+    assert percentile(samples, 1.0) == 100.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_every_mode_runs_against_the_simulator():
+    report = run(
+        scenarios=["mtn.collection.request_to_pay", "airtel.disbursement.transfer"],
+        requests=8,
+        concurrency=2,
+        allocations=4,
+    )
+
+    modes = [(r["scenario"], r["mode"]) for r in report["results"]]
+    assert len(modes) == 6
+    assert all(r["errors"] == 0 and r["requests_per_second"] > 0 for r in report["results"])
+    sequential = report["results"][0]
+    assert sequential["latency"]["p50"] <= sequential["latency"]["p99"]
+    assert set(sequential["allocations"]) == {
+        "net_blocks_per_call", "net_bytes_per_call", "peak_bytes"
+    }
+
+
+def test_cli_writes_json(tmp_path):
+    output = tmp_path / "results.json"
+    main([
+        "--scenario", "mtn.collection.payment_status",
+        "--mode", "sequential",
+        "--requests", "3",
+        "--allocations", "0",
+        "--codec", "stdlib",
+        "--codec-iterations", "10",
+        "--output", str(output),
+    ])
+
+    report = json.loads(output.read_text())
+    (result,) = report["results"]
+    assert result["scenario"] in SCENARIOS and "allocations" not in result
+    assert report["environment"]["codec"] == "stdlib"
+    assert "stdlib" in report["codecs"]
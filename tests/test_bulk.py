@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from momo_api import MomoApi
+from momo_api.exceptions import BadRequestException
+from momo_api.models.payment_request import PaymentRequest
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+
+
+def _requests(count: int):
+    return (PaymentRequest.make("100", "46733123450", f"order-{i}") for i in range(count))
+
+
+def _reject_order_3(request: httpx.Request) -> httpx.Response:
+    if json.loads(request.content)["externalId"] == "order-3":
+        return httpx.Response(400, json={"message": "Bad request"})
+    return httpx.Response(202)
+
+
+def test_request_to_pay_many_reports_each_item(collection_api, token_response, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_callback(
+        _reject_order_3,
+        method="POST",
+        url=f"{SANDBOX_BASE}/collection/v1_0/requesttopay",
+        is_reusable=True,
+    )
+
+    results = sorted(collection_api.request_to_pay_many(_requests(10), concurrency=4), key=lambda r: r.index)
+
+    assert [r.index for r in results] == list(range(10))
+    failed = [r for r in results if not r.ok]
+    assert len(failed) == 1
+    assert failed[0].request.external_id == "order-3"
+    assert isinstance(failed[0].error, BadRequestException)
+    assert all(len(r.reference_id) == 36 for r in results if r.ok)
+    assert len(httpx_mock.get_requests(url=f"{SANDBOX_BASE}/collection/token/")) == 1
+
+
+def test_request_to_pay_many_streams_input(collection_api, token_response, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_response(
+        method="POST", url=f"{SANDBOX_BASE}/collection/v1_0/requesttopay", status_code=202, is_reusable=True
+    )
+    consumed = []
+
+    def source():
+        for request in _requests(1000):
+            consumed.append(request)
+            yield request
+
+    results = collection_api.request_to_pay_many(source(), concurrency=2)
+    next(results)
+    # Only a bounded window of the input has been pulled so far.
+    assert len(consumed) <= 3
+    results.close()
+
+
+def test_request_to_pay_many_rejects_invalid_concurrency(collection_api):
+    with pytest.raises(ValueError):
+        list(collection_api.request_to_pay_many(_requests(1), concurrency=0))
+
+
+def test_async_request_to_pay_many(collection_config, token_response, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_callback(
+        _reject_order_3,
+        method="POST",
+        url=f"{SANDBOX_BASE}/collection/v1_0/requesttopay",
+        is_reusable=True,
+    )
+
+    async def run():
+        async with MomoApi.async_collection(collection_config) as api:
+            return [r async for r in api.request_to_pay_many(_requests(20), concurrency=5)]
+
+    results = asyncio.run(run())
+    assert sorted(r.index for r in results) == list(range(20))
+    assert [r.request.external_id for r in results if not r.ok] == ["order-3"]
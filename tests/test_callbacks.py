@@ -0,0 +1,276 @@
+import asyncio
+import io
+import json
+from wsgiref.util import setup_testing_defaults
+
+import pytest
+
+from momo_api import CallbackReceiver, StatusPoller
+from momo_api.airtel.transaction import AirtelTransaction
+from momo_api.models.transaction import Transaction
+from momo_api.support.callbacks import parse_callback
+
+MTN_CALLBACK = {
+    "financialTransactionId": "1234567",
+    "externalId": "order-1",
+    "amount": "100",
+    "currency": "XAF",
+    "payer": {"partyIdType": "MSISDN", "partyId": "46733123450"},
+    "payerMessage": "Pay",
+    "payeeNote": "Thanks",
+    "status": "SUCCESSFUL",
+}
+
+AIRTEL_CALLBACK = {
+    "transaction": {
+        "id": "tx-1",
+        "message": "Paid",
+        "status_code": "TS",
+        "airtel_money_id": "MP210603.1234.L06941",
+    }
+}
+
+
+def test_parse_mtn_and_airtel_payloads():
+    provider, reference_id, transaction = parse_callback(MTN_CALLBACK, {"referenceId": "ref-1"})
+    assert (provider, reference_id) == ("mtn", "ref-1")
+    assert isinstance(transaction, Transaction)
+    assert transaction.is_successful()
+
+    provider, reference_id, transaction = parse_callback(AIRTEL_CALLBACK)
+    assert (provider, reference_id) == ("airtel", "tx-1")
+    assert isinstance(transaction, AirtelTransaction)
+    assert transaction.is_successful()
+    assert transaction.airtel_money_id == "MP210603.1234.L06941"
+
+
+def test_parse_rejects_unknown_payloads():
+    with pytest.raises(ValueError):
+        parse_callback({"hello": "world"})
+    with pytest.raises(ValueError):
+        parse_callback([1, 2])
+
+
+def test_mtn_callback_is_correlated_by_external_id():
+    receiver = CallbackReceiver()
+    events = []
+    receiver.add_listener(events.append)
+    receiver.expect("ref-1", external_id="order-1", context={"order": 1})
+
+    receiver.handle(json.dumps(MTN_CALLBACK).encode())
+
+    (event,) = events
+    assert event.reference_id == "ref-1"
+    assert event.expected
+    assert event.context == {"order": 1}
+    assert receiver.pending == 0
+
+
+def test_pending_notification_keeps_reference_outstanding():
+    receiver = CallbackReceiver()
+    receiver.expect("tx-1")
+
+    event = receiver.handle(json.dumps({"transaction": {"id": "tx-1", "status_code": "TIP"}}).encode())
+
+    assert event.expected
+    assert receiver.pending == 1
+
+
+def test_unexpected_callbacks_are_still_reported():
+    receiver = CallbackReceiver()
+    events = []
+    receiver.add_listener(events.append)
+
+    receiver.handle(json.dumps(AIRTEL_CALLBACK).encode())
+
+    assert events[0].reference_id == "tx-1"
+    assert not events[0].expected
+
+
+def test_pending_references_are_bounded():
+    receiver = CallbackReceiver(max_pending=2)
+    receiver.expect("ref-1", external_id="order-1")
+    receiver.expect("ref-2")
+    receiver.expect("ref-3")
+
+    assert receiver.pending == 2
+    assert not receiver.forget("ref-1")
+    event = receiver.handle(json.dumps(MTN_CALLBACK).encode())
+    assert event.reference_id is None
+
+
+def test_callback_cancels_fallback_polling():
+    poller = StatusPoller(lambda reference_id: None, initial_delay=60)
+    receiver = CallbackReceiver()
+    receiver.add_listener(lambda event: poller.remove(event.reference_id))
+    poller.add("tx-1")
+    receiver.expect("tx-1")
+
+    receiver.handle(json.dumps(AIRTEL_CALLBACK).encode())
+
+    assert poller.pending == 0
+
+
+def _call_asgi(receiver, method, body, query=b""):
+    messages = [{"type": "http.request", "body": body[:5], "more_body": True},
+                {"type": "http.request", "body": body[5:], "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": "/callback", "query_string": query}
+    asyncio.run(receiver.asgi(scope, receive, send))
+    return sent[0]["status"], sent[1]["body"]
+
+
+def test_asgi_app():
+    receiver = CallbackReceiver()
+    events = []
+    receiver.add_listener(events.append)
+
+    status, _ = _call_asgi(receiver, "PUT", json.dumps(MTN_CALLBACK).encode(), b"referenceId=ref-9")
+    assert status == 200
+    assert events[0].reference_id == "ref-9"
+
+    assert _call_asgi(receiver, "POST", b"not json")[0] == 400
+    assert _call_asgi(receiver, "GET", b"")[0] == 405
+
+
+def test_asgi_lifespan():
+    receiver = CallbackReceiver()
+    messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message["type"])
+
+    asyncio.run(receiver.asgi({"type": "lifespan"}, receive, send))
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+
+
+def test_wsgi_app():
+    receiver = CallbackReceiver()
+    events = []
+    receiver.add_listener(events.append)
+    body = json.dumps(AIRTEL_CALLBACK).encode()
+    environ = {}
+    setup_testing_defaults(environ)
+    environ.update({
+        "REQUEST_METHOD": "POST",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": io.BytesIO(body),
+    })
+    statuses = []
+
+    result = receiver.wsgi(environ, lambda status, headers: statuses.append(status))
+
+    assert statuses == ["200 OK"]
+    assert json.loads(b"".join(result)) == {"status": "ok"}
+    assert events[0].transaction.status == "TS"
+
+
+def test_oversized_bodies_are_rejected_unparsed():
+    receiver = CallbackReceiver(max_body=64)
+    events = []
+    receiver.add_listener(events.append)
+    body = json.dumps({**MTN_CALLBACK, "payeeNote": "x" * 100}).encode()
+
+    status, payload = _call_asgi(receiver, "POST", body)
+    assert status == 413
+    assert json.loads(payload) == {"error": "callback body too large"}
+
+    environ = {}
+    setup_testing_defaults(environ)
+    environ.update({"REQUEST_METHOD": "POST", "CONTENT_LENGTH": str(len(body)), "wsgi.input": io.BytesIO(body)})
+    statuses = []
+    receiver.wsgi(environ, lambda status, headers: statuses.append(status))
+
+    assert statuses == ["413 Payload Too Large"]
+    assert environ["wsgi.input"].tell() == 0
+    assert events == []
+
+
+def test_asgi_drains_a_rejected_body():
+    receiver = CallbackReceiver(max_body=64)
+    messages = [{"type": "http.request", "body": b"x" * 10, "more_body": True} for _ in range(20)]
+    messages.append({"type": "http.request", "body": b"", "more_body": False})
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(receiver.asgi({"type": "http", "method": "POST", "query_string": b""}, receive, send))
+
+    assert sent[0]["status"] == 413
+    assert messages == []
+
+
+def _wsgi_environ(body, **extra):
+    environ = {}
+    setup_testing_defaults(environ)
+    environ.update({"REQUEST_METHOD": "POST", "wsgi.input": io.BytesIO(body), **extra})
+    environ.pop("CONTENT_LENGTH", None)
+    return environ
+
+
+def test_wsgi_reads_a_body_without_content_length():
+    receiver = CallbackReceiver(max_body=256)
+    events = []
+    receiver.add_listener(events.append)
+    statuses = []
+
+    def call(body, **extra):
+        receiver.wsgi(_wsgi_environ(body, **extra), lambda status, headers: statuses.append(status))
+
+    call(json.dumps(AIRTEL_CALLBACK).encode(), **{"wsgi.input_terminated": True})
+    call(b"x" * 1000, **{"wsgi.input_terminated": True})
+    call(json.dumps(AIRTEL_CALLBACK).encode())
+
+    assert statuses == ["200 OK", "413 Payload Too Large", "400 Bad Request"]
+    assert len(events) == 1
+
+
+def test_codec_errors_are_bad_requests():
+    class Broken:
+        name = "broken"
+
+        def dumps(self, obj):
+            raise NotImplementedError
+
+        def loads(self, data):
+            raise RuntimeError("codec bug")
+
+    assert _call_asgi(CallbackReceiver(codec=Broken()), "POST", b"{}")[0] == 400
+
+    odd = json.dumps({**MTN_CALLBACK, "externalId": {"nested": True}}).encode()
+    assert _call_asgi(CallbackReceiver(), "POST", odd)[0] == 200
+
+
+def test_failing_listener_is_logged_and_the_callback_acknowledged(caplog):
+    receiver = CallbackReceiver()
+    events = []
+
+    def broken(event):
+        raise RuntimeError("listener bug")
+
+    receiver.add_listener(broken)
+    receiver.add_listener(events.append)
+    receiver.expect("tx-1")
+
+    with caplog.at_level("ERROR", logger="momo_api.support.callbacks"):
+        status, _ = _call_asgi(receiver, "POST", json.dumps(AIRTEL_CALLBACK).encode())
+
+    assert status == 200
+    assert events[0].reference_id == "tx-1"
+    assert receiver.pending == 0
+    assert "listener bug" in caplog.text
@@ -0,0 +1,146 @@
+import asyncio
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from momo_api import AirtelApi, AirtelConfig, CircuitBreaker, MomoApi
+from momo_api.airtel.api import STAGING_URL
+from momo_api.exceptions import CircuitOpenException, InternalServerErrorException
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+BALANCE_URL = f"{SANDBOX_BASE}/collection/v1_0/account/balance"
+
+
+def _ok() -> httpx.Response:
+    return httpx.Response(200)
+
+
+def _server_error() -> httpx.Response:
+    return httpx.Response(503)
+
+
+def _timeout() -> httpx.Response:
+    raise httpx.ReadTimeout("timed out")
+
+
+def test_opens_after_consecutive_failures(fake_clock):
+    breaker = CircuitBreaker(failure_threshold=3, clock=fake_clock(10.0))
+
+    breaker.call("api", _server_error)
+    breaker.call("api", _server_error)
+    breaker.call("api", _ok)
+    breaker.call("api", _server_error)
+    with pytest.raises(httpx.ReadTimeout):
+        breaker.call("api", _timeout)
+    assert breaker.state("api") == "closed"
+    breaker.call("api", _server_error)
+
+    assert breaker.state("api") == "open"
+    with pytest.raises(CircuitOpenException) as info:
+        breaker.call("api", _ok)
+    assert info.value.key == "api"
+    assert info.value.retry_after == 30.0
+    assert breaker.state("other") == "closed"
+
+
+def test_half_open_probe_closes_or_reopens(fake_clock):
+    clock = fake_clock(10.0)
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=5, clock=clock)
+    breaker.call("api", _server_error)
+
+    clock.now += 5
+    assert breaker.state("api") == "half_open"
+    breaker.call("api", _server_error)
+    assert breaker.state("api") == "open"
+
+    clock.now += 5
+    breaker.call("api", _ok)
+    assert breaker.state("api") == "closed"
+
+
+def test_half_open_admits_limited_probes(fake_clock):
+    clock = fake_clock(10.0)
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=5, half_open_probes=1, clock=clock)
+    breaker.call("api", _server_error)
+    clock.now += 5
+
+    def nested() -> httpx.Response:
+        # A second request while the probe is still in flight fails fast.
+        with pytest.raises(CircuitOpenException):
+            breaker.call("api", _ok)
+        return httpx.Response(200)
+
+    breaker.call("api", nested)
+    assert breaker.state("api") == "closed"
+
+
+def test_snapshot_reports_every_circuit(fake_clock):
+    breaker = CircuitBreaker(failure_threshold=1, clock=fake_clock(10.0))
+    breaker.call("a", _ok)
+    breaker.call("b", _server_error)
+    with pytest.raises(CircuitOpenException):
+        breaker.call("b", _ok)
+
+    snapshot = breaker.snapshot()
+
+    assert snapshot["a"].state == "closed"
+    assert snapshot["b"].state == "open"
+    assert snapshot["b"].total_failures == 1
+    assert snapshot["b"].total_rejected == 1
+    breaker.reset("b")
+    assert breaker.state("b") == "closed"
+
+
+def test_async_call(fake_clock):
+    breaker = CircuitBreaker(failure_threshold=1, clock=fake_clock(10.0))
+
+    async def fail() -> httpx.Response:
+        raise httpx.ConnectError("refused")
+
+    async def main():
+        with pytest.raises(httpx.ConnectError):
+            await breaker.acall("api", fail)
+        with pytest.raises(CircuitOpenException):
+            await breaker.acall("api", fail)
+
+    asyncio.run(main())
+
+
+def test_product_fails_fast_once_open(collection_config, token_response, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_response(method="GET", url=BALANCE_URL, status_code=500, is_reusable=True)
+    breaker = CircuitBreaker(failure_threshold=2)
+    collection = MomoApi.collection(collection_config, circuit_breaker=breaker)
+
+    for _ in range(2):
+        with pytest.raises(InternalServerErrorException):
+            collection.get_balance()
+    with pytest.raises(CircuitOpenException):
+        collection.get_balance()
+
+    assert len(httpx_mock.get_requests(url=BALANCE_URL)) == 2
+    assert breaker.state(f"{SANDBOX_BASE}/collection") == "open"
+
+
+def test_airtel_circuits_are_per_api_product(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        method="POST", url=f"{STAGING_URL}/auth/oauth2/token", json={"access_token": "t", "expires_in": 3600}
+    )
+    httpx_mock.add_exception(httpx.ConnectTimeout("timed out"), url=f"{STAGING_URL}/merchant/v1/payments/")
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{STAGING_URL}/standard/v1/users/balance",
+        json={"data": {"balance": "10", "currency": "XAF"}},
+    )
+    breaker = CircuitBreaker(failure_threshold=1)
+    config = AirtelConfig.collection("client-id", "client-secret")
+    collection = AirtelApi.collection(AirtelApi.ENVIRONMENT_STAGING, config, circuit_breaker=breaker)
+
+    with pytest.raises(httpx.ConnectTimeout):
+        collection.request_to_pay("100", "242060000000", "order-1")
+    collection.get_balance()
+
+    assert breaker.state(f"{STAGING_URL}/merchant") == "open"
+    assert breaker.state(f"{STAGING_URL}/standard") == "closed"
+    assert breaker.state(f"{STAGING_URL}/auth") == "closed"
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from momo_api import MomoApi, PaymentRequest, get_codec
+from momo_api.support import codec as codec_module
+from momo_api.support.callbacks import CallbackReceiver
+from momo_api.support.codec import available_codecs, default_codec
+from tests.conftest import load_fixture
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+REQUEST_TO_PAY_URL = f"{SANDBOX_BASE}/collection/v1_0/requesttopay"
+
+CODECS = sorted(available_codecs())
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_round_trip_through_bytes(name):
+    codec = get_codec(name)
+    payload = {"amount": "100", "payer": {"partyId": "242060000000"}, "note": "café", "n": 1.5}
+
+    encoded = codec.dumps(payload)
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded) == payload
+    assert codec.loads(encoded) == payload
+    with pytest.raises(ValueError):
+        codec.loads(b"{not json")
+
+
+def test_fastest_installed_codec_is_the_default(monkeypatch):
+    monkeypatch.delenv("MOMO_JSON_CODEC", raising=False)
+    monkeypatch.setattr(codec_module, "_default", None)
+    assert default_codec().name == next(iter(available_codecs()))
+
+    monkeypatch.setattr(codec_module, "_default", None)
+    monkeypatch.setenv("MOMO_JSON_CODEC", "stdlib")
+    assert default_codec().name == "stdlib"
+    with pytest.raises(ValueError):
+        get_codec("yaml")
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_products_send_and_parse_with_any_codec(
+    name, collection_config, token_response, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_response(method="POST", url=REQUEST_TO_PAY_URL, status_code=202)
+    httpx_mock.add_response(
+        method="GET", url=f"{REQUEST_TO_PAY_URL}/ref-1", json=load_fixture("payment_status_successful.json")
+    )
+    collection = MomoApi.collection(collection_config, codec=get_codec(name))
+    payment = PaymentRequest.make(amount="100", payer="242060000000", external_id="order-1")
+
+    collection.request_to_pay(payment, reference_id="ref-1")
+    transaction = collection.get_payment_status("ref-1")
+
+    sent = httpx_mock.get_requests(url=REQUEST_TO_PAY_URL)[0]
+    assert json.loads(sent.content) == payment.to_dict()
+    assert sent.headers["Content-Type"] == "application/json"
+    assert transaction.is_successful()
+
+
+def test_callback_receiver_rejects_invalid_bodies_with_every_codec():
+    for name in CODECS:
+        receiver = CallbackReceiver(codec=get_codec(name))
+        with pytest.raises(ValueError):
+            receiver.handle(b"<xml/>")
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import time
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from momo_api import CallbackReceiver, MomoApi, PaymentRequest, PaymentTracker
+from momo_api.exceptions import PaymentTimeoutException
+from momo_api.models.transaction import Transaction
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+
+
+def _transaction(status: str) -> Transaction:
+    return Transaction(amount="100", status=status, currency="XAF", external_id="order-1")
+
+
+def _tracker(fetch, **options) -> PaymentTracker:
+    options.setdefault("initial_delay", 0.01)
+    options.setdefault("max_delay", 0.02)
+    options.setdefault("tick", 0.005)
+    return PaymentTracker(fetch, **options)
+
+
+def test_handle_resolves_from_polling():
+    statuses = iter(["PENDING", "PENDING", "SUCCESSFUL"])
+
+    with _tracker(lambda reference_id: _transaction(next(statuses))) as tracker:
+        handle = tracker.track("ref-1")
+        transaction = handle.result(timeout=5)
+
+    assert transaction.is_successful()
+    assert handle.done()
+    assert tracker.pending == 0
+
+
+def test_callback_resolves_before_polling():
+    receiver = CallbackReceiver()
+    calls = []
+
+    def fetch(reference_id):
+        calls.append(reference_id)
+        return _transaction("PENDING")
+
+    tracker = _tracker(fetch, receiver=receiver, initial_delay=60)
+    handle = tracker.track("ref-1", external_id="order-1")
+
+    receiver.handle(json.dumps({"externalId": "order-1", "status": "FAILED"}).encode())
+
+    assert handle.result(timeout=0).is_failed()
+    assert calls == []
+    assert tracker.pending == 0
+    assert receiver.pending == 0
+
+
+def test_mtn_callback_resolves_a_submitted_payment(
+    collection_config, token_response, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/v1_0/requesttopay", status_code=202)
+    collection = MomoApi.collection(collection_config)
+    receiver = CallbackReceiver()
+    tracker = _tracker(lambda reference_id: _transaction("PENDING"), receiver=receiver, initial_delay=60)
+
+    handle = tracker.submit(collection.request_to_pay, PaymentRequest.make("100", "46733123450", "order-7"))
+    # MTN callbacks carry the externalId only.
+    receiver.handle(json.dumps({"externalId": "order-7", "amount": "100", "status": "SUCCESSFUL"}).encode())
+
+    assert handle.result(timeout=0).is_successful()
+    assert tracker.pending == 0
+
+
+def test_on_result_is_not_a_poller_option():
+    with pytest.raises(TypeError, match="on_result"):
+        PaymentTracker(lambda reference_id: None, on_result=print)
+
+
+def test_resolving_a_handle_sweeps_expired_ones(fake_clock):
+    clock = fake_clock(1000.0)
+    receiver = CallbackReceiver()
+    tracker = PaymentTracker(lambda reference_id: None, receiver=receiver, ttl=10, clock=clock)
+    stale = tracker.track("ref-1")
+    live = tracker.track("tx-2")
+
+    clock.now += 20
+    receiver.handle(json.dumps({"transaction": {"id": "tx-2", "status_code": "TS"}}).encode())
+
+    assert live.result(timeout=0).is_successful()
+    assert isinstance(stale.future.exception(timeout=0), PaymentTimeoutException)
+    assert tracker.pending == 0
+
+
+def test_handle_fails_at_its_deadline():
+    with _tracker(lambda reference_id: _transaction("PENDING"), deadline=0.05) as tracker:
+        handle = tracker.track("ref-1")
+        with pytest.raises(PaymentTimeoutException) as info:
+            handle.result(timeout=5)
+
+    assert info.value.reference_id == "ref-1"
+    assert info.value.transaction.is_pending()
+
+
+def test_registry_evicts_expired_and_excess_handles(fake_clock):
+    clock = fake_clock(1000.0)
+    tracker = PaymentTracker(lambda reference_id: None, ttl=10, max_handles=2, clock=clock)
+    first = tracker.track("ref-1")
+    second = tracker.track("ref-2")
+
+    assert tracker.track("ref-1") is first
+    third = tracker.track("ref-3")
+    assert isinstance(first.future.exception(timeout=0), PaymentTimeoutException)
+    assert not second.done()
+
+    clock.now += 10
+    tracker.track("ref-4")
+    assert second.done() and third.done()
+    assert tracker.pending == 1
+
+
+def test_handle_is_awaitable():
+    statuses = iter(["PENDING", "SUCCESSFUL"])
+
+    async def initiate():
+        return "ref-1"
+
+    async def main(tracker):
+        handle = await tracker.asubmit(initiate)
+        return await asyncio.wait_for(handle, timeout=5)
+
+    started = time.monotonic()
+    with _tracker(lambda reference_id: _transaction(next(statuses))) as tracker:
+        transaction = asyncio.run(main(tracker))
+
+    assert transaction.is_successful()
+    assert time.monotonic() - started < 5
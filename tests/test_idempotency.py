@@ -0,0 +1,121 @@
+import asyncio
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from momo_api import AirtelApi, AirtelConfig, Idempotency, MomoApi, PaymentRequest, TransferRequest
+from momo_api.airtel.api import STAGING_URL
+from momo_api.exceptions import BadRequestException, IdempotencyConflictException
+from momo_api.support.idempotency import (
+    STATE_SENT,
+    IdempotencyRecord,
+    MemoryIdempotencyStore,
+    SqliteIdempotencyStore,
+)
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+REQUEST_TO_PAY_URL = f"{SANDBOX_BASE}/collection/v1_0/requesttopay"
+TRANSFER_URL = f"{SANDBOX_BASE}/disbursement/v1_0/transfer"
+
+
+def _payment(amount: str = "100") -> PaymentRequest:
+    return PaymentRequest.make(amount=amount, payer="242060000000", external_id="order-1")
+
+
+@pytest.fixture
+def collection(collection_config, token_response, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    return MomoApi.collection(collection_config, idempotency=Idempotency(store=MemoryIdempotencyStore()))
+
+
+def test_repeat_call_returns_existing_reference(collection, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url=REQUEST_TO_PAY_URL, status_code=202)
+
+    first = collection.request_to_pay(_payment())
+    second = collection.request_to_pay(_payment())
+
+    assert first == second
+    assert len(httpx_mock.get_requests(url=REQUEST_TO_PAY_URL)) == 1
+
+
+def test_key_reused_for_a_different_request(collection, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url=REQUEST_TO_PAY_URL, status_code=202)
+    reference_id = collection.request_to_pay(_payment())
+
+    with pytest.raises(IdempotencyConflictException) as info:
+        collection.request_to_pay(_payment(amount="200"))
+    assert info.value.reference_id == reference_id
+
+
+def test_unknown_outcome_is_resent_under_same_reference(collection, httpx_mock: HTTPXMock):
+    httpx_mock.add_exception(httpx.ReadTimeout("timed out"), url=REQUEST_TO_PAY_URL)
+    httpx_mock.add_response(method="POST", url=REQUEST_TO_PAY_URL, status_code=409)
+
+    with pytest.raises(httpx.ReadTimeout):
+        collection.request_to_pay(_payment())
+    reference_id = collection.request_to_pay(_payment())
+
+    sent = [r.headers["X-Reference-Id"] for r in httpx_mock.get_requests(url=REQUEST_TO_PAY_URL)]
+    assert sent == [reference_id, reference_id]
+
+
+def test_rejected_request_releases_the_key(collection, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url=REQUEST_TO_PAY_URL, status_code=400, json={"message": "bad"})
+    httpx_mock.add_response(method="POST", url=REQUEST_TO_PAY_URL, status_code=202)
+
+    with pytest.raises(BadRequestException):
+        collection.request_to_pay(_payment())
+    collection.request_to_pay(_payment(amount="150"))
+
+    first, second = httpx_mock.get_requests(url=REQUEST_TO_PAY_URL)
+    assert first.headers["X-Reference-Id"] != second.headers["X-Reference-Id"]
+
+
+def test_sqlite_store_is_shared_across_instances(tmp_path):
+    path = str(tmp_path / "idempotency.sqlite3")
+    store = SqliteIdempotencyStore(path)
+    record, created = store.reserve("key", IdempotencyRecord("ref-1", "abc"))
+    assert created
+    store.mark_sent("key")
+
+    other = SqliteIdempotencyStore(path)
+    record, created = other.reserve("key", IdempotencyRecord("ref-2", "abc"))
+    assert not created
+    assert (record.reference_id, record.state) == ("ref-1", STATE_SENT)
+    assert len(other) == 1
+
+
+def test_async_disbursement_transfer(
+    disbursement_config, token_response, httpx_mock: HTTPXMock, tmp_path
+):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/disbursement/token/", json=token_response)
+    httpx_mock.add_response(method="POST", url=TRANSFER_URL, status_code=202)
+    idempotency = Idempotency(str(tmp_path / "idempotency.sqlite3"))
+    transfer = TransferRequest.make(amount="100", payee="242060000000", external_id="payout-1")
+
+    async def main():
+        async with MomoApi.async_disbursement(disbursement_config, idempotency=idempotency) as api:
+            return [await api.transfer(transfer) for _ in range(2)]
+
+    first, second = asyncio.run(main())
+    assert first == second
+    assert len(httpx_mock.get_requests(url=TRANSFER_URL)) == 1
+
+
+def test_airtel_reference_is_the_key(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        method="POST", url=f"{STAGING_URL}/auth/oauth2/token", json={"access_token": "t", "expires_in": 3600}
+    )
+    url = f"{STAGING_URL}/merchant/v1/payments/"
+    httpx_mock.add_response(method="POST", url=url, json={"status": {"success": True}})
+    config = AirtelConfig.collection("client-id", "client-secret")
+    collection = AirtelApi.collection(
+        AirtelApi.ENVIRONMENT_STAGING, config, idempotency=Idempotency(store=MemoryIdempotencyStore())
+    )
+
+    first = collection.request_to_pay("100", "242060000000", "invoice-7")
+    second = collection.request_to_pay("100", "242060000000", "invoice-7")
+
+    assert first == second
+    assert len(httpx_mock.get_requests(url=url)) == 1
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from momo_api import AirtelApi, AirtelConfig, MomoApi, RetryPolicy
+from momo_api.airtel.api import STAGING_URL
+from momo_api.models.config import Config
+from momo_api.products.collection import CollectionApi
+from momo_api.support import pipeline as pipeline_module
+from momo_api.support import retry as retry_module
+from momo_api.support.transport import AsyncHttpTransport, HttpTransport
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+BALANCE_URL = f"{SANDBOX_BASE}/collection/v1_0/account/balance"
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.events = []
+
+    def on_request(self, event) -> None:
+        self.events.append(event)
+
+
+def test_no_trace_without_observers():
+    transport = HttpTransport()
+    assert transport.trace("mtn", "collection", "status", "GET", "https://x") is None
+
+    recorder = Recorder()
+    transport.add_observer(recorder)
+    assert transport.trace("mtn", "collection", "status", "GET", "https://x") is not None
+    transport.remove_observer(recorder)
+    assert transport.observers == ()
+
+
+def test_events_carry_labels_retries_and_token_wait(
+    collection_config, token_response, httpx_mock: HTTPXMock, monkeypatch
+):
+    monkeypatch.setattr(retry_module.time, "sleep", lambda delay: None)
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_response(method="GET", url=BALANCE_URL, status_code=503)
+    httpx_mock.add_response(method="GET", url=BALANCE_URL, json={"availableBalance": "1", "currency": "XAF"})
+    recorder = Recorder()
+    with HttpTransport() as transport:
+        transport.add_observer(recorder)
+        collection = MomoApi.collection(collection_config, transport=transport, retry=RetryPolicy())
+        collection.get_balance()
+
+    token, balance = recorder.events
+    assert (token.provider, token.product, token.endpoint, token.method) == (
+        "mtn", "collection", "token", "POST"
+    )
+    assert token.attempts == 1 and token.token_wait is None
+    assert (balance.endpoint, balance.status_code, balance.retries) == ("balance", 200, 1)
+    assert balance.token_wait is not None and balance.token_wait >= token.total
+    assert balance.total > 0
+
+
+def test_unobserved_clients_do_not_time_the_token_wait(
+    collection_config, token_response, httpx_mock: HTTPXMock, monkeypatch
+):
+    class NoClock:
+        def perf_counter(self):
+            raise AssertionError("clock read without observers")
+
+    monkeypatch.setattr(pipeline_module, "time", NoClock())
+    httpx_mock.add_response(
+        method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response, is_reusable=True
+    )
+    httpx_mock.add_response(
+        method="GET", url=BALANCE_URL, json={"availableBalance": "1", "currency": "XAF"}, is_reusable=True
+    )
+
+    MomoApi.collection(collection_config).get_balance()
+
+    async def main():
+        async with MomoApi.async_collection(collection_config) as collection:
+            await collection.get_balance()
+
+    asyncio.run(main())
+
+
+def test_failed_calls_and_faulty_observers(httpx_mock: HTTPXMock, caplog):
+    httpx_mock.add_exception(httpx.ConnectError("refused"), url=f"{STAGING_URL}/auth/oauth2/token")
+
+    class Broken:
+        def on_request_start(self, event):
+            raise RuntimeError("observer bug")
+
+        def on_request(self, event):
+            raise RuntimeError("observer bug")
+
+    recorder = Recorder()
+
+    async def main():
+        transport = AsyncHttpTransport()
+        transport.add_observer(Broken())
+        transport.add_observer(recorder)
+        config = AirtelConfig.collection("client-id", "client-secret")
+        api = AirtelApi.async_collection(AirtelApi.ENVIRONMENT_STAGING, config, transport)
+        with pytest.raises(httpx.ConnectError):
+            await api.get_balance()
+        await transport.aclose()
+
+    asyncio.run(main())
+
+    (event,) = recorder.events
+    assert (event.provider, event.endpoint, event.status_code) == ("airtel", "token", None)
+    assert isinstance(event.error, httpx.ConnectError)
+    failures = [r for r in caplog.records if r.name == "momo_api.support.instrumentation"]
+    assert len(failures) == 2
+    assert all(r.exc_info[0] is RuntimeError for r in failures)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"availableBalance": "5", "currency": "XAF"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_connection_phases_against_a_real_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    recorder = Recorder()
+    config = Config(subscription_key="key", api_user="user", api_key="secret")
+    try:
+        with HttpTransport() as transport:
+            transport.add_observer(recorder)
+            api = CollectionApi(config, f"http://127.0.0.1:{server.server_port}", "sandbox", transport)
+            api._token_cache.set("token", 3600)
+            api.get_balance()
+            api.get_balance()
+    finally:
+        server.shutdown()
+
+    first, second = recorder.events
+    assert first.connect is not None and first.ttfb is not None
+    assert first.tls is None
+    assert second.connect is None and second.ttfb is not None
@@ -0,0 +1,159 @@
+import asyncio
+import threading
+
+import httpx
+
+from pytest_httpx import HTTPXMock
+
+from momo_api import (
+    AirtelApi,
+    AirtelConfig,
+    MetricsCollector,
+    MomoApi,
+    PaymentRequest,
+    render_prometheus,
+)
+from momo_api.airtel.api import STAGING_URL
+from momo_api.exceptions import BadRequestException
+from momo_api.support.instrumentation import RequestEvent
+from momo_api.support.metrics import STRIPES, LatencyHistogram, operation_name
+from momo_api.support.token_cache import TokenCache
+from momo_api.support.transport import AsyncHttpTransport, HttpTransport
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+REQUEST_TO_PAY_URL = f"{SANDBOX_BASE}/collection/v1_0/requesttopay"
+
+
+def test_histogram_quantiles_stay_within_a_bucket():
+    histogram = LatencyHistogram()
+    for ms in range(1, 1001):
+        histogram.observe(ms / 1000)
+
+    snapshot = histogram.snapshot()
+    assert snapshot.count == 1000
+    assert abs(snapshot.sum - 500.5) < 1e-6
+    for q, exact in ((0.5, 0.5), (0.95, 0.95), (0.99, 0.99)):
+        assert abs(snapshot.quantile(q) - exact) / exact < 0.26
+    assert len(snapshot.counts) == len(histogram.bounds) + 1
+
+
+def test_histogram_merges_threads_and_clamps_outliers():
+    histogram = LatencyHistogram(low=0.01, high=1.0)
+
+    def record():
+        for _ in range(1000):
+            histogram.observe(0.1)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    histogram.observe(0.0)
+    histogram.observe(500.0)
+
+    snapshot = histogram.snapshot()
+    assert snapshot.count == 4002
+    assert snapshot.counts[0] == 1 and snapshot.counts[-1] == 1
+    assert snapshot.quantile(1.0) == 1.0
+
+
+def test_short_lived_threads_do_not_grow_the_shards():
+    histogram = LatencyHistogram()
+    collector = MetricsCollector()
+    event = RequestEvent(
+        "mtn", "collection", "status", "GET", f"{REQUEST_TO_PAY_URL}/ref-1", status_code=200, total=0.05
+    )
+
+    def record():
+        histogram.observe(0.05)
+        collector.on_request_start(event)
+        collector.on_request(event)
+
+    for _ in range(20):
+        threads = [threading.Thread(target=record) for _ in range(100)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert histogram.snapshot().count == 2000
+    assert len(histogram._shards) == STRIPES
+    assert len(collector._in_flight._shards) == STRIPES
+    assert collector.latency()[("mtn", "collection", "requesttopay", "status")].count == 2000
+
+
+def test_operation_names():
+    assert operation_name(f"{REQUEST_TO_PAY_URL}/abc") == "requesttopay"
+    assert operation_name(f"{SANDBOX_BASE}/disbursement/v2_0/deposit") == "deposit"
+    assert operation_name(f"{SANDBOX_BASE}/collection/token/") == "token"
+    assert operation_name(f"{STAGING_URL}/merchant/v1/payments/") == "payments"
+    assert operation_name("https://example.com/unknown/42") == "other"
+
+
+def test_collector_counts_latency_errors_and_token_hits(
+    collection_config, token_response, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_response(method="POST", url=REQUEST_TO_PAY_URL, status_code=202)
+    httpx_mock.add_response(method="POST", url=REQUEST_TO_PAY_URL, status_code=400, json={"message": "bad"})
+    token_cache = TokenCache()
+    metrics = MetricsCollector(token_caches=[token_cache])
+    payment = PaymentRequest.make(amount="100", payer="242060000000", external_id="order-1")
+
+    with HttpTransport() as transport:
+        transport.add_observer(metrics)
+        collection = MomoApi.collection(collection_config, transport=transport, token_cache=token_cache)
+        collection.request_to_pay(payment)
+        try:
+            collection.request_to_pay(payment)
+        except BadRequestException:
+            pass
+
+    latency = metrics.latency()
+    assert latency[("mtn", "collection", "requesttopay", "initiate")].count == 2
+    assert latency[("mtn", "collection", "token", "token")].count == 1
+    assert metrics.errors() == {("mtn", "collection", "requesttopay", "BadRequestException"): 1}
+    assert set(metrics.in_flight().values()) == {0}
+    assert (token_cache.hits, token_cache.misses) == (1, 1)
+
+    text = render_prometheus(metrics)
+    assert "# TYPE momo_request_duration_seconds summary" in text
+    assert (
+        'momo_request_duration_seconds_count{provider="mtn",product="collection",'
+        'operation="requesttopay",endpoint="initiate"} 2'
+    ) in text
+    assert 'error="BadRequestException"} 1' in text
+    assert 'momo_token_cache_hit_ratio{cache="default"} 0.5' in text
+
+    histogram = render_prometheus(metrics, buckets=True)
+    assert 'endpoint="initiate",le="+Inf"} 2' in histogram
+
+
+def test_in_flight_gauge_during_async_calls(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        method="POST", url=f"{STAGING_URL}/auth/oauth2/token", json={"access_token": "t", "expires_in": 3600}
+    )
+    url = f"{STAGING_URL}/merchant/v1/payments/"
+    metrics = MetricsCollector()
+    seen = []
+
+    async def respond(request):
+        seen.append(metrics.in_flight()[("airtel", "collection", "payments")])
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"status": {"success": True}})
+
+    httpx_mock.add_callback(respond, method="POST", url=url, is_reusable=True)
+
+    async def main():
+        async with AsyncHttpTransport() as transport:
+            transport.add_observer(metrics)
+            config = AirtelConfig.collection("client-id", "client-secret")
+            api = AirtelApi.async_collection(AirtelApi.ENVIRONMENT_STAGING, config, transport)
+            await asyncio.gather(
+                *(api.request_to_pay("100", "242060000000", f"ref-{i}") for i in range(3))
+            )
+
+    asyncio.run(main())
+    assert max(seen) == 3
+    assert metrics.in_flight()[("airtel", "collection", "payments")] == 0
@@ -0,0 +1,129 @@
+import dataclasses
+import json
+import pickle
+import tracemalloc
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from momo_api import AccountBalance, ApiToken, MomoApi, Transaction
+from momo_api.airtel.transaction import AirtelTransaction
+from momo_api.support.codec import get_codec
+from tests.conftest import load_fixture
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+
+
+def _body(name: str = "payment_status_successful.json") -> bytes:
+    return json.dumps(load_fixture(name)).encode()
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        Transaction("100", "SUCCESSFUL", "EUR"),
+        AirtelTransaction("tx-1", "TS"),
+        AccountBalance("1000", "EUR"),
+        ApiToken("token", "access_token", 3600),
+    ],
+)
+def test_models_have_slots_and_no_instance_dict(model):
+    assert not hasattr(model, "__dict__")
+    with pytest.raises(AttributeError):
+        model.not_a_field = 1
+    assert pickle.loads(pickle.dumps(model)) == model
+
+
+def test_lazy_transaction_matches_the_eager_one():
+    data = load_fixture("payment_status_successful.json")
+    eager = Transaction.parse(data)
+    lazy = Transaction.lazy(_body(), get_codec("stdlib"))
+
+    assert lazy.is_successful()
+    assert lazy == eager
+    assert repr(lazy) == repr(eager)
+    assert lazy._raw == data
+    assert lazy.payer == {"partyIdType": "MSISDN", "partyId": "46733123450"}
+    assert dataclasses.asdict(lazy) == dataclasses.asdict(eager)
+    with pytest.raises(AttributeError):
+        lazy.not_a_field
+
+
+def test_lazy_transaction_decodes_once_and_keeps_assigned_fields():
+    calls = []
+    stdlib = get_codec("stdlib")
+
+    class CountingCodec:
+        name = "counting"
+        dumps = staticmethod(stdlib.dumps)
+
+        def loads(self, data):
+            calls.append(data)
+            return stdlib.loads(data)
+
+    lazy = Transaction.lazy(_body("payment_status_pending.json"), CountingCodec())
+    assert calls == []
+    lazy.status = Transaction.STATUS_FAILED
+    assert lazy.is_failed()
+    assert calls == []
+
+    assert lazy.currency and lazy.amount and lazy.external_id is not None
+    assert len(calls) == 1
+    assert lazy.status == Transaction.STATUS_FAILED
+
+
+def test_slotted_and_lazy_transactions_use_less_memory():
+    data = load_fixture("payment_status_successful.json")
+    body = _body()
+    codec = get_codec("stdlib")
+
+    def measure(build):
+        tracemalloc.start()
+        try:
+            kept = [build(i) for i in range(2000)]
+            size, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert len(kept) == 2000
+        return size / 2000
+
+    @dataclasses.dataclass
+    class PlainTransaction:
+        amount: str
+        status: str
+        currency: str
+        financial_transaction_id: str = ""
+        external_id: str = ""
+        payer_message: str = ""
+        payee_note: str = ""
+        payer: dict = None
+        payee: dict = None
+        _raw: dict = dataclasses.field(default_factory=dict)
+
+    plain = measure(lambda i: PlainTransaction(
+        "100", "SUCCESSFUL", "EUR", _raw=codec.loads(body)
+    ))
+    slotted = measure(lambda i: Transaction.parse(codec.loads(body)))
+    lazy = measure(lambda i: Transaction.lazy(bytes(bytearray(body)), codec))
+
+    assert slotted < plain
+    assert lazy < slotted / 2
+    assert Transaction.parse(data) == Transaction.lazy(body, codec)
+
+
+def test_collection_returns_lazy_transactions(
+    collection_config, token_response, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{SANDBOX_BASE}/collection/v1_0/requesttopay/ref-1",
+        json=load_fixture("payment_status_failed.json"),
+    )
+    collection = MomoApi.collection(collection_config, lazy_transactions=True)
+
+    transaction = collection.get_payment_status("ref-1")
+
+    assert isinstance(transaction, Transaction)
+    assert transaction.is_failed()
+    assert transaction == Transaction.parse(load_fixture("payment_status_failed.json"))
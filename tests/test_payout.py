@@ -0,0 +1,322 @@
+import json
+import threading
+import time
+
+import httpx
+from pytest_httpx import HTTPXMock
+
+from momo_api import Idempotency, MomoApi, TransferRequest
+from momo_api.bulk import payout as payout_module
+from momo_api.bulk import PayoutCheckpoint, PayoutEngine, PayoutResult, read_csv, read_jsonl
+from momo_api.exceptions import (
+    BadRequestException,
+    ConflictException,
+    InternalServerErrorException,
+    TooManyRequestsException,
+)
+from momo_api.support.idempotency import MemoryIdempotencyStore
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+
+
+def _write_csv(path, count):
+    lines = ["external_id,phone,amount,currency"]
+    lines += [f"pay-{i},4673312{i:04d},{100 + i},XAF" for i in range(count)]
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+class Recorder:
+    """A ``send`` callable recording calls and failing on demand."""
+
+    def __init__(self, errors=None):
+        self.calls = []
+        self.errors = errors or {}
+        self._lock = threading.Lock()
+
+    def __call__(self, row, reference_id):
+        with self._lock:
+            self.calls.append((row.external_id, reference_id))
+        error = self.errors.get(row.external_id)
+        if error is not None:
+            raise error
+        return reference_id
+
+
+def test_read_csv_tracks_offsets(tmp_path):
+    path = _write_csv(tmp_path / "payouts.csv", 3)
+
+    rows = list(read_csv(path))
+
+    assert [r.external_id for r in rows] == ["pay-0", "pay-1", "pay-2"]
+    assert rows[1].amount == "101"
+    assert rows[0].end_offset == rows[1].offset
+    assert [r.external_id for r in read_csv(path, rows[1].offset)] == ["pay-1", "pay-2"]
+
+
+def test_read_jsonl(tmp_path):
+    path = tmp_path / "payouts.jsonl"
+    path.write_text(
+        json.dumps({"external_id": "a", "phone": "1", "amount": 5})
+        + "\n\n"
+        + json.dumps({"external_id": "b", "phone": "2", "amount": "7", "currency": "EUR"})
+        + "\n"
+    )
+
+    rows = list(read_jsonl(str(path)))
+
+    assert [(r.external_id, r.amount, r.currency) for r in rows] == [("a", "5", "XAF"), ("b", "7", "EUR")]
+
+
+def test_run_sends_every_row_and_advances_watermark(tmp_path):
+    path = _write_csv(tmp_path / "payouts.csv", 20)
+    send = Recorder()
+
+    with PayoutEngine(send, str(tmp_path / "journal"), concurrency=4) as engine:
+        results = list(engine.run_csv(path))
+
+    assert len(results) == 20
+    assert all(r.status == PayoutResult.STATUS_SENT for r in results)
+    assert len({ref for _, ref in send.calls}) == 20
+    assert PayoutCheckpoint(str(tmp_path / "journal")).watermark == (tmp_path / "payouts.csv").stat().st_size
+
+
+def test_rerun_after_completion_reads_nothing(tmp_path):
+    path = _write_csv(tmp_path / "payouts.csv", 5)
+    journal = str(tmp_path / "journal")
+    with PayoutEngine(Recorder(), journal) as engine:
+        list(engine.run_csv(path))
+
+    send = Recorder()
+    with PayoutEngine(send, journal) as engine:
+        assert list(engine.run_csv(path)) == []
+    assert send.calls == []
+
+
+def test_resume_resends_unknown_rows_with_the_same_reference(tmp_path):
+    path = _write_csv(tmp_path / "payouts.csv", 10)
+    journal = str(tmp_path / "journal")
+    first = Recorder(errors={"pay-4": InternalServerErrorException("boom", status_code=500)})
+    with PayoutEngine(first, journal, concurrency=1) as engine:
+        results = {r.row.external_id: r for r in engine.run_csv(path)}
+    assert results["pay-4"].status == PayoutResult.STATUS_UNKNOWN
+    original_reference = results["pay-4"].reference_id
+
+    # The first attempt actually went through: the provider reports a duplicate.
+    second = Recorder(errors={"pay-4": ConflictException("duplicate", status_code=409)})
+    with PayoutEngine(second, journal, concurrency=1) as engine:
+        resumed = {r.row.external_id: r for r in engine.run_csv(path)}
+
+    # Reading restarts at the first unsettled row; rows after it are not paid twice.
+    assert second.calls == [("pay-4", original_reference)]
+    assert resumed["pay-4"].status == PayoutResult.STATUS_SENT
+    assert all(resumed[f"pay-{i}"].status == PayoutResult.STATUS_SKIPPED for i in range(5, 10))
+    assert "pay-3" not in resumed
+
+
+def test_resume_after_crash_between_assign_and_send(tmp_path):
+    path = _write_csv(tmp_path / "payouts.csv", 3)
+    journal = str(tmp_path / "journal")
+    rows = list(read_csv(path))
+    checkpoint = PayoutCheckpoint(journal)
+    checkpoint.record(rows[0], "ref-0", PayoutCheckpoint.STATE_ASSIGNED)
+    checkpoint.close()
+
+    send = Recorder()
+    with PayoutEngine(send, journal) as engine:
+        list(engine.run_csv(path))
+
+    assert ("pay-0", "ref-0") in send.calls
+    assert len(send.calls) == 3
+
+
+def test_definite_rejection_is_recorded_as_failed(tmp_path):
+    path = _write_csv(tmp_path / "payouts.csv", 3)
+    send = Recorder(errors={"pay-1": BadRequestException("bad", status_code=400)})
+
+    with PayoutEngine(send, str(tmp_path / "journal")) as engine:
+        results = {r.row.external_id: r for r in engine.run_csv(path)}
+        watermark = engine.checkpoint.watermark
+
+    assert results["pay-1"].status == PayoutResult.STATUS_FAILED
+    assert isinstance(results["pay-1"].error, BadRequestException)
+    assert watermark == (tmp_path / "payouts.csv").stat().st_size
+
+
+def test_throttled_and_conflicting_rows_are_resent_on_resume(tmp_path):
+    path = _write_csv(tmp_path / "payouts.csv", 4)
+    journal = str(tmp_path / "journal")
+    first = Recorder(errors={
+        "pay-1": TooManyRequestsException("slow down", status_code=429),
+        "pay-2": ConflictException("duplicate", status_code=409),
+    })
+    with PayoutEngine(first, journal, concurrency=1) as engine:
+        results = {r.row.external_id: r for r in engine.run_csv(path)}
+        watermark = engine.checkpoint.watermark
+
+    assert results["pay-1"].status == PayoutResult.STATUS_UNKNOWN
+    assert results["pay-2"].status == PayoutResult.STATUS_UNKNOWN
+    assert watermark == results["pay-0"].row.end_offset
+
+    second = Recorder()
+    with PayoutEngine(second, journal, concurrency=1) as engine:
+        resumed = {r.row.external_id: r for r in engine.run_csv(path)}
+
+    assert second.calls == [("pay-1", results["pay-1"].reference_id), ("pay-2", results["pay-2"].reference_id)]
+    assert resumed["pay-1"].status == resumed["pay-2"].status == PayoutResult.STATUS_SENT
+
+
+def test_journal_keeps_only_rows_beyond_the_watermark(tmp_path):
+    path = _write_csv(tmp_path / "payouts.csv", 10)
+    journal = tmp_path / "journal"
+    send = Recorder(errors={"pay-6": InternalServerErrorException("boom", status_code=500)})
+
+    with PayoutEngine(send, str(journal), concurrency=1, checkpoint_every=2) as engine:
+        list(engine.run_csv(path))
+        watermark = engine.checkpoint.watermark
+
+    records = [json.loads(line) for line in journal.read_text().splitlines()]
+    assert records[0] == {"watermark": watermark}
+    assert {r["external_id"] for r in records[1:]} == {f"pay-{i}" for i in range(6, 10)}
+    assert all(r["offset"] >= watermark for r in records[1:])
+
+
+def test_settled_rows_ahead_of_a_slow_row_are_capped(tmp_path):
+    path = _write_csv(tmp_path / "payouts.csv", 20)
+    rows = list(read_csv(path))
+    journal = str(tmp_path / "journal")
+    release = threading.Event()
+
+    class Slow(Recorder):
+        def __call__(self, row, reference_id):
+            if row.external_id == "pay-0":
+                release.wait(5)
+            elif row.external_id == "pay-19":
+                release.set()
+            return super().__call__(row, reference_id)
+
+    with PayoutEngine(Slow(), journal, concurrency=2, max_settled=5) as engine:
+        results = list(engine.run_csv(path))
+        watermark = engine.checkpoint.watermark
+
+    assert len(results) == 20
+    assert watermark == rows[5].end_offset
+
+    # Rows past the capped watermark are skipped from the journal, not paid again.
+    again = Recorder()
+    with PayoutEngine(again, journal) as engine:
+        resumed = list(engine.run_csv(path))
+    assert again.calls == []
+    assert {r.status for r in resumed} == {PayoutResult.STATUS_SKIPPED}
+
+
+def test_for_disbursement_sends_assigned_reference(tmp_path, disbursement_api, token_response, httpx_mock: HTTPXMock):
+    path = _write_csv(tmp_path / "payouts.csv", 3)
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/disbursement/token/", json=token_response)
+    httpx_mock.add_response(
+        method="POST", url=f"{SANDBOX_BASE}/disbursement/v1_0/transfer", status_code=202, is_reusable=True
+    )
+
+    with PayoutEngine.for_disbursement(
+        disbursement_api, str(tmp_path / "journal"), concurrency=1, checkpoint_every=1
+    ) as engine:
+        run = engine.run_csv(path)
+        results = [next(run)]
+        # checkpoint_every reaches the engine: the watermark moves after one row.
+        assert engine.checkpoint.watermark == results[0].row.end_offset
+        results += list(run)
+
+    sent = {
+        request.headers["X-Reference-Id"]: json.loads(request.content)["externalId"]
+        for request in httpx_mock.get_requests(url=f"{SANDBOX_BASE}/disbursement/v1_0/transfer")
+    }
+    assert sent == {r.reference_id: r.row.external_id for r in results}
+
+
+def test_journal_keeps_the_reference_an_idempotency_store_returns(
+    tmp_path, disbursement_config, token_response, httpx_mock: HTTPXMock
+):
+    path = _write_csv(tmp_path / "payouts.csv", 2)
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/disbursement/token/", json=token_response)
+    httpx_mock.add_response(
+        method="POST", url=f"{SANDBOX_BASE}/disbursement/v1_0/transfer", status_code=202, is_reusable=True
+    )
+    disbursement = MomoApi.disbursement(
+        disbursement_config, idempotency=Idempotency(store=MemoryIdempotencyStore())
+    )
+    # pay-0 went out before, e.g. from another job sharing the idempotency store.
+    earlier = disbursement.transfer(TransferRequest.make("100", "46733120000", "pay-0", "XAF"), "ref-earlier")
+
+    journal = str(tmp_path / "journal")
+    with PayoutEngine.for_disbursement(disbursement, journal, concurrency=1) as engine:
+        run = engine.run_csv(path)
+        first = next(run)
+        records = [json.loads(line) for line in open(journal)]
+        results = {r.row.external_id: r for r in [first, *run]}
+
+    assert earlier == "ref-earlier"
+    assert results["pay-0"].status == PayoutResult.STATUS_SENT
+    assert results["pay-0"].reference_id == "ref-earlier"
+    assert (records[-1]["external_id"], records[-1]["reference_id"], records[-1]["state"]) == (
+        "pay-0", "ref-earlier", PayoutCheckpoint.STATE_SENT
+    )
+    sent = [r.headers["X-Reference-Id"] for r in httpx_mock.get_requests(url=f"{SANDBOX_BASE}/disbursement/v1_0/transfer")]
+    assert sent == ["ref-earlier", results["pay-1"].reference_id]
+
+
+def test_duplicate_external_ids_are_sent_once(tmp_path):
+    path = tmp_path / "payouts.csv"
+    path.write_text(
+        "external_id,phone,amount\n"
+        "pay-0,46733120000,100\npay-1,46733120001,101\npay-0,46733120000,100\npay-2,46733120002,102\n"
+    )
+    journal = str(tmp_path / "journal")
+    first = Recorder(errors={"pay-2": InternalServerErrorException("boom", status_code=500)})
+    with PayoutEngine(first, journal, concurrency=4) as engine:
+        results = list(engine.run_csv(str(path)))
+
+    assert sorted(external_id for external_id, _ in first.calls) == ["pay-0", "pay-1", "pay-2"]
+    (duplicate,) = [r for r in results if r.status == PayoutResult.STATUS_DUPLICATE]
+    assert duplicate.row.external_id == "pay-0"
+    assert duplicate.row.offset == max(r.row.offset for r in results if r.row.external_id == "pay-0")
+
+    # On resume reading starts after the duplicate, but pay-0 is still known.
+    with open(path, "a") as f:
+        f.write("pay-1,46733120001,101\n")
+    second = Recorder()
+    with PayoutEngine(second, journal, concurrency=4) as engine:
+        resumed = {r.row.external_id: r.status for r in engine.run_csv(str(path))}
+
+    assert [external_id for external_id, _ in second.calls] == ["pay-2"]
+    assert resumed == {"pay-2": PayoutResult.STATUS_SENT, "pay-1": PayoutResult.STATUS_DUPLICATE}
+
+
+def test_concurrent_assignments_share_fsyncs(tmp_path, monkeypatch):
+    syncs = []
+
+    def slow_fsync(fd):
+        syncs.append(fd)
+        time.sleep(0.02)
+
+    monkeypatch.setattr(payout_module.os, "fsync", slow_fsync)
+    path = _write_csv(tmp_path / "payouts.csv", 32)
+    send = Recorder()
+
+    with PayoutEngine(send, str(tmp_path / "journal"), concurrency=8, checkpoint_every=1000) as engine:
+        results = list(engine.run_csv(path))
+
+    assert len(results) == 32 and len(send.calls) == 32
+    # Workers that wrote while another fsync ran share the next one.
+    assert len(syncs) < 32
+
+
+def test_transport_errors_are_unknown(tmp_path):
+    path = _write_csv(tmp_path / "payouts.csv", 2)
+    send = Recorder(errors={"pay-0": httpx.ConnectTimeout("timed out")})
+
+    with PayoutEngine(send, str(tmp_path / "journal")) as engine:
+        results = {r.row.external_id: r for r in engine.run_csv(path)}
+        watermark = engine.checkpoint.watermark
+
+    assert results["pay-0"].status == PayoutResult.STATUS_UNKNOWN
+    assert watermark == 0
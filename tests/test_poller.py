@@ -0,0 +1,226 @@
+import threading
+
+from pytest_httpx import HTTPXMock
+
+from momo_api import PollResult, StatusPoller
+from momo_api.airtel.transaction import AirtelTransaction
+from momo_api.exceptions import InternalServerErrorException
+from momo_api.models.transaction import Transaction
+from momo_api.support.timing_wheel import TimingWheel
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+
+
+def _transaction(status: str) -> Transaction:
+    return Transaction(amount="100", status=status, currency="XAF")
+
+
+class ScriptedFetch:
+    """Returns the scripted statuses for a reference, repeating the last one."""
+
+    def __init__(self, script):
+        self.script = script
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, reference_id):
+        with self._lock:
+            count = self.calls.get(reference_id, 0)
+            self.calls[reference_id] = count + 1
+        steps = self.script[reference_id]
+        step = steps[min(count, len(steps) - 1)]
+        if isinstance(step, Exception):
+            raise step
+        return step
+
+
+def _poller(fetch, **options) -> StatusPoller:
+    options.setdefault("initial_delay", 0.01)
+    options.setdefault("max_delay", 0.02)
+    options.setdefault("tick", 0.005)
+    return StatusPoller(fetch, **options)
+
+
+def test_timing_wheel_expires_items_after_their_delay(fake_clock):
+    clock = fake_clock(1000.0)
+    wheel = TimingWheel(tick=1.0, size=4, clock=clock)
+    wheel.schedule("soon", 1)
+    wheel.schedule("later", 10)
+
+    assert wheel.expire() == []
+    clock.now += 1
+    assert wheel.expire() == ["soon"]
+    clock.now += 5
+    assert wheel.expire() == []
+    assert len(wheel) == 1
+    clock.now += 4
+    assert wheel.expire() == ["later"]
+    assert len(wheel) == 0
+
+
+def test_timing_wheel_catches_up_after_a_long_pause(fake_clock):
+    clock = fake_clock(1000.0)
+    wheel = TimingWheel(tick=1.0, size=8, clock=clock)
+    for delay in range(1, 100):
+        wheel.schedule(delay, delay)
+
+    clock.now += 50
+    assert sorted(wheel.expire()) == list(range(1, 51))
+    clock.now += 100
+    assert sorted(wheel.expire()) == list(range(51, 100))
+
+
+def test_results_polls_until_terminal():
+    fetch = ScriptedFetch({
+        "ref-1": [_transaction("PENDING"), _transaction("PENDING"), _transaction("SUCCESSFUL")],
+        "ref-2": [_transaction("FAILED")],
+    })
+    poller = _poller(fetch)
+    poller.add("ref-1", context="order-1")
+    poller.add("ref-2")
+
+    with poller:
+        results = {r.reference_id: r for r in poller.results()}
+
+    assert results["ref-1"].transaction.is_successful()
+    assert results["ref-1"].attempts == 3
+    assert results["ref-1"].context == "order-1"
+    assert results["ref-2"].transaction.is_failed()
+    assert poller.pending == 0
+
+
+def test_airtel_transactions_are_recognised_as_terminal():
+    fetch = ScriptedFetch({
+        "tx-1": [AirtelTransaction(id="tx-1", status="TIP"), AirtelTransaction(id="tx-1", status="TS")],
+    })
+    poller = _poller(fetch)
+    poller.add("tx-1")
+
+    with poller:
+        (result,) = list(poller.results())
+
+    assert result.ok
+    assert result.transaction.status == "TS"
+
+
+def test_timeout_reports_last_pending_status():
+    fetch = ScriptedFetch({"ref-1": [_transaction("PENDING")]})
+    poller = _poller(fetch, timeout=0.05)
+    poller.add("ref-1")
+
+    with poller:
+        (result,) = list(poller.results())
+
+    assert result.timed_out
+    assert result.transaction.is_pending()
+    assert not result.ok
+
+
+def test_gives_up_after_consecutive_errors():
+    error = InternalServerErrorException("boom", status_code=500)
+    fetch = ScriptedFetch({"ref-1": [error]})
+    poller = _poller(fetch, max_errors=3)
+    poller.add("ref-1")
+
+    with poller:
+        (result,) = list(poller.results())
+
+    assert result.error is error
+    assert result.attempts == 3
+
+
+def test_transient_errors_are_retried():
+    fetch = ScriptedFetch({
+        "ref-1": [InternalServerErrorException("boom", status_code=500), _transaction("SUCCESSFUL")],
+    })
+    poller = _poller(fetch)
+    poller.add("ref-1")
+
+    with poller:
+        (result,) = list(poller.results())
+
+    assert result.ok
+    assert result.error is None
+
+
+def test_removed_reference_is_not_reported():
+    fetch = ScriptedFetch({"ref-1": [_transaction("PENDING")], "ref-2": [_transaction("SUCCESSFUL")]})
+    poller = _poller(fetch)
+    poller.add_many(["ref-1", "ref-2"])
+    assert poller.remove("ref-1")
+
+    with poller:
+        results = list(poller.results())
+
+    assert [r.reference_id for r in results] == ["ref-2"]
+    assert "ref-1" not in fetch.calls
+
+
+def test_background_polling_delivers_callbacks():
+    fetch = ScriptedFetch({f"ref-{i}": [_transaction("PENDING"), _transaction("SUCCESSFUL")] for i in range(50)})
+    received = []
+    finished = threading.Event()
+
+    def on_result(result: PollResult) -> None:
+        received.append(result)
+        if len(received) == 50:
+            finished.set()
+
+    poller = _poller(fetch, on_result=on_result, concurrency=4)
+    poller.start()
+    try:
+        poller.add_many(f"ref-{i}" for i in range(50))
+        assert finished.wait(5)
+    finally:
+        poller.stop()
+
+    assert all(r.ok for r in received)
+
+
+def test_background_polling_survives_a_failing_callback(caplog):
+    fetch = ScriptedFetch({f"ref-{i}": [_transaction("SUCCESSFUL")] for i in range(4)})
+    received = []
+    finished = threading.Event()
+
+    def on_result(result: PollResult) -> None:
+        received.append(result.reference_id)
+        if len(received) == 4:
+            finished.set()
+        if result.reference_id == "ref-0":
+            raise RuntimeError("callback bug")
+
+    poller = _poller(fetch, on_result=on_result, concurrency=1)
+    with caplog.at_level("ERROR", logger="momo_api.support.poller"):
+        poller.start()
+        try:
+            poller.add("ref-0")
+            poller.add_many(["ref-1", "ref-2", "ref-3"])
+            assert finished.wait(5)
+            assert poller._thread.is_alive()
+        finally:
+            poller.stop()
+
+    assert sorted(received) == ["ref-0", "ref-1", "ref-2", "ref-3"]
+    assert "callback bug" in caplog.text
+
+
+def test_polls_collection_api(collection_api, token_response, httpx_mock: HTTPXMock):
+    reference_id = "2f1c7c0a-0000-4000-8000-000000000001"
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{SANDBOX_BASE}/collection/v1_0/requesttopay/{reference_id}",
+        json={"amount": "100", "currency": "XAF", "status": "PENDING"},
+    )
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{SANDBOX_BASE}/collection/v1_0/requesttopay/{reference_id}",
+        json={"amount": "100", "currency": "XAF", "status": "SUCCESSFUL"},
+    )
+    poller = _poller(collection_api.get_payment_status)
+    poller.add(reference_id)
+
+    with poller:
+        (result,) = list(poller.results())
+
+    assert result.transaction.is_successful()
@@ -0,0 +1,175 @@
+import asyncio
+import multiprocessing
+import os
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from momo_api import MomoApi, RateLimit, RateLimiter, SharedBucketStore
+from momo_api.exceptions import TooManyRequestsException
+from momo_api.support import rate_limit
+from momo_api.support.rate_limit import MemoryBucketStore
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+
+
+def test_rate_limit_validation():
+    with pytest.raises(ValueError):
+        RateLimit(0)
+    with pytest.raises(ValueError):
+        RateLimit(5, burst=0.5)
+    assert RateLimit(0.5).capacity == 1
+    assert RateLimit(10).capacity == 10
+    assert RateLimit(10, burst=3).capacity == 3
+
+
+def test_bucket_allows_burst_then_spaces_requests(fake_clock):
+    clock = fake_clock(100.0)
+    limiter = RateLimiter(default=RateLimit(2, burst=2), clock=clock)
+
+    assert limiter.reserve("key", "status") == 0
+    assert limiter.reserve("key", "status") == 0
+    assert limiter.reserve("key", "status") == pytest.approx(0.5)
+    assert limiter.reserve("key", "status") == pytest.approx(1.0)
+
+    clock.now += 1.0
+    assert limiter.reserve("key", "status") == pytest.approx(0.5)
+
+
+def test_buckets_are_per_key_and_endpoint_class(fake_clock):
+    clock = fake_clock(100.0)
+    limiter = RateLimiter(
+        limits={"initiate": RateLimit(1)},
+        default=RateLimit(100),
+        clock=clock,
+    )
+
+    assert limiter.reserve("a", "initiate") == 0
+    assert limiter.reserve("a", "initiate") == pytest.approx(1.0)
+    assert limiter.reserve("b", "initiate") == 0
+    assert limiter.reserve("a", "status") == 0
+
+
+def test_unlisted_endpoint_without_default_is_unlimited():
+    limiter = RateLimiter(limits={"initiate": RateLimit(1)})
+
+    assert all(limiter.reserve("a", "balance") == 0 for _ in range(100))
+    assert limiter.limit_for("balance") is None
+
+
+def test_acquire_sleeps_for_the_reserved_slot(monkeypatch, fake_clock):
+    slept = []
+    monkeypatch.setattr(rate_limit.time, "sleep", slept.append)
+    limiter = RateLimiter(default=RateLimit(4, burst=1), store=MemoryBucketStore(), clock=fake_clock(100.0))
+
+    limiter.acquire("key", "status")
+    limiter.acquire("key", "status")
+
+    assert slept == [pytest.approx(0.25)]
+
+
+def test_aacquire_waits_without_blocking(monkeypatch, fake_clock):
+    waits = []
+
+    async def fake_sleep(delay):
+        waits.append(delay)
+
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", fake_sleep)
+    limiter = RateLimiter(default=RateLimit(2, burst=1), clock=fake_clock(100.0))
+
+    async def main():
+        await asyncio.gather(*(limiter.aacquire("key", "token") for _ in range(3)))
+
+    asyncio.run(main())
+    assert waits == [pytest.approx(0.5), pytest.approx(1.0)]
+
+
+def test_shared_store_is_consistent_across_instances(tmp_path, fake_clock):
+    path = str(tmp_path / "buckets")
+    clock = fake_clock(100.0)
+    first = RateLimiter(default=RateLimit(1), store=SharedBucketStore(path, slots=8), clock=clock)
+    second = RateLimiter(default=RateLimit(1), store=SharedBucketStore(path, slots=8), clock=clock)
+
+    assert first.reserve("key", "status") == 0
+    assert second.reserve("key", "status") == pytest.approx(1.0)
+    assert second.reserve("other", "status") == 0
+
+
+def _reserve_in_child(path, now, queue):
+    store = SharedBucketStore(path, slots=8)
+    queue.put(store.reserve("key:status", 1.0, 1.0, now))
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+def test_shared_store_spans_processes(tmp_path):
+    path = str(tmp_path / "buckets")
+    store = SharedBucketStore(path, slots=8)
+    assert store.reserve("key:status", 1.0, 1.0, 50.0) == 0
+
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    child = context.Process(target=_reserve_in_child, args=(path, 50.0, queue))
+    child.start()
+    child.join(10)
+
+    assert queue.get(timeout=5) == pytest.approx(1.0)
+
+
+def test_shared_store_full_table(tmp_path):
+    store = SharedBucketStore(str(tmp_path / "buckets"), slots=2)
+    store.reserve("a", 1, 1, 0)
+    store.reserve("b", 1, 1, 0)
+
+    with pytest.raises(RuntimeError):
+        store.reserve("c", 1, 1, 0)
+
+
+def test_shared_store_rejects_a_different_slot_count(tmp_path):
+    path = str(tmp_path / "buckets")
+    SharedBucketStore(path, slots=8).reserve("a", 1, 1, 0)
+
+    with pytest.raises(ValueError, match="8 slots"):
+        SharedBucketStore(path, slots=16).reserve("a", 1, 1, 0)
+    assert SharedBucketStore(path, slots=8).reserve("a", 1, 1, 0) == pytest.approx(1.0)
+
+    other = tmp_path / "other"
+    other.write_bytes(b"\xff" * 64)
+    with pytest.raises(ValueError, match="not a rate limit table"):
+        SharedBucketStore(str(other), slots=8).reserve("a", 1, 1, 0)
+
+
+def test_products_consult_the_limiter_per_endpoint_class(collection_config, token_response, httpx_mock: HTTPXMock):
+    calls = []
+
+    class RecordingLimiter(RateLimiter):
+        def acquire(self, key, endpoint):
+            calls.append((key, endpoint))
+
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/v1_0/requesttopay", status_code=202)
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{SANDBOX_BASE}/collection/v1_0/account/balance",
+        json={"availableBalance": "10", "currency": "XAF"},
+    )
+    collection = MomoApi.collection(collection_config, rate_limiter=RecordingLimiter())
+
+    collection.quick_pay("100", "46733123450", "order-1")
+    collection.get_balance()
+
+    key = f"mtn:{collection_config['subscription_key']}"
+    assert calls == [(key, "token"), (key, "initiate"), (key, "balance")]
+
+
+def test_429_maps_to_too_many_requests(collection_api, token_response, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{SANDBOX_BASE}/collection/v1_0/account/balance",
+        status_code=429,
+        json={"message": "Rate limit is exceeded"},
+    )
+
+    with pytest.raises(TooManyRequestsException) as info:
+        collection_api.get_balance()
+    assert info.value.status_code == 429
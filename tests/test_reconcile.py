@@ -0,0 +1,174 @@
+import csv
+import io
+import re
+import threading
+
+import httpx
+from pytest_httpx import HTTPXMock
+
+from momo_api import MomoApi, StatusCache, Transaction
+from momo_api.airtel.transaction import AirtelTransaction
+from momo_api.bulk import LedgerRow, ReconcileEngine, ReconcileResult, read_ledger_csv, read_ledger_jsonl
+from momo_api.exceptions import InternalServerErrorException, ResourceNotFoundException
+from momo_api.support.status_cache import MemoryStatusStore, SqliteStatusStore
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+
+PROVIDER = {
+    "ref-ok": ("SUCCESSFUL", "100"),
+    "ref-amount": ("SUCCESSFUL", "90"),
+    "ref-failed": ("FAILED", "100"),
+    "ref-pending": ("PENDING", "100"),
+}
+
+
+class Provider:
+    """A ``fetch`` callable answering from ``PROVIDER`` and counting lookups."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, reference_id):
+        with self._lock:
+            self.calls.append(reference_id)
+        if reference_id == "ref-error":
+            raise InternalServerErrorException("boom", 500)
+        if reference_id not in PROVIDER:
+            raise ResourceNotFoundException("not found", 404)
+        status, amount = PROVIDER[reference_id]
+        return Transaction(amount=amount, status=status, currency="XAF")
+
+
+def _ledger():
+    references = ["ref-ok", "ref-amount", "ref-failed", "ref-pending", "ref-missing", "ref-error"]
+    return [LedgerRow(f"order-{i}", reference, "100.00") for i, reference in enumerate(references)]
+
+
+def test_outcomes_and_report():
+    engine = ReconcileEngine(Provider(), concurrency=3)
+    report = io.StringIO()
+
+    summary = engine.reconcile(_ledger(), report)
+
+    assert summary.rows == 6
+    assert summary.mismatches == 5
+    assert summary.outcomes == {
+        ReconcileResult.OUTCOME_MATCHED: 1,
+        ReconcileResult.OUTCOME_AMOUNT_DIFFERS: 1,
+        ReconcileResult.OUTCOME_STATUS_DIFFERS: 1,
+        ReconcileResult.OUTCOME_PENDING: 1,
+        ReconcileResult.OUTCOME_MISSING: 1,
+        ReconcileResult.OUTCOME_ERROR: 1,
+    }
+    rows = {row["reference_id"]: row for row in csv.DictReader(io.StringIO(report.getvalue()))}
+    assert set(rows) == {"ref-amount", "ref-failed", "ref-pending", "ref-missing", "ref-error"}
+    assert rows["ref-amount"]["outcome"] == "amount_differs"
+    assert rows["ref-amount"]["provider_amount"] == "90"
+    assert rows["ref-failed"]["provider_status"] == "FAILED"
+    assert "InternalServerErrorException" in rows["ref-error"]["error"]
+
+
+def test_known_terminal_references_are_not_fetched_again(tmp_path):
+    known = StatusCache(SqliteStatusStore(str(tmp_path / "statuses.db")))
+    provider = Provider()
+    first = ReconcileEngine(provider, known=known)
+    list(first.run(_ledger()))
+    assert len(provider.calls) == 6
+
+    provider.calls.clear()
+    again = ReconcileEngine(provider, known=StatusCache(SqliteStatusStore(str(tmp_path / "statuses.db"))))
+    results = {r.row.reference_id: r for r in again.run(_ledger())}
+
+    assert sorted(provider.calls) == ["ref-error", "ref-missing", "ref-pending"]
+    assert results["ref-ok"].cached and results["ref-ok"].ok
+    assert results["ref-amount"].outcome == ReconcileResult.OUTCOME_AMOUNT_DIFFERS
+    assert results["ref-failed"].outcome == ReconcileResult.OUTCOME_STATUS_DIFFERS
+
+
+def test_ledger_is_streamed_with_bounded_memory():
+    consumed = []
+
+    def ledger():
+        for i in range(100_000):
+            consumed.append(i)
+            yield LedgerRow(f"order-{i}", "ref-ok", "100")
+
+    results = ReconcileEngine(Provider(), concurrency=4).run(ledger())
+    next(results)
+    assert len(consumed) <= 5
+    results.close()
+
+
+def test_airtel_statuses_compare_status_only():
+    def fetch(reference_id):
+        return AirtelTransaction(reference_id, "TF" if reference_id == "tx-2" else "TS")
+
+    engine = ReconcileEngine(fetch)
+    ledger = [LedgerRow("a", "tx-1", "500"), LedgerRow("b", "tx-2", "500"), LedgerRow("c", "tx-3", "5", "TS")]
+    outcomes = {r.row.reference_id: r.outcome for r in engine.run(ledger)}
+
+    assert outcomes == {"tx-1": "matched", "tx-2": "status_differs", "tx-3": "matched"}
+
+
+def test_read_ledger_files(tmp_path):
+    csv_path = tmp_path / "ledger.csv"
+    csv_path.write_text("external_id,reference_id,amount,status\norder-1,ref-1,100,FAILED\norder-2,ref-2,50,\n")
+    jsonl_path = tmp_path / "ledger.jsonl"
+    jsonl_path.write_text('{"external_id": "order-1", "reference_id": "ref-1", "amount": 100}\n\n')
+
+    assert list(read_ledger_csv(str(csv_path))) == [
+        LedgerRow("order-1", "ref-1", "100", "FAILED"),
+        LedgerRow("order-2", "ref-2", "50"),
+    ]
+    assert list(read_ledger_jsonl(str(jsonl_path))) == [LedgerRow("order-1", "ref-1", "100")]
+
+
+def test_reconcile_collection_over_http(collection_config, token_response, tmp_path, httpx_mock: HTTPXMock):
+    def status(request: httpx.Request) -> httpx.Response:
+        reference_id = request.url.path.rsplit("/", 1)[1]
+        if reference_id == "ref-2":
+            return httpx.Response(404, json={"message": "Not found"})
+        return httpx.Response(200, json={"amount": "100", "currency": "EUR", "status": "SUCCESSFUL"})
+
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_callback(
+        status, method="GET", url=re.compile(rf"{SANDBOX_BASE}/collection/v1_0/requesttopay/.+"), is_reusable=True
+    )
+    ledger = tmp_path / "ledger.csv"
+    ledger.write_text("external_id,reference_id,amount\n" + "".join(f"order-{i},ref-{i},100\n" for i in range(5)))
+    report = tmp_path / "report.csv"
+
+    engine = ReconcileEngine.for_collection(MomoApi.collection(collection_config), concurrency=2)
+    summary = engine.reconcile_csv(str(ledger), str(report))
+
+    assert summary.rows == 5
+    assert summary.outcomes == {"matched": 4, "missing": 1}
+    assert [row["reference_id"] for row in csv.DictReader(report.open())] == ["ref-2"]
+
+
+def test_known_shares_the_product_status_cache(collection_config, token_response, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response, is_reusable=True)
+    httpx_mock.add_response(
+        method="GET",
+        url=re.compile(rf"{SANDBOX_BASE}/collection/v1_0/requesttopay/.+"),
+        json={"amount": "100", "currency": "EUR", "status": "SUCCESSFUL"},
+        is_reusable=True,
+    )
+    store = MemoryStatusStore()
+    cache = StatusCache(store)
+    collection = MomoApi.collection(collection_config, status_cache=cache)
+    collection.get_payment_status("ref-1")
+
+    engine = ReconcileEngine.for_collection(collection, known=cache)
+    results = list(engine.run([LedgerRow("order-1", "ref-1", "100"), LedgerRow("order-2", "ref-2", "100")]))
+
+    assert {r.row.reference_id: r.cached for r in results} == {"ref-1": True, "ref-2": False}
+    assert len(httpx_mock.get_requests(method="GET")) == 2
+    assert len(store) == 2
+
+    other = MomoApi.collection({**collection_config, "api_user": "another-user"}, status_cache=cache)
+    results = list(ReconcileEngine.for_collection(other, known=cache).run([LedgerRow("order-1", "ref-1", "100")]))
+
+    assert not results[0].cached
+    assert len(httpx_mock.get_requests(method="GET")) == 3
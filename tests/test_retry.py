@@ -0,0 +1,140 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from momo_api import AirtelApi, AirtelConfig, MomoApi, RetryPolicy
+from momo_api.airtel.api import STAGING_URL
+from momo_api.exceptions import ConflictException, InternalServerErrorException
+from momo_api.models.payment_request import PaymentRequest
+from momo_api.models.transfer_request import TransferRequest
+from momo_api.support import retry as retry_module
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+AIRTEL_BASE = STAGING_URL
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    delays = []
+    monkeypatch.setattr(retry_module.time, "sleep", delays.append)
+    return delays
+
+
+def _payment() -> PaymentRequest:
+    return PaymentRequest.make("100", "46733123450", "order-1")
+
+
+def test_policy_validation():
+    with pytest.raises(ValueError):
+        RetryPolicy(max_attempts=0)
+    with pytest.raises(ValueError):
+        RetryPolicy(jitter=2)
+
+
+def test_delay_grows_and_honours_retry_after():
+    policy = RetryPolicy(backoff=1, multiplier=2, max_backoff=3, jitter=0)
+
+    assert [policy.delay(n) for n in (1, 2, 3)] == [1, 2, 3]
+    response = httpx.Response(429, headers={"Retry-After": "7"})
+    assert policy.delay(1, response) == 7
+
+
+def test_retry_resends_same_reference_id(collection_config, token_response, httpx_mock: HTTPXMock, no_sleep):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_exception(httpx.ReadTimeout("timed out"), url=f"{SANDBOX_BASE}/collection/v1_0/requesttopay")
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/v1_0/requesttopay", status_code=503)
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/v1_0/requesttopay", status_code=202)
+    collection = MomoApi.collection(collection_config, retry=RetryPolicy(max_attempts=3))
+
+    reference_id = collection.request_to_pay(_payment())
+
+    sent = httpx_mock.get_requests(url=f"{SANDBOX_BASE}/collection/v1_0/requesttopay")
+    assert [r.headers["X-Reference-Id"] for r in sent] == [reference_id] * 3
+    assert len(no_sleep) == 2
+
+
+def test_conflict_on_retry_means_already_accepted(disbursement_config, token_response, httpx_mock: HTTPXMock, no_sleep):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/disbursement/token/", json=token_response)
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/disbursement/v1_0/transfer", status_code=500)
+    httpx_mock.add_response(
+        method="POST",
+        url=f"{SANDBOX_BASE}/disbursement/v1_0/transfer",
+        status_code=409,
+        json={"message": "Duplicated reference id"},
+    )
+    disbursement = MomoApi.disbursement(disbursement_config, retry=RetryPolicy())
+
+    transfer = TransferRequest.make("100", "46733123450", "payout-1")
+    reference_id = disbursement.transfer(transfer, "2f1c7c0a-0000-4000-8000-000000000009")
+
+    assert reference_id == "2f1c7c0a-0000-4000-8000-000000000009"
+
+
+def test_gives_up_after_max_attempts(collection_config, token_response, httpx_mock: HTTPXMock, no_sleep):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{SANDBOX_BASE}/collection/v1_0/account/balance",
+        status_code=500,
+        json={"message": "Internal error"},
+        is_reusable=True,
+    )
+    collection = MomoApi.collection(collection_config, retry=RetryPolicy(max_attempts=2))
+
+    with pytest.raises(InternalServerErrorException):
+        collection.get_balance()
+    assert len(httpx_mock.get_requests(url=f"{SANDBOX_BASE}/collection/v1_0/account/balance")) == 2
+
+
+def test_client_errors_are_not_retried(collection_config, token_response, httpx_mock: HTTPXMock, no_sleep):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_response(
+        method="POST",
+        url=f"{SANDBOX_BASE}/collection/v1_0/requesttopay",
+        status_code=409,
+        json={"message": "Duplicated reference id"},
+    )
+    collection = MomoApi.collection(collection_config, retry=RetryPolicy())
+
+    with pytest.raises(ConflictException):
+        collection.request_to_pay(_payment())
+    assert no_sleep == []
+
+
+def test_airtel_retry_keeps_transaction_id(httpx_mock: HTTPXMock, no_sleep):
+    httpx_mock.add_response(
+        method="POST",
+        url=f"{AIRTEL_BASE}/auth/oauth2/token",
+        json={"access_token": "airtel-token", "expires_in": 3600},
+    )
+    httpx_mock.add_exception(httpx.ConnectError("refused"), url=f"{AIRTEL_BASE}/merchant/v1/payments/")
+    httpx_mock.add_response(method="POST", url=f"{AIRTEL_BASE}/merchant/v1/payments/", json={"status": {"success": True}})
+    config = AirtelConfig.collection("client-id", "client-secret")
+    collection = AirtelApi.collection(AirtelApi.ENVIRONMENT_STAGING, config, retry=RetryPolicy())
+
+    external_id = collection.request_to_pay("100", "242060000000", "order-1")
+
+    sent = httpx_mock.get_requests(url=f"{AIRTEL_BASE}/merchant/v1/payments/")
+    assert [json.loads(r.content)["transaction"]["id"] for r in sent] == [external_id] * 2
+
+
+def test_async_retry(collection_config, token_response, httpx_mock: HTTPXMock, monkeypatch):
+    async def fake_sleep(delay):
+        pass
+
+    monkeypatch.setattr(retry_module.asyncio, "sleep", fake_sleep)
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/v1_0/requesttopay", status_code=502)
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/v1_0/requesttopay", status_code=409)
+
+    async def main():
+        async with MomoApi.async_collection(collection_config, retry=RetryPolicy()) as collection:
+            return await collection.request_to_pay(_payment())
+
+    reference_id = asyncio.run(main())
+
+    sent = httpx_mock.get_requests(url=f"{SANDBOX_BASE}/collection/v1_0/requesttopay")
+    assert [r.headers["X-Reference-Id"] for r in sent] == [reference_id] * 2
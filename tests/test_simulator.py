@@ -0,0 +1,152 @@
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from momo_api import CallbackReceiver, PaymentRequest
+from momo_api.airtel.collection import AsyncAirtelCollectionApi
+from momo_api.airtel.config import AirtelConfig
+from momo_api.exceptions import (
+    ConflictException,
+    InternalServerErrorException,
+    TooManyRequestsException,
+)
+from momo_api.models.config import Config
+from momo_api.products.collection import CollectionApi
+from momo_api.simulator import Latency, Simulator
+from momo_api.support.transport import AsyncHttpTransport, HttpTransport
+
+PHONE = "242060000000"
+
+
+def _payment(external_id: str = "order-1") -> PaymentRequest:
+    return PaymentRequest.make(amount="100", payer=PHONE, external_id=external_id)
+
+
+def _collection(url: str, transport: HttpTransport, callback_uri: str = "") -> CollectionApi:
+    config = Config.collection("key", "user", "secret", callback_uri=callback_uri)
+    return CollectionApi(config, url, "sandbox", transport)
+
+
+def test_mtn_payment_settles_after_pending_delay():
+    with Simulator(pending=Latency.constant(0.05), inactive_numbers=["242069999999"]) as sim:
+        with HttpTransport() as transport:
+            collection = _collection(sim.url, transport)
+            reference_id = collection.request_to_pay(_payment())
+            assert collection.get_payment_status(reference_id).is_pending()
+            time.sleep(0.1)
+            transaction = collection.get_payment_status(reference_id)
+            assert transaction.is_successful() and transaction.external_id == "order-1"
+            assert transaction.financial_transaction_id
+
+            with pytest.raises(ConflictException):
+                collection.request_to_pay(_payment(), reference_id=reference_id)
+            assert collection.get_balance().currency == "XAF"
+            assert collection.check_account_holder(PHONE)
+            assert not collection.check_account_holder("242069999999")
+
+    assert sim.stats["requests"] == 8
+
+
+def test_airtel_payment_can_fail():
+    async def main():
+        async with Simulator(pending=Latency.constant(0.02), failure_rate=1.0) as sim:
+            async with AsyncHttpTransport() as transport:
+                config = AirtelConfig.collection("client-id", "client-secret")
+                api = AsyncAirtelCollectionApi(config, sim.url, transport)
+                external_id = await api.request_to_pay("100", PHONE, "invoice-1")
+                first = await api.get_payment_status(external_id)
+                await asyncio.sleep(0.05)
+                return first, await api.get_payment_status(external_id)
+
+    first, final = asyncio.run(main())
+    assert first.is_pending()
+    assert final.is_failed()
+
+
+def test_fault_injection():
+    with Simulator(throttle_rate=1.0) as sim, HttpTransport() as transport:
+        with pytest.raises(TooManyRequestsException):
+            _collection(sim.url, transport).get_balance()
+        assert sim.stats["throttled"] == 1
+
+    with Simulator(error_rate=1.0) as sim, HttpTransport() as transport:
+        with pytest.raises(InternalServerErrorException):
+            _collection(sim.url, transport).get_balance()
+
+    with Simulator() as sim:
+        response = httpx.get(
+            f"{sim.url}/collection/v1_0/account/balance", headers={"Authorization": "Bearer x"}
+        )
+        assert response.status_code == 401
+
+
+@pytest.mark.parametrize("length", ["abc", "-5"])
+def test_malformed_content_length_is_rejected(length):
+    with Simulator() as sim:
+        host, port = sim.url.split("//", 1)[1].split(":")
+        with socket.create_connection((host, int(port)), timeout=5) as sock:
+            sock.sendall(f"POST /collection/token/ HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+            reply = sock.makefile("rb").read()
+
+    assert reply.startswith(b"HTTP/1.1 400 ")
+    assert b"Malformed Content-Length" in reply
+
+
+def test_rate_limit_and_latency():
+    sim = Simulator(rate_limit=2, latencies={"token": Latency.constant(0.5)})
+    statuses = [sim.handle("POST", "/auth/oauth2/token", {}, b"")[0] for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    assert sim.handle("GET", "/collection/v1_0/account/balance", {}, b"")[3] == 0.0
+    assert sim.handle("POST", "/collection/token/", {}, b"")[3] == 0.5
+
+
+def test_latency_specs():
+    rng = random.Random(1)
+    assert Latency.parse("0.25").sample(rng) == 0.25
+    assert 0.01 <= Latency.parse("uniform:0.01,0.02").sample(rng) <= 0.02
+    assert Latency.parse("lognormal:0.05,0.5").sample(rng) > 0
+    with pytest.raises(ValueError):
+        Latency.parse("gamma:1,2")
+
+
+def test_callback_reaches_the_receiver():
+    receiver = CallbackReceiver()
+    events = []
+    received = threading.Event()
+    receiver.add_listener(lambda event: (events.append(event), received.set()))
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            receiver.handle(self.rfile.read(int(self.headers["Content-Length"])))
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    callback_uri = f"http://127.0.0.1:{server.server_port}/momo"
+    try:
+        with Simulator(pending=Latency.constant(0.01)) as sim, HttpTransport() as transport:
+            collection = _collection(sim.url, transport, callback_uri)
+            receiver.expect(collection.request_to_pay(_payment("order-9")), external_id="order-9")
+            assert received.wait(5)
+            deadline = time.monotonic() + 5
+            while not sim.stats["callbacks_sent"] and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert sim.stats["callbacks_sent"] == 1
+    finally:
+        server.shutdown()
+
+    (event,) = events
+    assert event.expected and event.transaction.is_successful()
+    assert json.dumps(event.transaction._raw)
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from momo_api import AirtelApi, AirtelConfig, MomoApi, SingleFlight
+from momo_api.airtel.api import STAGING_URL
+from momo_api.exceptions import ResourceNotFoundException
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+BALANCE_URL = f"{SANDBOX_BASE}/collection/v1_0/account/balance"
+
+
+def _wait_for(condition) -> None:
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait()
+        return "result"
+
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(flight.do, "key", fn) for _ in range(4)]
+        _wait_for(lambda: flight.shared == 3)
+        release.set()
+        assert [f.result() for f in futures] == ["result"] * 4
+
+    assert len(calls) == 1
+    assert flight.in_flight == 0
+    assert flight.do("key", lambda: "again") == "again"
+
+
+def test_errors_are_shared():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fn():
+        release.wait()
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(2) as pool:
+        futures = [pool.submit(flight.do, "key", fn) for _ in range(2)]
+        _wait_for(lambda: flight.shared == 1)
+        release.set()
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+
+
+def test_product_coalesces_balance_requests(
+    collection_config, token_response, account_balance_response, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def balance(request: httpx.Request) -> httpx.Response:
+        release.wait()
+        return httpx.Response(200, json=account_balance_response)
+
+    httpx_mock.add_callback(balance, method="GET", url=BALANCE_URL)
+    collection = MomoApi.collection(collection_config, single_flight=flight)
+    collection.get_access_token()
+
+    with ThreadPoolExecutor(5) as pool:
+        futures = [pool.submit(collection.get_balance) for _ in range(5)]
+        _wait_for(lambda: flight.shared == 4)
+        release.set()
+        balances = [f.result() for f in futures]
+
+    assert {b.available_balance for b in balances} == {account_balance_response["availableBalance"]}
+    assert len(httpx_mock.get_requests(url=BALANCE_URL)) == 1
+
+
+def test_async_status_lookups_share_errors(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        method="POST", url=f"{STAGING_URL}/auth/oauth2/token", json={"access_token": "t", "expires_in": 3600}
+    )
+
+    async def not_found(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.01)
+        return httpx.Response(404, json={"message": "not found"})
+
+    status_url = f"{STAGING_URL}/standard/v1/payments/tx-1"
+    httpx_mock.add_callback(not_found, method="GET", url=status_url)
+    flight = SingleFlight()
+    config = AirtelConfig.collection("client-id", "client-secret")
+
+    async def main():
+        async with AirtelApi.async_collection(
+            AirtelApi.ENVIRONMENT_STAGING, config, single_flight=flight
+        ) as api:
+            await api.get_access_token()
+            return await asyncio.gather(
+                *(api.get_payment_status("tx-1") for _ in range(3)), return_exceptions=True
+            )
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(r, ResourceNotFoundException) for r in results)
+    assert len(httpx_mock.get_requests(url=status_url)) == 1
+    assert flight.shared == 2
@@ -0,0 +1,109 @@
+import asyncio
+
+from pytest_httpx import HTTPXMock
+
+from momo_api import AirtelApi, AirtelConfig, MomoApi, SqliteStatusStore, StatusCache
+from momo_api.airtel.api import STAGING_URL
+from momo_api.airtel.transaction import AirtelTransaction
+from momo_api.models.transaction import Transaction
+from momo_api.support.status_cache import MemoryStatusStore
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+
+
+def _transaction(status: str) -> Transaction:
+    return Transaction.parse({"amount": "100", "currency": "XAF", "status": status, "externalId": "o-1"})
+
+
+def test_terminal_results_are_kept_and_pending_ones_expire(fake_clock):
+    clock = fake_clock(100.0)
+    cache = StatusCache(pending_ttl=2, clock=clock)
+    cache.put("done", _transaction("SUCCESSFUL"))
+    cache.put("waiting", _transaction("PENDING"))
+
+    clock.now += 2
+    assert cache.get("done") == _transaction("SUCCESSFUL")
+    assert cache.get("waiting") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.invalidate("done")
+    assert cache.get("done") is None
+
+
+def test_memory_store_is_bounded():
+    store = MemoryStatusStore(max_size=2)
+    cache = StatusCache(store)
+    for reference in ("a", "b", "c"):
+        cache.put(reference, _transaction("FAILED"))
+
+    assert len(store) == 2
+    assert cache.get("a") is None
+
+
+def test_sqlite_store_survives_restarts_and_trims(tmp_path):
+    path = str(tmp_path / "statuses.sqlite3")
+    cache = StatusCache(SqliteStatusStore(path, max_size=2, trim_every=1))
+    cache.put("mtn", _transaction("SUCCESSFUL"))
+    cache.put("airtel", AirtelTransaction(id="tx-1", status="TF", message="Declined"))
+
+    reopened = StatusCache(SqliteStatusStore(path, max_size=2, trim_every=1))
+    assert reopened.get("mtn").external_id == "o-1"
+    assert reopened.get("airtel") == AirtelTransaction(id="tx-1", status="TF", message="Declined")
+
+    reopened.put("third", _transaction("FAILED"))
+    assert len(SqliteStatusStore(path)) == 2
+
+
+def test_disbursement_serves_terminal_status_from_cache(
+    disbursement_config, token_response, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/disbursement/token/", json=token_response)
+    url = f"{SANDBOX_BASE}/disbursement/v1_0/transfer/ref-1"
+    httpx_mock.add_response(method="GET", url=url, json={"amount": "100", "status": "PENDING"})
+    httpx_mock.add_response(method="GET", url=url, json={"amount": "100", "status": "SUCCESSFUL"})
+    cache = StatusCache(pending_ttl=0)
+    disbursement = MomoApi.disbursement(disbursement_config, status_cache=cache)
+
+    assert disbursement.get_transfer_status("ref-1").is_pending()
+    assert disbursement.get_transfer_status("ref-1").is_successful()
+    assert disbursement.get_transfer_status("ref-1").is_successful()
+
+    assert len(httpx_mock.get_requests(url=url)) == 2
+    assert cache.hits == 1
+
+
+def test_async_airtel_status_is_cached(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        method="POST", url=f"{STAGING_URL}/auth/oauth2/token", json={"access_token": "t", "expires_in": 3600}
+    )
+    url = f"{STAGING_URL}/standard/v1/payments/tx-1"
+    httpx_mock.add_response(
+        method="GET", url=url, json={"data": {"transaction": {"id": "tx-1", "status": "TS"}}}
+    )
+    config = AirtelConfig.collection("client-id", "client-secret")
+
+    async def main():
+        async with AirtelApi.async_collection(
+            AirtelApi.ENVIRONMENT_STAGING, config, status_cache=StatusCache()
+        ) as api:
+            return [await api.get_payment_status("tx-1") for _ in range(3)]
+
+    assert all(tx.is_successful() for tx in asyncio.run(main()))
+    assert len(httpx_mock.get_requests(url=url)) == 1
+
+
+def test_sync_and_async_clients_share_cached_statuses(
+    collection_config, token_response, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    url = f"{SANDBOX_BASE}/collection/v1_0/requesttopay/ref-1"
+    httpx_mock.add_response(method="GET", url=url, json={"amount": "100", "status": "FAILED"})
+    cache = StatusCache()
+    MomoApi.collection(collection_config, status_cache=cache).get_payment_status("ref-1")
+
+    async def main():
+        async with MomoApi.async_collection(collection_config, status_cache=cache) as api:
+            return await api.get_payment_status("ref-1")
+
+    assert asyncio.run(main()).is_failed()
+    assert len(httpx_mock.get_requests(url=url)) == 1
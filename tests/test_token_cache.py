@@ -0,0 +1,229 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from momo_api.models.api_token import ApiToken
+from momo_api.support.token_cache import TokenCache
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+
+
+def test_get_or_fetch_uses_cached_token():
+    cache = TokenCache()
+    cache.set("cached-token", 3600)
+    token = cache.get_or_fetch(lambda: pytest.fail("fetch should not be called"))
+    assert token.access_token == "cached-token"
+
+
+def test_concurrent_threads_share_one_fetch():
+    cache = TokenCache()
+    calls = []
+
+    def fetch() -> ApiToken:
+        calls.append(1)
+        time.sleep(0.05)
+        return ApiToken("fresh-token", "Bearer", 3600)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        tokens = list(pool.map(lambda _: cache.get_or_fetch(fetch), range(16)))
+
+    assert len(calls) == 1
+    assert {t.access_token for t in tokens} == {"fresh-token"}
+
+
+def test_concurrent_threads_share_fetch_error():
+    cache = TokenCache()
+    calls = []
+    started = threading.Event()
+
+    def fetch() -> ApiToken:
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        raise RuntimeError("token endpoint down")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_fetch(fetch)
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=call) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(errors) == 5
+
+
+def test_concurrent_coroutines_share_one_fetch():
+    cache = TokenCache()
+    calls = []
+
+    async def fetch() -> ApiToken:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ApiToken("async-token", "Bearer", 3600)
+
+    async def run():
+        return await asyncio.gather(*(cache.aget_or_fetch(fetch) for _ in range(50)))
+
+    tokens = asyncio.run(run())
+    assert len(calls) == 1
+    assert {t.access_token for t in tokens} == {"async-token"}
+
+
+def test_cancelled_async_fetch_is_retried_by_waiters():
+    cache = TokenCache()
+    calls = []
+
+    async def fetch() -> ApiToken:
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return ApiToken("async-token", "Bearer", 3600)
+
+    async def run():
+        leader = asyncio.ensure_future(cache.aget_or_fetch(fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(cache.aget_or_fetch(fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    token = asyncio.run(run())
+    assert token.access_token == "async-token"
+    assert len(calls) == 2
+
+
+def test_collection_fetches_token_once_under_concurrency(
+    collection_api, token_response, account_balance_response, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{SANDBOX_BASE}/collection/v1_0/account/balance",
+        json=account_balance_response,
+        is_reusable=True,
+    )
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        balances = list(pool.map(lambda _: collection_api.get_balance(), range(8)))
+
+    assert len(balances) == 8
+    assert len(httpx_mock.get_requests(url=f"{SANDBOX_BASE}/collection/token/")) == 1
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    from momo_api.support import token_cache
+
+    fake = FakeClock()
+    monkeypatch.setattr(token_cache, "time", fake)
+    return fake
+
+
+def test_refresh_ahead_renews_in_background(clock):
+    cache = TokenCache(refresh_ahead=0.5, jitter=0)
+    cache.set("old-token", 1000)
+    refreshed = threading.Event()
+
+    def fetch() -> ApiToken:
+        refreshed.set()
+        return ApiToken("new-token", "Bearer", 1000)
+
+    clock.now = 400
+    assert cache.get_or_fetch(fetch).access_token == "old-token"
+    assert not refreshed.is_set()
+
+    clock.now = 600
+    assert cache.get_or_fetch(fetch).access_token == "old-token"
+    assert refreshed.wait(1)
+    for _ in range(100):
+        if cache.get() == "new-token":
+            break
+        time.sleep(0.01)
+    assert cache.get() == "new-token"
+
+
+def test_failed_background_refresh_keeps_serving_token(clock):
+    cache = TokenCache(refresh_ahead=0.5, jitter=0)
+    cache.set("old-token", 1000)
+    attempted = threading.Event()
+
+    def fetch() -> ApiToken:
+        attempted.set()
+        raise RuntimeError("token endpoint down")
+
+    clock.now = 600
+    assert cache.get_or_fetch(fetch).access_token == "old-token"
+    assert attempted.wait(1)
+    for _ in range(100):
+        if cache._flight is None:
+            break
+        time.sleep(0.01)
+    assert cache.get_or_fetch(fetch).access_token == "old-token"
+    assert cache._refresh_at == 600 + TokenCache.RETRY_AFTER_FAILED_REFRESH
+
+
+def test_refresh_ahead_renews_in_background_async(clock):
+    cache = TokenCache(refresh_ahead=0.5, jitter=0)
+    cache.set("old-token", 1000)
+    calls = []
+
+    async def fetch() -> ApiToken:
+        calls.append(1)
+        return ApiToken("new-token", "Bearer", 1000)
+
+    async def run():
+        clock.now = 600
+        first = await cache.aget_or_fetch(fetch)
+        second = await cache.aget_or_fetch(fetch)
+        await asyncio.sleep(0)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first.access_token == second.access_token == "old-token"
+    assert len(calls) == 1
+    assert cache.get() == "new-token"
+
+
+def test_refresh_point_is_jittered(clock):
+    points = set()
+    for _ in range(20):
+        cache = TokenCache(refresh_ahead=0.8, jitter=0.25)
+        cache.set("token", 1000)
+        assert 600 <= cache._refresh_at <= 800
+        points.add(cache._refresh_at)
+    assert len(points) > 1
+
+
+def test_refresh_ahead_must_be_a_fraction():
+    with pytest.raises(ValueError):
+        TokenCache(refresh_ahead=1.5)
+
+
+def test_token_cache_is_injected_into_products(collection_config):
+    from momo_api import MomoApi
+
+    cache = TokenCache(refresh_ahead=0.8)
+    api = MomoApi.collection(collection_config, token_cache=cache)
+    assert api._token_cache._store is cache._store
+    assert api._token_cache.key == "mtn:sandbox:collection:test-api-user-uuid"
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from momo_api import MomoApi
+from momo_api.models.api_token import ApiToken
+from momo_api.support.token_cache import TokenCache
+from momo_api.support.token_store import (
+    MemoryTokenStore,
+    SqliteTokenStore,
+    StoredToken,
+    token_key,
+)
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    return str(tmp_path / "tokens.sqlite3")
+
+
+def test_sqlite_store_round_trip(db_path):
+    store = SqliteTokenStore(db_path)
+    assert store.load("k") is None
+    store.save("k", StoredToken("abc", 1000.0, 3600))
+    assert SqliteTokenStore(db_path).load("k") == StoredToken("abc", 1000.0, 3600)
+    store.delete("k")
+    assert store.load("k") is None
+
+
+def test_token_key_includes_every_dimension():
+    assert token_key("mtn", "sandbox", "collection", "user") == "mtn:sandbox:collection:user"
+
+
+def test_cold_start_reuses_token_from_shared_store(db_path):
+    # Two caches on separate connections stand in for two worker processes.
+    first = TokenCache(store=SqliteTokenStore(db_path), key="k")
+    second = TokenCache(store=SqliteTokenStore(db_path), key="k")
+    first.set("shared-token", 3600)
+
+    token = second.get_or_fetch(lambda: pytest.fail("fetch should not be called"))
+    assert token.access_token == "shared-token"
+
+
+def test_expired_stored_token_is_ignored():
+    store = MemoryTokenStore()
+    store.save("k", StoredToken("stale", time.time() - 3600, 3600))
+    cache = TokenCache(store=store, key="k")
+    assert cache.get() is None
+    token = cache.get_or_fetch(lambda: ApiToken("fresh", "Bearer", 3600))
+    assert token.access_token == "fresh"
+    assert store.load("k").access_token == "fresh"
+
+
+def test_refresh_adopts_token_renewed_by_another_worker():
+    store = MemoryTokenStore()
+    cache = TokenCache(refresh_ahead=0.5, jitter=0, store=store, key="k")
+    store.save("k", StoredToken("old", time.time() - 2000, 3600))
+    assert cache.get() == "old"
+
+    # Another worker renewed the token in the shared store.
+    store.save("k", StoredToken("renewed", time.time(), 3600))
+    cache._refresh_at = 0
+    cache._start_background_refresh(lambda: pytest.fail("fetch should not be called"))
+    for _ in range(100):
+        if cache.get() == "renewed":
+            break
+        time.sleep(0.01)
+    assert cache.get() == "renewed"
+
+
+def test_products_share_tokens_through_store(collection_config, token_response, httpx_mock: HTTPXMock, db_path):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+
+    first = MomoApi.collection(collection_config, token_cache=TokenCache(store=SqliteTokenStore(db_path)))
+    second = MomoApi.collection(collection_config, token_cache=TokenCache(store=SqliteTokenStore(db_path)))
+    assert first.get_access_token().access_token == "test-access-token-abc123"
+    assert second.get_access_token().access_token == "test-access-token-abc123"
+    assert len(httpx_mock.get_requests()) == 1
+
+
+def test_products_use_distinct_keys(collection_config, disbursement_config):
+    cache = TokenCache()
+    collection = MomoApi.collection(collection_config, token_cache=cache)
+    disbursement = MomoApi.disbursement(disbursement_config, token_cache=cache)
+    assert collection._token_cache.key != disbursement._token_cache.key
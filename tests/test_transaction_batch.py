@@ -0,0 +1,185 @@
+import asyncio
+import csv
+import io
+import re
+from decimal import Decimal
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from momo_api import MomoApi, StatusCache, Transaction, TransactionBatch
+from momo_api.exceptions import ResourceNotFoundException
+from tests.conftest import load_fixture
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+STATUS_URL = re.compile(rf"{SANDBOX_BASE}/collection/v1_0/requesttopay/.+")
+
+
+def _batch() -> TransactionBatch:
+    batch = TransactionBatch()
+    rows = [
+        ("ref-1", "SUCCESSFUL", "100", "EUR"),
+        ("ref-2", "FAILED", "50", "EUR"),
+        ("ref-3", "SUCCESSFUL", "20.5", "XAF"),
+        ("ref-4", "PENDING", "7", "EUR"),
+        ("ref-5", "SUCCESSFUL", "0.25", "EUR"),
+        ("ref-6", "FAILED", None, "XAF"),
+    ]
+    for reference_id, status, amount, currency in rows:
+        batch.append(reference_id, {
+            "status": status,
+            "amount": amount,
+            "currency": currency,
+            "externalId": f"order-{reference_id}",
+            "financialTransactionId": f"fin-{reference_id}" if status == "SUCCESSFUL" else None,
+        })
+    return batch
+
+
+def _status(request: httpx.Request) -> httpx.Response:
+    reference_id = request.url.path.rsplit("/", 1)[1]
+    index = int(reference_id.split("-")[1])
+    if index == 13:
+        return httpx.Response(404, json={"message": "Not found"})
+    data = load_fixture("payment_status_successful.json" if index % 3 else "payment_status_failed.json")
+    data["externalId"] = f"order-{index}"
+    return httpx.Response(200, json=data)
+
+
+def test_columns_are_typed_and_dictionary_encoded():
+    batch = _batch()
+
+    assert len(batch) == 6
+    assert batch.reference_ids == ["ref-1", "ref-2", "ref-3", "ref-4", "ref-5", "ref-6"]
+    assert batch.statuses == ["SUCCESSFUL", "FAILED", "SUCCESSFUL", "PENDING", "SUCCESSFUL", "FAILED"]
+    assert batch.amounts == [Decimal("100"), Decimal("50"), Decimal("20.5"), Decimal("7"), Decimal("0.25"), None]
+    assert batch.column("currency") == ["EUR", "EUR", "XAF", "EUR", "EUR", "XAF"]
+    assert batch.financial_transaction_ids[1] == ""
+    assert batch.row(2) == Transaction(
+        amount="20.5", status="SUCCESSFUL", currency="XAF",
+        financial_transaction_id="fin-ref-3", external_id="order-ref-3",
+    )
+    with pytest.raises(KeyError):
+        batch.column("payer")
+
+
+def test_filters_and_aggregates():
+    batch = _batch()
+
+    assert batch.failed().reference_ids == ["ref-2", "ref-6"]
+    assert batch.where(status="SUCCESSFUL", currency="EUR").reference_ids == ["ref-1", "ref-5"]
+    assert len(batch.where(status="REJECTED")) == 0
+    assert list(batch.indices(currency="XAF")) == [2, 5]
+    assert batch.count_by_status() == {"SUCCESSFUL": 3, "FAILED": 2, "PENDING": 1}
+    assert batch.sum_by_currency() == {"EUR": Decimal("100.25"), "XAF": Decimal("20.5")}
+    assert batch.sum_by_currency(None) == {"EUR": Decimal("157.25"), "XAF": Decimal("20.5")}
+    assert batch.failed().sum_by_currency("FAILED") == {"EUR": Decimal("50")}
+
+
+def test_amounts_are_exact_and_round_trip():
+    batch = TransactionBatch()
+    amounts = ["0.10", "0.20", "20.50", "1e3", "12345678901234.99", "n/a", ""]
+    for i, amount in enumerate(amounts):
+        batch.append(f"ref-{i}", {"status": "SUCCESSFUL", "amount": amount, "currency": "EUR"})
+
+    assert [batch.row(i).amount for i in range(len(batch))] == [
+        "0.10", "0.20", "20.50", "1000", "12345678901234.99", "n/a", ""
+    ]
+    assert batch.sum_by_currency() == {"EUR": Decimal("12345678902255.79")}
+    assert str(batch.take([0, 1]).sum_by_currency()["EUR"]) == "0.30"
+    out = io.StringIO()
+    batch.take([2, 5]).write_csv(out)
+    assert [row[2] for row in csv.reader(io.StringIO(out.getvalue()))] == ["amount", "20.50", "n/a"]
+
+
+def test_dictionary_columns_hold_more_than_65535_values():
+    batch = TransactionBatch()
+    for i in range(70_000):
+        batch.append(f"ref-{i}", {"status": f"S{i}", "amount": "1", "currency": "XAF"})
+
+    assert batch.row(69_999).status == "S69999"
+    assert len(batch.where(status="S68000")) == 1
+
+
+def test_write_csv_streams_in_chunks():
+    batch = _batch()
+    out = io.StringIO()
+
+    batch.write_csv(out, chunk_size=4)
+
+    rows = list(csv.reader(io.StringIO(out.getvalue())))
+    assert rows[0] == ["reference_id", "status", "amount", "currency", "external_id", "financial_transaction_id"]
+    assert rows[1] == ["ref-1", "SUCCESSFUL", "100", "EUR", "order-ref-1", "fin-ref-1"]
+    assert rows[6] == ["ref-6", "FAILED", "", "XAF", "order-ref-6", ""]
+    assert len(rows) == 7
+
+
+def test_numpy_and_arrow_exports():
+    np = pytest.importorskip("numpy")
+    pa = pytest.importorskip("pyarrow")
+    batch = _batch()
+
+    columns = batch.to_numpy()
+    assert list(columns["amount"]) == batch.amounts
+    assert list(columns["status"][columns["status"] == "FAILED"]) == ["FAILED", "FAILED"]
+
+    table = batch.to_arrow()
+    assert table.num_rows == 6
+    assert pa.types.is_dictionary(table.schema.field("status").type)
+    assert table.schema.field("amount").type == pa.decimal128(38, 2)
+    assert table.column("amount").to_pylist() == batch.amounts
+    assert table.column("currency").to_pylist() == batch.currencies
+
+
+def test_write_parquet_in_row_groups(tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    batch = _batch()
+    path = tmp_path / "statuses.parquet"
+
+    batch.write_parquet(str(path), row_group_size=4)
+
+    file = parquet.ParquetFile(str(path))
+    assert file.num_row_groups == 2
+    assert file.read().column("reference_id").to_pylist() == batch.reference_ids
+
+
+def test_get_payment_status_many_fills_a_batch(collection_config, token_response, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_callback(_status, method="GET", url=STATUS_URL, is_reusable=True)
+    cache = StatusCache()
+    collection = MomoApi.collection(collection_config, status_cache=cache)
+
+    batch = collection.get_payment_status_many((f"ref-{i}" for i in range(30)), concurrency=5)
+
+    assert len(batch) == 29
+    assert list(batch.errors) == ["ref-13"]
+    assert isinstance(batch.errors["ref-13"], ResourceNotFoundException)
+    assert len(batch.failed()) == 10
+    assert batch.sum_by_currency() == {"EUR": Decimal("1900")}
+    assert sorted(batch.external_ids) == sorted(f"order-{i}" for i in range(30) if i != 13)
+    # Rows are cached like single lookups, so a second pass makes no requests.
+    requests = len(httpx_mock.get_requests())
+    again = collection.get_payment_status_many([f"ref-{i}" for i in range(30) if i != 13])
+    assert len(httpx_mock.get_requests()) == requests
+    assert again.count_by_status() == batch.count_by_status()
+
+
+def test_async_bulk_status(disbursement_config, token_response, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/disbursement/token/", json=token_response)
+    httpx_mock.add_response(
+        method="GET",
+        url=re.compile(rf"{SANDBOX_BASE}/disbursement/v1_0/transfer/.+"),
+        json=load_fixture("transfer_status.json"),
+        is_reusable=True,
+    )
+
+    async def main():
+        async with MomoApi.async_disbursement(disbursement_config) as disbursement:
+            return await disbursement.get_transfer_status_many([f"t-{i}" for i in range(8)], concurrency=3)
+
+    batch = asyncio.run(main())
+
+    assert sorted(batch.reference_ids) == [f"t-{i}" for i in range(8)]
+    assert not batch.errors
+    assert batch.count_by_status() == {load_fixture("transfer_status.json")["status"]: 8}
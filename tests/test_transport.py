@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from momo_api import AirtelApi, AirtelConfig, MomoApi
+from momo_api.support.transport import HttpTransport
+
+SANDBOX_BASE = "https://sandbox.momodeveloper.mtn.com"
+
+
+def test_products_share_injected_transport(collection_config, disbursement_config):
+    with HttpTransport() as transport:
+        collection = MomoApi.collection(collection_config, transport=transport)
+        disbursement = MomoApi.disbursement(disbursement_config, transport=transport)
+        assert collection._transport is transport
+        assert disbursement._transport is transport
+
+
+def test_airtel_api_injects_its_transport():
+    with AirtelApi.create(AirtelApi.ENVIRONMENT_STAGING) as airtel:
+        collection = airtel.get_collection(AirtelConfig.collection("id", "secret"))
+        disbursement = airtel.get_disbursement(
+            AirtelConfig.disbursement("id", "secret", "pin")
+        )
+        assert collection._transport is airtel.transport
+        assert disbursement._transport is airtel.transport
+
+
+def test_airtel_api_closes_its_transport_on_async_exit():
+    async def main():
+        async with AirtelApi.create(AirtelApi.ENVIRONMENT_STAGING) as airtel:
+            collection = airtel.get_collection(AirtelConfig.collection("id", "secret"))
+        return collection._transport
+
+    assert asyncio.run(main()).closed
+
+
+def test_momo_api_injects_its_transport_and_closes_it(collection_config, disbursement_config):
+    with MomoApi.create(MomoApi.ENVIRONMENT_SANDBOX) as api:
+        collection = api.collection(collection_config)
+        disbursement = api.disbursement(disbursement_config)
+        assert collection._transport is disbursement._transport is api.transport
+        assert api.transport is not HttpTransport.default()
+
+    assert collection._transport.closed
+    with pytest.raises(RuntimeError):
+        collection.get_access_token()
+
+
+def test_momo_api_closes_the_transport_of_its_async_products(collection_config, disbursement_config):
+    async def main():
+        async with MomoApi.create(MomoApi.ENVIRONMENT_SANDBOX) as api:
+            collection = api.async_collection(collection_config)
+            disbursement = api.async_disbursement(disbursement_config)
+            assert collection._transport is disbursement._transport
+        return collection._transport
+
+    assert asyncio.run(main()).closed
+
+
+def test_airtel_api_closes_the_transport_of_its_async_products():
+    async def main():
+        async with AirtelApi.create(AirtelApi.ENVIRONMENT_STAGING) as airtel:
+            collection = airtel.get_async_collection(AirtelConfig.collection("id", "secret"))
+            disbursement = airtel.get_async_disbursement(
+                AirtelConfig.disbursement("id", "secret", "pin")
+            )
+            assert collection._transport is disbursement._transport
+            assert not collection._owns_transport
+        return collection._transport
+
+    assert asyncio.run(main()).closed
+
+
+def test_factories_default_to_shared_transport(collection_config):
+    first = MomoApi.collection(collection_config)
+    second = MomoApi.collection(collection_config)
+    assert first._transport is second._transport is HttpTransport.default()
+
+
+def test_client_is_reused_across_requests(collection_config, token_response, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url=f"{SANDBOX_BASE}/collection/token/", json=token_response)
+    httpx_mock.add_response(
+        method="GET",
+        url=f"{SANDBOX_BASE}/collection/v1_0/account/balance",
+        json={"availableBalance": "10", "currency": "EUR"},
+    )
+    with HttpTransport() as transport:
+        api = MomoApi.collection(collection_config, transport=transport)
+        api.get_access_token()
+        client = transport.client
+        api.get_balance()
+        assert transport.client is client
+
+
+def test_stats_reports_pool_limits():
+    transport = HttpTransport(max_connections=10, max_keepalive_connections=5)
+    stats = transport.stats()
+    assert stats.active == 0
+    assert stats.idle == 0
+    assert stats.total == 0
+    assert stats.max_connections == 10
+    assert stats.max_keepalive_connections == 5
+
+
+def test_closed_transport_rejects_requests():
+    transport = HttpTransport()
+    transport.close()
+    assert transport.closed
+    with pytest.raises(RuntimeError):
+        transport.get(f"{SANDBOX_BASE}/collection/token/")
+
+
+def test_default_transport_is_recreated_after_close():
+    first = HttpTransport.default()
+    first.close()
+    second = HttpTransport.default()
+    assert second is not first
+    assert not second.closed